@@ -1,9 +1,29 @@
 import os
 
 from celery import Celery
+from kombu import Queue
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 app = Celery("config")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+
+# Notification work is split by urgency so SEV1 mail never queues behind bulk sends.
+# Routes give each task its usual queue; delivery dispatch overrides the queue per
+# message priority (see incidents.tasks.notification_queue). Run a dedicated worker
+# for `notifications.critical` in production.
+app.conf.task_queues = (
+    Queue("celery"),
+    Queue("notifications.critical"),
+    Queue("notifications.normal"),
+    Queue("notifications.bulk"),
+)
+app.conf.task_routes = {
+    "incidents.tasks.fan_out_notification": {"queue": "notifications.normal"},
+    "incidents.tasks.send_email_delivery_batch": {"queue": "notifications.normal"},
+    "incidents.tasks.send_email_delivery": {"queue": "notifications.normal"},
+    "incidents.tasks.flush_notification_digests": {"queue": "notifications.bulk"},
+    "incidents.tasks.sweep_stale_email_deliveries": {"queue": "notifications.bulk"},
+    "incidents.tasks.archive_email_deliveries": {"queue": "notifications.bulk"},
+}
@@ -161,15 +161,80 @@ STATIC_URL = 'static/'
 # Email / notifications
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "status@example.com"
+# Deliveries created per bulk insert / dispatched per batch task
+EMAIL_DELIVERY_BATCH_SIZE = int(os.getenv("EMAIL_DELIVERY_BATCH_SIZE", "500"))
+# Digest mode: collapse timeline updates per incident into one email per window.
+# Resolutions, new SEV1 incidents and postmortems are always sent immediately.
+NOTIFICATION_DIGEST_ENABLED = os.getenv("NOTIFICATION_DIGEST_ENABLED", "false").lower() == "true"
+NOTIFICATION_DIGEST_WINDOW_SECONDS = int(os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", "900"))
+
+
+def get_domain_rate_limits(setting_name: str) -> dict[str, tuple[float, int]]:
+    """
+    Parse `domain=rate:burst` pairs (rate in messages/second), e.g.
+    `gmail.com=10:50,outlook.com=5:20`.
+    """
+    limits: dict[str, tuple[float, int]] = {}
+    for item in get_list(setting_name):
+        domain, _, spec = item.partition("=")
+        rate, _, burst = spec.partition(":")
+        limits[domain.strip().lower()] = (float(rate), int(burst or rate))
+    return limits
+
+
+# Outbound pacing: one token bucket per recipient domain, shared through the cache.
+EMAIL_DOMAIN_DEFAULT_RATE = float(os.getenv("EMAIL_DOMAIN_DEFAULT_RATE", "20"))
+EMAIL_DOMAIN_DEFAULT_BURST = int(os.getenv("EMAIL_DOMAIN_DEFAULT_BURST", "100"))
+EMAIL_DOMAIN_RATE_LIMITS = get_domain_rate_limits("EMAIL_DOMAIN_RATE_LIMITS")
+# Pause applied to a domain after a 4xx (try-again-later) SMTP reply without a hint
+EMAIL_DOMAIN_DEFER_SECONDS = int(os.getenv("EMAIL_DOMAIN_DEFER_SECONDS", "60"))
+# PENDING deliveries untouched this long are assumed lost and re-dispatched
+EMAIL_STALE_PENDING_SECONDS = int(os.getenv("EMAIL_STALE_PENDING_SECONDS", "3600"))
+EMAIL_SWEEP_MAX_DELIVERIES = int(os.getenv("EMAIL_SWEEP_MAX_DELIVERIES", "5000"))
+# SENT/FAILED deliveries older than this move to EmailDeliveryArchive
+EMAIL_DELIVERY_RETENTION_DAYS = int(os.getenv("EMAIL_DELIVERY_RETENTION_DAYS", "30"))
+EMAIL_ARCHIVE_MAX_MESSAGES = int(os.getenv("EMAIL_ARCHIVE_MAX_MESSAGES", "200"))
 
 
 # Cache
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "incident-status-cache",
+# LocMemCache is per-process; point CACHE_URL at Redis so every gunicorn worker
+# shares cached payloads and version counters.
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
     }
-}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "incident-status-cache",
+        }
+    }
+
+# Entries held in each worker's in-process LRU in front of the shared cache
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "512"))
+# Seconds a cache version counter lives; an expired one restarts from the clock, so
+# this only costs a miss, but it keeps counters for one-off scopes from piling up.
+CACHE_VERSION_TTL = int(os.getenv("CACHE_VERSION_TTL", "86400"))
+
+# Admin metrics are served from a cached snapshot refreshed in the background: it is
+# stale after the TTL, or after an incident write once it is MIN_REFRESH seconds old.
+ADMIN_METRICS_SNAPSHOT_TTL = int(os.getenv("ADMIN_METRICS_SNAPSHOT_TTL", "60"))
+ADMIN_METRICS_MIN_REFRESH_SECONDS = int(os.getenv("ADMIN_METRICS_MIN_REFRESH_SECONDS", "5"))
+
+# Public status page views are counted in memory per worker; each gunicorn worker's
+# background flusher (gunicorn.conf.py) writes them to the daily counts table every
+# this many seconds, or sooner once this many have accumulated.
+STATUS_PAGE_VIEWS_FLUSH_THRESHOLD = int(os.getenv("STATUS_PAGE_VIEWS_FLUSH_THRESHOLD", "500"))
+STATUS_PAGE_VIEWS_FLUSH_SECONDS = float(os.getenv("STATUS_PAGE_VIEWS_FLUSH_SECONDS", "10"))
+
+
+# Static status snapshots (served directly by nginx/CDN); empty disables publishing
+STATUS_SNAPSHOT_DIR = os.getenv("STATUS_SNAPSHOT_DIR", "")
 
 
 # Celery
@@ -179,6 +244,30 @@ CELERY_RESULT_BACKEND = os.getenv(
 CELERY_TASK_ALWAYS_EAGER = os.getenv(
     "CELERY_TASK_ALWAYS_EAGER", "true").lower() == "true"
 
+# How notification fan-out is dispatched: "celery" (apply_async, inline when eager)
+# or "thread" (local thread pool, so dev setups without a broker don't block requests).
+TASK_EXECUTOR = os.getenv("TASK_EXECUTOR", "celery").lower()
+TASK_EXECUTOR_THREADS = int(os.getenv("TASK_EXECUTOR_THREADS", "4"))
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-notification-digests": {
+        "task": "incidents.tasks.flush_notification_digests",
+        "schedule": 60.0,
+    },
+    "sweep-stale-email-deliveries": {
+        "task": "incidents.tasks.sweep_stale_email_deliveries",
+        "schedule": 300.0,
+    },
+    "archive-email-deliveries": {
+        "task": "incidents.tasks.archive_email_deliveries",
+        "schedule": 60.0 * 60,
+    },
+    "refresh-admin-metrics-snapshot": {
+        "task": "incidents.tasks.refresh_admin_metrics_snapshot",
+        "schedule": 30.0,
+    },
+}
+
 
 # Rate limiting
 RATELIMIT_USE_CACHE = "default"
@@ -0,0 +1,14 @@
+"""Gunicorn settings loaded automatically from the working directory (/app in the image)."""
+
+
+def post_worker_init(worker):
+    # Each worker counts status page views in memory; flush them in the background.
+    from incidents.services import page_views
+
+    page_views.counter.start()
+
+
+def worker_exit(server, worker):
+    from incidents.services import page_views
+
+    page_views.counter.stop()
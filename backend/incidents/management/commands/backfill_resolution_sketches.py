@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from incidents.services import sketches
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per severity/visibility/week resolution-time sketches from resolved incidents."
+
+    def handle(self, *args, **options):
+        written = sketches.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} resolution sketches."))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from incidents.services import uptime as uptime_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily uptime rollups used by the public 90-day status bar."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=uptime_service.DEFAULT_UPTIME_DAYS,
+            help="Number of days (ending today) to rebuild.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days < 1:
+            raise CommandError("--days must be at least 1")
+
+        today = timezone.localdate()
+        written = uptime_service.refresh_days(today - timedelta(days=days - 1), today)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt uptime rollups for {days} days ({written} days with incidents).")
+        )
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from incidents.services import subscriber_import
+
+
+class Command(BaseCommand):
+    help = "Bulk-import subscribers from a CSV (email,scope,incident,is_active) or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or '-' to read from stdin.")
+        parser.add_argument(
+            "--format",
+            choices=subscriber_import.FORMATS,
+            help="Input format (defaults to the file extension; CSV otherwise).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=subscriber_import.IMPORT_CHUNK_SIZE,
+            help="Rows validated and inserted per round trip.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        fmt = options["format"] or subscriber_import.detect_format(filename=path)
+
+        try:
+            stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        except OSError as exc:
+            raise CommandError(f"Could not open {path}: {exc}") from exc
+        try:
+            result = subscriber_import.import_subscribers(
+                subscriber_import.iter_rows(stream, fmt), chunk_size=options["chunk_size"]
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} subscribers from {result.received} rows "
+                f"({result.duplicates} duplicates skipped, {result.invalid} invalid)."
+            )
+        )
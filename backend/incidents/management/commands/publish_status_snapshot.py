@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from incidents.services import static_status, status as status_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild the static status.json/status.html snapshot from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            help="Directory to write into (defaults to the STATUS_SNAPSHOT_DIR setting).",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["output_dir"]) if options["output_dir"] else None
+        if directory is None and static_status.get_snapshot_dir() is None:
+            raise CommandError("STATUS_SNAPSHOT_DIR is not configured; pass --output-dir.")
+
+        status_service.invalidate_public_status_cache()
+        try:
+            target = static_status.publish_status_snapshot(directory=directory, raise_errors=True)
+        except OSError as exc:
+            raise CommandError(f"Could not write status snapshot: {exc}") from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Status snapshot written to {target}."))
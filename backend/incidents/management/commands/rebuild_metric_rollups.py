@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from incidents.services import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the hourly/daily metric rollups from the incident, update, subscriber and delivery tables."
+
+    def handle(self, *args, **options):
+        written = rollups.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} metric rollup cells."))
@@ -5,6 +5,9 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from incidents.models import ActionItem, AuditEvent, Incident, IncidentUpdate, Postmortem
+from incidents.services import rollups, sketches
+from incidents.services import uptime as uptime_service
+from incidents.services.incidents import refresh_last_activity
 
 
 class Command(BaseCommand):
@@ -127,6 +130,14 @@ class Command(BaseCommand):
                 self._seed_postmortem(incident, scenario.get("postmortem"))
             incidents.append(incident)
 
+        today = timezone.localdate()
+        uptime_service.refresh_days(
+            today - timedelta(days=uptime_service.DEFAULT_UPTIME_DAYS - 1), today
+        )
+        refresh_last_activity()
+        sketches.rebuild_all()
+        rollups.rebuild_all()
+
         self.stdout.write(self.style.SUCCESS("Demo data seeded successfully."))
 
     def _create_incident(self, *, title, summary, severity, status, is_public, hours_open, created_by_name) -> Incident:
@@ -175,6 +186,9 @@ class Command(BaseCommand):
             if status == incident.status:
                 break
 
+        # The seeded timeline is the incident's history, so it opened in its first status.
+        Incident.objects.filter(pk=incident.pk).update(initial_status=steps[0][0])
+
         start = incident.created_at
         end = incident.resolved_at or incident.updated_at
         if end <= start:
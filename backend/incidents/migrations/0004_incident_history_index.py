@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0003_incident_resolved_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['is_public', 'status', 'resolved_at'], name='incidents_i_is_publ_9c1960_idx'),
+        ),
+    ]
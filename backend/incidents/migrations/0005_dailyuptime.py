@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0004_incident_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyUptime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('worst_severity', models.CharField(blank=True, choices=[('SEV1', 'SEV1'), ('SEV2', 'SEV2'), ('SEV3', 'SEV3'), ('SEV4', 'SEV4')], default='', max_length=8)),
+                ('outage_minutes', models.PositiveIntegerField(default=0)),
+                ('incident_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('date',),
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+def remove_duplicate_subscribers(apps, schema_editor):
+    """Keep one row per (email, scope, incident), preferring active then oldest."""
+    Subscriber = apps.get_model("incidents", "Subscriber")
+    seen = set()
+    duplicates = []
+    rows = Subscriber.objects.order_by("-is_active", "created_at").values_list(
+        "id", "email", "scope", "incident_id"
+    )
+    for pk, email, scope, incident_id in rows.iterator(chunk_size=2000):
+        key = (email, scope, incident_id if scope == "INCIDENT" else None)
+        if key in seen:
+            duplicates.append(pk)
+        else:
+            seen.add(key)
+    for start in range(0, len(duplicates), 500):
+        Subscriber.objects.filter(pk__in=duplicates[start : start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0005_dailyuptime'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['is_active', 'scope', 'incident'], name='incidents_s_is_acti_8ccb87_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_subscribers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='subscriber',
+            constraint=models.UniqueConstraint(condition=models.Q(('scope', 'GLOBAL')), fields=('email',), name='unique_global_subscriber_email'),
+        ),
+        migrations.AddConstraint(
+            model_name='subscriber',
+            constraint=models.UniqueConstraint(condition=models.Q(('scope', 'INCIDENT')), fields=('email', 'incident'), name='unique_incident_subscriber_email'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 22:46
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0006_subscriber_recipient_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('flushed_at', models.DateTimeField(blank=True, null=True)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_entries', to='incidents.incident')),
+                ('update', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='digest_entries', to='incidents.incidentupdate')),
+            ],
+            options={
+                'ordering': ('created_at',),
+                'indexes': [models.Index(fields=['flushed_at', 'incident', 'created_at'], name='incidents_d_flushed_f22d8c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 6.0 on 2026-10-18 23:10
+
+import django.db.models.deletion
+import uuid
+from collections import defaultdict
+
+from django.db import migrations, models
+
+UPDATE_CHUNK_SIZE = 500
+
+
+def move_content_to_messages(apps, schema_editor):
+    """
+    Create one NotificationMessage per distinct (incident, subject, body) and point deliveries at it.
+
+    One pass over the deliveries collects the ids of each group; the groups are then
+    updated by primary key in chunks instead of rescanning the table once per group.
+    """
+    EmailDelivery = apps.get_model("incidents", "EmailDelivery")
+    NotificationMessage = apps.get_model("incidents", "NotificationMessage")
+    message_ids = {}
+    delivery_ids = defaultdict(list)
+    rows = EmailDelivery.objects.filter(message__isnull=True).values_list(
+        "id", "incident_id", "subject", "body"
+    )
+    for pk, incident_id, subject, body in rows.iterator(chunk_size=2000):
+        key = (incident_id, subject, body)
+        if key not in message_ids:
+            message_ids[key] = NotificationMessage.objects.create(
+                incident_id=incident_id, subject=subject, body=body
+            ).pk
+        delivery_ids[message_ids[key]].append(pk)
+    for message_id, ids in delivery_ids.items():
+        for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+            EmailDelivery.objects.filter(id__in=ids[start : start + UPDATE_CHUNK_SIZE]).update(
+                message_id=message_id
+            )
+
+
+def copy_content_back(apps, schema_editor):
+    EmailDelivery = apps.get_model("incidents", "EmailDelivery")
+    NotificationMessage = apps.get_model("incidents", "NotificationMessage")
+    for message in NotificationMessage.objects.iterator(chunk_size=500):
+        EmailDelivery.objects.filter(message=message).update(
+            subject=message.subject, body=message.body
+        )
+
+
+class Migration(migrations.Migration):
+    # The data step updates the deferrable `message` foreign key, and PostgreSQL refuses
+    # to alter a table with FK trigger events still pending in the same transaction.
+    # Run each operation in its own transaction instead, with the data step atomic.
+    atomic = False
+
+    dependencies = [
+        ('incidents', '0007_digestentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationMessage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event', models.CharField(blank=True, default='', max_length=64)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('incident', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notification_messages', to='incidents.incident')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='emaildelivery',
+            name='message',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='deliveries', to='incidents.notificationmessage'),
+        ),
+        migrations.RunPython(move_content_to_messages, copy_content_back, atomic=True),
+        # Defaults let the columns be re-added on a reverse migration before content is copied back.
+        migrations.AlterField(
+            model_name='emaildelivery',
+            name='subject',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='emaildelivery',
+            name='body',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='emaildelivery',
+            name='subject',
+        ),
+        migrations.RemoveField(
+            model_name='emaildelivery',
+            name='body',
+        ),
+        migrations.AlterField(
+            model_name='emaildelivery',
+            name='message',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='deliveries', to='incidents.notificationmessage'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 23:25
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0008_notificationmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDeliveryArchive',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('incident_id', models.UUIDField(blank=True, db_index=True, null=True)),
+                ('message_id', models.UUIDField(db_index=True)),
+                ('event', models.CharField(blank=True, default='', max_length=64)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('delivery_count', models.PositiveIntegerField()),
+                ('sent_count', models.PositiveIntegerField()),
+                ('failed_count', models.PositiveIntegerField()),
+                ('first_created_at', models.DateTimeField()),
+                ('last_created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('deliveries', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0009_emaildeliveryarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationmessage',
+            name='priority',
+            field=models.CharField(choices=[('critical', 'Critical'), ('normal', 'Normal'), ('bulk', 'Bulk')], default='normal', max_length=16),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0010_notificationmessage_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResolutionSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('severity', models.CharField(choices=[('SEV1', 'SEV1'), ('SEV2', 'SEV2'), ('SEV3', 'SEV3'), ('SEV4', 'SEV4')], max_length=8)),
+                ('is_public', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+                ('sketch', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('week', 'severity', 'is_public'), name='unique_resolution_sketch_cell')],
+            },
+        ),
+    ]
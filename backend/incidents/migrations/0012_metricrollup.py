@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0011_resolutionsketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('HOUR', 'Hour'), ('DAY', 'Day')], max_length=4)),
+                ('metric', models.CharField(choices=[('INCIDENTS', 'Incidents opened'), ('RESOLUTIONS', 'Incidents resolved'), ('RESOLUTION_SECONDS', 'Resolution time (seconds)'), ('SUBSCRIBERS', 'Subscriber signups'), ('DELIVERIES', 'Email deliveries')], max_length=32)),
+                ('bucket_start', models.DateTimeField()),
+                ('severity', models.CharField(blank=True, default='', max_length=8)),
+                ('visibility', models.CharField(blank=True, default='', max_length=8)),
+                ('status', models.CharField(blank=True, default='', max_length=32)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('grain', 'metric', 'bucket_start', 'severity', 'visibility', 'status'), name='unique_metric_rollup_cell')],
+            },
+        ),
+    ]
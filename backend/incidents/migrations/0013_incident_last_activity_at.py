@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-19 01:20
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_last_activity(apps, schema_editor):
+    """Set last_activity_at to the latest update's created_at, or created_at without updates."""
+    Incident = apps.get_model("incidents", "Incident")
+    IncidentUpdate = apps.get_model("incidents", "IncidentUpdate")
+    latest_update = (
+        IncidentUpdate.objects.filter(incident=OuterRef("pk"))
+        .order_by()
+        .values("incident")
+        .annotate(latest=Max("created_at"))
+        .values("latest")
+    )
+    Incident.objects.update(last_activity_at=Coalesce(Subquery(latest_update), "created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0012_metricrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incident',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='actionitem',
+            index=models.Index(fields=['status', 'due_date'], name='incidents_a_status_14518a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['status', 'last_activity_at'], name='incidents_i_status_851bd8_idx'),
+        ),
+    ]
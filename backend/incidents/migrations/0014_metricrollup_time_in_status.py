@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0013_incident_last_activity_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='metricrollup',
+            name='metric',
+            field=models.CharField(choices=[('INCIDENTS', 'Incidents opened'), ('RESOLUTIONS', 'Incidents resolved'), ('RESOLUTION_SECONDS', 'Resolution time (seconds)'), ('SUBSCRIBERS', 'Subscriber signups'), ('DELIVERIES', 'Email deliveries'), ('ACKNOWLEDGEMENTS', 'Incidents acknowledged'), ('ACKNOWLEDGE_SECONDS', 'Time to acknowledge (seconds)'), ('STATUS_STAYS', 'Status stays ended'), ('STATUS_SECONDS', 'Time in status (seconds)')], max_length=32),
+        ),
+    ]
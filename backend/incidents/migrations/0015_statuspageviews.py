@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0014_metricrollup_time_in_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusPageViews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('views', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('date',),
+            },
+        ),
+    ]
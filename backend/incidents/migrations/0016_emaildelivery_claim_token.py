@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0015_statuspageviews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emaildelivery',
+            name='claim_token',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 6.0 on 2026-10-19 10:40
+
+import json
+import zlib
+from collections import Counter
+
+from django.db import migrations
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Frozen copy of the bucketing in `incidents.services.rollups` as of this migration, so
+# later changes to the service can't alter what this backfill writes.
+KEY_FIELDS = ("grain", "metric", "bucket_start", "severity", "visibility", "status")
+BATCH_SIZE = 1000
+CHUNK_SIZE = 2000
+
+
+def _hour_start(value):
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def _day_start(value):
+    return timezone.localtime(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add(deltas, metric, at, amount=1, severity="", visibility="", status=""):
+    deltas[("HOUR", metric, _hour_start(at), severity, visibility, status)] += amount
+    deltas[("DAY", metric, _day_start(at), severity, visibility, status)] += amount
+
+
+def _add_incident(deltas, severity, is_public, status, created_at, resolved_at):
+    shown = "public" if is_public else "internal"
+    _add(deltas, "INCIDENTS", created_at, 1, severity, shown, status)
+    if resolved_at is not None:
+        seconds = max(0, round((resolved_at - created_at).total_seconds()))
+        _add(deltas, "RESOLUTIONS", resolved_at, 1, severity, shown)
+        _add(deltas, "RESOLUTION_SECONDS", resolved_at, seconds, severity, shown)
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Fill the rollup cells from existing rows. 0012 created the table empty, so deployments
+    upgraded past it count only what happened since and can go negative on later changes.
+    Skipped when cells already exist (e.g. `rebuild_metric_rollups` was run by hand).
+    Time-in-status cells are filled by 0019, once incidents record their initial status.
+    """
+    MetricRollup = apps.get_model("incidents", "MetricRollup")
+    if MetricRollup.objects.exists():
+        return
+    Incident = apps.get_model("incidents", "Incident")
+    Subscriber = apps.get_model("incidents", "Subscriber")
+    EmailDelivery = apps.get_model("incidents", "EmailDelivery")
+    EmailDeliveryArchive = apps.get_model("incidents", "EmailDeliveryArchive")
+
+    deltas = Counter()
+    incidents = Incident.objects.values_list("severity", "is_public", "status", "created_at", "resolved_at")
+    for row in incidents.iterator(chunk_size=CHUNK_SIZE):
+        _add_incident(deltas, *row)
+    for created_at in Subscriber.objects.values_list("created_at", flat=True).iterator(chunk_size=CHUNK_SIZE):
+        _add(deltas, "SUBSCRIBERS", created_at)
+    deliveries = EmailDelivery.objects.values_list("created_at", "status")
+    for created_at, status in deliveries.iterator(chunk_size=CHUNK_SIZE):
+        _add(deltas, "DELIVERIES", created_at, status=status)
+    # Archived deliveries are gone from the hot table but still count towards history.
+    for archive in EmailDeliveryArchive.objects.iterator(chunk_size=50):
+        payload = zlib.decompress(bytes(archive.deliveries)).decode("utf-8")
+        for line in payload.splitlines():
+            row = json.loads(line)
+            _add(deltas, "DELIVERIES", parse_datetime(row["created_at"]), status=row["status"])
+
+    MetricRollup.objects.bulk_create(
+        [
+            MetricRollup(value=amount, **dict(zip(KEY_FIELDS, key)))
+            for key, amount in deltas.items()
+            if amount
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0017_emaildelivery_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
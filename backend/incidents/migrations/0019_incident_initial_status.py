@@ -0,0 +1,106 @@
+# Generated by Django 6.0 on 2026-10-19 11:30
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+# Frozen copy of `incidents.services.time_in_status` and the rollup bucketing as of this
+# migration, so later changes to the services can't alter what this backfill writes.
+KEY_FIELDS = ("grain", "metric", "bucket_start", "severity", "visibility", "status")
+METRICS = ("ACKNOWLEDGEMENTS", "ACKNOWLEDGE_SECONDS", "STATUS_STAYS", "STATUS_SECONDS")
+INITIAL_STATUS = "INVESTIGATING"
+BATCH_SIZE = 1000
+CHUNK_SIZE = 2000
+
+
+def _add(deltas, metric, at, amount, severity, visibility, status=""):
+    local = timezone.localtime(at)
+    hour = local.replace(minute=0, second=0, microsecond=0)
+    day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    deltas[("HOUR", metric, hour, severity, visibility, status)] += amount
+    deltas[("DAY", metric, day, severity, visibility, status)] += amount
+
+
+def _seconds(start, end):
+    return max(0, round((end - start).total_seconds()))
+
+
+def _add_status_durations(deltas, IncidentUpdate):
+    """One ordered scan over every update, replaying each incident's timeline."""
+    rows = (
+        IncidentUpdate.objects.order_by("incident_id", "created_at")
+        .values_list(
+            "incident_id",
+            "incident__created_at",
+            "incident__severity",
+            "incident__is_public",
+            "incident__initial_status",
+            "status_at_time",
+            "created_at",
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    current = None
+    for incident_id, created_at, severity, is_public, initial_status, status, at in rows:
+        cell = (severity, "public" if is_public else "internal")
+        if incident_id != current:
+            current = incident_id
+            stay_status, entered_at = initial_status or INITIAL_STATUS, created_at
+            # An incident is acknowledged by its first update.
+            _add(deltas, "ACKNOWLEDGEMENTS", at, 1, *cell)
+            _add(deltas, "ACKNOWLEDGE_SECONDS", at, _seconds(created_at, at), *cell)
+        if status != stay_status:
+            _add(deltas, "STATUS_STAYS", at, 1, *cell, stay_status)
+            _add(deltas, "STATUS_SECONDS", at, _seconds(entered_at, at), *cell, stay_status)
+            stay_status, entered_at = status, at
+
+
+def backfill_initial_status(apps, schema_editor):
+    """
+    Take each incident's initial status from its INCIDENT_CREATED audit event, then
+    recompute the time-in-status cells, which assumed every incident opened as
+    INVESTIGATING. Seeded events record the final status, so they are skipped.
+    """
+    Incident = apps.get_model("incidents", "Incident")
+    AuditEvent = apps.get_model("incidents", "AuditEvent")
+    MetricRollup = apps.get_model("incidents", "MetricRollup")
+    created = (
+        AuditEvent.objects.filter(incident=OuterRef("pk"), action="INCIDENT_CREATED")
+        .exclude(metadata__has_key="seeded")
+        .order_by("created_at")
+        .values(status=KT("metadata__status"))[:1]
+    )
+    Incident.objects.update(initial_status=Coalesce(Subquery(created), Value("")))
+
+    deltas = Counter()
+    _add_status_durations(deltas, apps.get_model("incidents", "IncidentUpdate"))
+    MetricRollup.objects.filter(metric__in=METRICS).delete()
+    MetricRollup.objects.bulk_create(
+        [
+            MetricRollup(value=amount, **dict(zip(KEY_FIELDS, key)))
+            for key, amount in deltas.items()
+            if amount
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0018_backfill_metric_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incident',
+            name='initial_status',
+            field=models.CharField(blank=True, choices=[('INVESTIGATING', 'Investigating'), ('IDENTIFIED', 'Identified'), ('MONITORING', 'Monitoring'), ('RESOLVED', 'Resolved')], default='', max_length=32),
+        ),
+        migrations.RunPython(backfill_initial_status, migrations.RunPython.noop),
+    ]
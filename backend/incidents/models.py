@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 
 class Incident(models.Model):
@@ -21,15 +22,22 @@ class Incident(models.Model):
     summary = models.TextField()
     severity = models.CharField(max_length=8, choices=Severity.choices)
     status = models.CharField(max_length=32, choices=Status.choices, default=Status.INVESTIGATING)
+    # Status the incident was opened in, where its first time-in-status stay starts;
+    # set by `create_incident` (blank rows are treated as INVESTIGATING).
+    initial_status = models.CharField(max_length=32, choices=Status.choices, blank=True, default="")
     is_public = models.BooleanField(default=True)
     created_by_name = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
+    # Creation or the latest posted update/transition; maintained by the incident services.
+    last_activity_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         indexes = [
             models.Index(fields=["status", "severity", "is_public", "created_at"]),
+            models.Index(fields=["is_public", "status", "resolved_at"]),
+            models.Index(fields=["status", "last_activity_at"]),
         ]
 
     def __str__(self) -> str:
@@ -72,6 +80,23 @@ class Subscriber(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_active", "scope", "incident"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["email"],
+                condition=models.Q(scope="GLOBAL"),
+                name="unique_global_subscriber_email",
+            ),
+            models.UniqueConstraint(
+                fields=["email", "incident"],
+                condition=models.Q(scope="INCIDENT"),
+                name="unique_incident_subscriber_email",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.email} ({self.scope})"
 
@@ -109,6 +134,11 @@ class ActionItem(models.Model):
     due_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=16, choices=Status.choices, default=Status.OPEN)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "due_date"]),
+        ]
+
     def __str__(self) -> str:
         return f"{self.title} ({self.get_status_display()})"
 
@@ -130,6 +160,32 @@ class AuditEvent(models.Model):
         return f"{self.action} by {self.actor_name}"
 
 
+class NotificationMessage(models.Model):
+    """Rendered notification content, stored once and shared by every delivery."""
+
+    class Priority(models.TextChoices):
+        CRITICAL = "critical", "Critical"
+        NORMAL = "normal", "Normal"
+        BULK = "bulk", "Bulk"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    incident = models.ForeignKey(
+        Incident,
+        related_name="notification_messages",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    event = models.CharField(max_length=64, blank=True, default="")
+    priority = models.CharField(max_length=16, choices=Priority.choices, default=Priority.NORMAL)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.subject
+
+
 class EmailDelivery(models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
@@ -140,13 +196,18 @@ class EmailDelivery(models.Model):
     incident = models.ForeignKey(
         Incident, related_name="email_deliveries", on_delete=models.SET_NULL, null=True, blank=True
     )
+    message = models.ForeignKey(
+        NotificationMessage, related_name="deliveries", on_delete=models.PROTECT
+    )
     subscriber_email = models.EmailField()
-    subject = models.CharField(max_length=255)
-    body = models.TextField()
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     attempts = models.PositiveIntegerField(default=0)
     last_error = models.TextField(blank=True, default="")
     last_attempt_at = models.DateTimeField(null=True, blank=True)
+    # Set while a send task holds the row (claimed at `last_attempt_at`); see tasks._claim.
+    claim_token = models.UUIDField(null=True, blank=True)
+    # When the task last scheduled for this row is due; the stale sweeper waits past it.
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
     sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -160,6 +221,59 @@ class EmailDelivery(models.Model):
         return f"EmailDelivery to {self.subscriber_email} ({self.status})"
 
 
+class EmailDeliveryArchive(models.Model):
+    """
+    Finished deliveries of one notification, moved out of the hot table by the retention
+    job. Rows are stored as zlib-compressed JSON lines together with the message content,
+    so the original `NotificationMessage` can be deleted once nothing references it.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    incident_id = models.UUIDField(null=True, blank=True, db_index=True)
+    message_id = models.UUIDField(db_index=True)
+    event = models.CharField(max_length=64, blank=True, default="")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    delivery_count = models.PositiveIntegerField()
+    sent_count = models.PositiveIntegerField()
+    failed_count = models.PositiveIntegerField()
+    first_created_at = models.DateTimeField()
+    last_created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    deliveries = models.BinaryField()
+
+    def __str__(self) -> str:
+        return f"Archive of {self.delivery_count} deliveries for {self.subject}"
+
+
+class DigestEntry(models.Model):
+    """A notification held back in digest mode until the next flush for its incident."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    incident = models.ForeignKey(
+        Incident, related_name="digest_entries", on_delete=models.CASCADE
+    )
+    event = models.CharField(max_length=64)
+    update = models.ForeignKey(
+        IncidentUpdate,
+        related_name="digest_entries",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    flushed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("created_at",)
+        indexes = [
+            models.Index(fields=["flushed_at", "incident", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event} digest entry for {self.incident_id}"
+
+
 class IdempotencyKey(models.Model):
     key = models.CharField(max_length=128, unique=True)
     method = models.CharField(max_length=10)
@@ -175,3 +289,102 @@ class IdempotencyKey(models.Model):
 
     def __str__(self) -> str:
         return f"{self.method} {self.path} ({self.key})"
+
+
+class DailyUptime(models.Model):
+    date = models.DateField(unique=True)
+    worst_severity = models.CharField(
+        max_length=8, choices=Incident.Severity.choices, blank=True, default=""
+    )
+    outage_minutes = models.PositiveIntegerField(default=0)
+    incident_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("date",)
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.outage_minutes} min ({self.worst_severity or 'operational'})"
+
+
+class StatusPageViews(models.Model):
+    """Public status page views per local day, flushed in batches by `services.page_views`."""
+
+    date = models.DateField(unique=True)
+    views = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ("date",)
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.views} views"
+
+
+class ResolutionSketch(models.Model):
+    """
+    DDSketch of resolution times (hours) for incidents resolved in one week, per
+    severity and visibility. Sketches merge, so percentiles for any combination of
+    cells are answered without loading individual durations.
+    """
+
+    week = models.DateField()
+    severity = models.CharField(max_length=8, choices=Incident.Severity.choices)
+    is_public = models.BooleanField()
+    count = models.IntegerField(default=0)
+    sketch = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["week", "severity", "is_public"], name="unique_resolution_sketch_cell"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        visibility = "public" if self.is_public else "internal"
+        return f"{self.severity} {visibility} resolutions, week of {self.week}"
+
+
+class MetricRollup(models.Model):
+    """
+    Pre-aggregated counter for one metric in one hour or day bucket. Incident and
+    delivery rows are bucketed by creation time and keyed by their *current* status,
+    so status changes move counts between rows; resolutions are bucketed by
+    resolution time. `services.rollups` keeps these in step with the source tables;
+    acknowledgement and time-in-status cells are written by `services.time_in_status`.
+    """
+
+    class Grain(models.TextChoices):
+        HOUR = "HOUR", "Hour"
+        DAY = "DAY", "Day"
+
+    class Metric(models.TextChoices):
+        INCIDENTS = "INCIDENTS", "Incidents opened"
+        RESOLUTIONS = "RESOLUTIONS", "Incidents resolved"
+        RESOLUTION_SECONDS = "RESOLUTION_SECONDS", "Resolution time (seconds)"
+        SUBSCRIBERS = "SUBSCRIBERS", "Subscriber signups"
+        DELIVERIES = "DELIVERIES", "Email deliveries"
+        ACKNOWLEDGEMENTS = "ACKNOWLEDGEMENTS", "Incidents acknowledged"
+        ACKNOWLEDGE_SECONDS = "ACKNOWLEDGE_SECONDS", "Time to acknowledge (seconds)"
+        STATUS_STAYS = "STATUS_STAYS", "Status stays ended"
+        STATUS_SECONDS = "STATUS_SECONDS", "Time in status (seconds)"
+
+    grain = models.CharField(max_length=4, choices=Grain.choices)
+    metric = models.CharField(max_length=32, choices=Metric.choices)
+    bucket_start = models.DateTimeField()
+    severity = models.CharField(max_length=8, blank=True, default="")
+    visibility = models.CharField(max_length=8, blank=True, default="")
+    status = models.CharField(max_length=32, blank=True, default="")
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["grain", "metric", "bucket_start", "severity", "visibility", "status"],
+                name="unique_metric_rollup_cell",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.metric} {self.grain.lower()} {self.bucket_start:%Y-%m-%d %H:%M}: {self.value}"
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+
+import numpy as np
+from django.db.models import Q
+
+from incidents.models import Incident
+
+SEVERITIES = tuple(Incident.Severity.values)
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+# Resolution-time histogram edges in hours; the last bin is open-ended.
+DEFAULT_HISTOGRAM_HOURS = (0, 1, 2, 4, 8, 12, 24, 48, 72, 168)
+LOAD_CHUNK_SIZE = 10000
+SECONDS_PER_HOUR = 3600.0
+
+
+@dataclass
+class IncidentFrame:
+    """
+    Column arrays for a set of incidents, for offline reporting over years of data.
+
+    Times are float64 epoch seconds (`resolved` is NaN while open), severity is an
+    int8 index into `SEVERITIES`. Every computation below is vectorized, so reports over
+    millions of incidents cost a few sorts and `bincount`s rather than Python loops.
+    """
+
+    created: np.ndarray
+    resolved: np.ndarray
+    severity: np.ndarray
+    is_public: np.ndarray
+
+    @classmethod
+    def load(cls, start: datetime | None = None, end: datetime | None = None) -> "IncidentFrame":
+        """
+        Fetch the incidents overlapping `[start, end)` (all of them by default) in one
+        query, streamed in chunks straight into preallocated arrays.
+        """
+        incidents = Incident.objects.all()
+        if end is not None:
+            incidents = incidents.filter(created_at__lt=end)
+        if start is not None:
+            incidents = incidents.filter(Q(resolved_at__isnull=True) | Q(resolved_at__gte=start))
+        total = incidents.count()
+        codes = {severity: index for index, severity in enumerate(SEVERITIES)}
+        created = np.empty(total, dtype=np.float64)
+        resolved = np.full(total, np.nan, dtype=np.float64)
+        severity = np.empty(total, dtype=np.int8)
+        is_public = np.empty(total, dtype=bool)
+
+        rows = incidents.order_by().values_list("created_at", "resolved_at", "severity", "is_public")
+        count = 0
+        for index, (created_at, resolved_at, level, public) in enumerate(
+            rows.iterator(chunk_size=LOAD_CHUNK_SIZE)
+        ):
+            if index >= total:
+                break  # rows created after the count; the report is a point-in-time view
+            created[index] = created_at.timestamp()
+            if resolved_at is not None:
+                resolved[index] = resolved_at.timestamp()
+            severity[index] = codes[level]
+            is_public[index] = public
+            count = index + 1
+        return cls(created[:count], resolved[:count], severity[:count], is_public[:count])
+
+    @classmethod
+    def synthetic(
+        cls, size: int, start: datetime, end: datetime, seed: int = 0, open_ratio: float = 0.02
+    ) -> "IncidentFrame":
+        """Random incidents opened across `[start, end)`, for benchmarks and tests."""
+        rng = np.random.default_rng(seed)
+        created = rng.uniform(start.timestamp(), end.timestamp(), size)
+        durations = rng.lognormal(mean=1.0, sigma=1.2, size=size) * SECONDS_PER_HOUR
+        resolved = created + durations
+        resolved[(rng.random(size) < open_ratio) | (resolved > end.timestamp())] = np.nan
+        severity = rng.choice(len(SEVERITIES), size=size, p=(0.05, 0.15, 0.4, 0.4)).astype(np.int8)
+        is_public = rng.random(size) < 0.7
+        return cls(created, resolved, severity, is_public)
+
+    def __len__(self) -> int:
+        return len(self.created)
+
+    def subset(self, mask: np.ndarray) -> "IncidentFrame":
+        return IncidentFrame(
+            self.created[mask], self.resolved[mask], self.severity[mask], self.is_public[mask]
+        )
+
+    def _mask(self, is_public: bool | None = None, severity: str | None = None) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if is_public is not None:
+            mask &= self.is_public == is_public
+        if severity is not None:
+            mask &= self.severity == SEVERITIES.index(severity)
+        return mask
+
+    def durations_hours(self, is_public: bool | None = None, severity: str | None = None) -> np.ndarray:
+        mask = self._mask(is_public, severity) & ~np.isnan(self.resolved)
+        return (self.resolved[mask] - self.created[mask]) / SECONDS_PER_HOUR
+
+    def open_at(self, points: Sequence[float]) -> np.ndarray:
+        """Incidents open at each epoch second in `points` (created <= p <= resolved)."""
+        points = np.asarray(points, dtype=np.float64)
+        created = np.sort(self.created)
+        resolved = np.sort(self.resolved[~np.isnan(self.resolved)])
+        opened = np.searchsorted(created, points, side="right")
+        closed = np.searchsorted(resolved, points, side="left")
+        return opened - closed
+
+    def counts_by_bucket(self, edges: Sequence[float], times: np.ndarray | None = None) -> np.ndarray:
+        """Count of `times` (default: created) in each `[edges[i], edges[i + 1])` bucket."""
+        times = self.created if times is None else times
+        edges = np.asarray(edges, dtype=np.float64)
+        index = np.searchsorted(edges, times, side="right") - 1
+        index = index[(index >= 0) & (index < len(edges) - 1)]
+        return np.bincount(index, minlength=len(edges) - 1)
+
+    def mttr_by_bucket(self, edges: Sequence[float], is_public: bool | None = None) -> np.ndarray:
+        """Mean resolution time in hours per resolution-time bucket (NaN where none resolved)."""
+        edges = np.asarray(edges, dtype=np.float64)
+        mask = self._mask(is_public) & ~np.isnan(self.resolved)
+        resolved = self.resolved[mask]
+        index = np.searchsorted(edges, resolved, side="right") - 1
+        inside = (index >= 0) & (index < len(edges) - 1)
+        hours = (resolved - self.created[mask]) / SECONDS_PER_HOUR
+        buckets = len(edges) - 1
+        counts = np.bincount(index[inside], minlength=buckets)
+        sums = np.bincount(index[inside], weights=hours[inside], minlength=buckets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    def resolution_histogram(
+        self, edges_hours: Sequence[float] = DEFAULT_HISTOGRAM_HOURS
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Resolution-time histogram; values past the last edge land in an open-ended bin."""
+        edges = np.append(np.asarray(edges_hours, dtype=np.float64), np.inf)
+        counts, _ = np.histogram(self.durations_hours(), bins=edges)
+        return counts, edges
+
+    def percentiles(
+        self, percentiles: Sequence[float] = DEFAULT_PERCENTILES, **filters
+    ) -> dict[str, float | None]:
+        """Exact resolution-time percentiles in hours (linear interpolation)."""
+        durations = self.durations_hours(**filters)
+        if not len(durations):
+            return {f"p{p:g}": None for p in percentiles}
+        values = np.percentile(durations, percentiles)
+        return {f"p{p:g}": round(float(value), 2) for p, value in zip(percentiles, values)}
+
+    def severity_counts(self, mask: np.ndarray | None = None) -> dict[str, int]:
+        codes = self.severity if mask is None else self.severity[mask]
+        counts = np.bincount(codes, minlength=len(SEVERITIES))
+        return {severity: int(count) for severity, count in zip(SEVERITIES, counts)}
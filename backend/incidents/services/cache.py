@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+_MISSING = object()
+# Misses (e.g. an unknown or private incident id) are cached briefly so probing
+# URLs can't pin entries for the full payload TTL.
+EMPTY_RESULT_TTL = 30  # seconds
+
+
+class LocalLRUCache:
+    """
+    Bounded per-process LRU with per-entry expiry.
+
+    Sits in front of the shared Django cache so hot public reads never leave the worker.
+    Entries are only ever looked up by versioned keys, so a version bump makes them
+    unreachable and they age out of the LRU naturally.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+local_cache = LocalLRUCache(max_entries=getattr(settings, "LOCAL_CACHE_MAX_ENTRIES", 512))
+
+
+def _version_key(scope: str) -> str:
+    return f"cache_version:{scope}"
+
+
+def _initial_version() -> int:
+    # Seed from the clock rather than 1 so a version key that was evicted (or flushed)
+    # never restarts at a number an older cached entry was stored under.
+    return time.time_ns() // 1000
+
+
+def get_version(scope: str) -> int:
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=settings.CACHE_VERSION_TTL)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(scope: str) -> int:
+    """Invalidate every entry stored under `scope` with a single counter increment."""
+    key = _version_key(scope)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, timeout=settings.CACHE_VERSION_TTL)
+        return version
+
+
+def get_or_set(scope: str, key: str, builder: Callable[[], Any], timeout: float) -> Any:
+    """
+    Return the cached value for `key` under the current version of `scope`,
+    checking the local LRU first, then the shared cache, then calling `builder`.
+    A None result is kept for at most `EMPTY_RESULT_TTL` seconds.
+    """
+    versioned_key = f"{scope}:v{get_version(scope)}:{key}"
+
+    value = local_cache.get(versioned_key)
+    if value is not _MISSING:
+        return value
+
+    value = cache.get(versioned_key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        if value is None:
+            timeout = min(timeout, EMPTY_RESULT_TTL)
+        cache.set(versioned_key, value, timeout)
+    elif value is None:
+        timeout = min(timeout, EMPTY_RESULT_TTL)
+
+    local_cache.set(versioned_key, value, timeout)
+    return value
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from incidents.models import EmailDelivery, EmailDeliveryArchive, NotificationMessage
+from incidents.services import notifications
+
+DELETE_CHUNK_SIZE = 500
+ARCHIVED_FIELDS = (
+    "id",
+    "subscriber_email",
+    "status",
+    "attempts",
+    "last_error",
+    "last_attempt_at",
+    "sent_at",
+    "created_at",
+)
+
+
+def sweep_stale_pending(now: datetime | None = None) -> int:
+    """
+    Re-dispatch PENDING deliveries whose task looks lost: nothing has attempted them,
+    and the task last scheduled for them was due, for at least
+    `EMAIL_STALE_PENDING_SECONDS`. Returns the number re-dispatched.
+
+    The range scan rides the (status, created_at) index, oldest first, and is capped at
+    `EMAIL_SWEEP_MAX_DELIVERIES` per run. Rows still waiting out a paced countdown are
+    left alone because `dispatch_deliveries` stamps `next_attempt_at`. If a presumed-lost
+    task turns up after all, it and the re-dispatched one race for the row's claim (see
+    `tasks._claim`), so only one of them sends it.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.EMAIL_STALE_PENDING_SECONDS)
+    stale = list(
+        EmailDelivery.objects.filter(status=EmailDelivery.Status.PENDING, created_at__lt=cutoff)
+        .filter(Q(last_attempt_at__isnull=True) | Q(last_attempt_at__lt=cutoff))
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lt=cutoff))
+        .order_by("created_at")
+        .values_list("id", "subscriber_email", "message__priority")[
+            : settings.EMAIL_SWEEP_MAX_DELIVERIES
+        ]
+    )
+    by_priority: dict[str, list[EmailDelivery]] = defaultdict(list)
+    for pk, email, priority in stale:
+        by_priority[priority].append(EmailDelivery(id=pk, subscriber_email=email))
+    batch_size = settings.EMAIL_DELIVERY_BATCH_SIZE
+    for priority, deliveries in by_priority.items():
+        for start in range(0, len(deliveries), batch_size):
+            notifications.dispatch_deliveries(deliveries[start : start + batch_size], priority)
+    return len(stale)
+
+
+def _archive_message_deliveries(message_id, finished) -> int:
+    with transaction.atomic():
+        message = NotificationMessage.objects.select_for_update().filter(pk=message_id).first()
+        if message is None:
+            return 0
+        rows = list(
+            finished.filter(message_id=message_id).order_by("created_at").values(*ARCHIVED_FIELDS)
+        )
+        if not rows:
+            return 0
+        payload = "\n".join(json.dumps(row, cls=DjangoJSONEncoder) for row in rows)
+        EmailDeliveryArchive.objects.create(
+            incident_id=message.incident_id,
+            message_id=message.id,
+            event=message.event,
+            subject=message.subject,
+            body=message.body,
+            delivery_count=len(rows),
+            sent_count=sum(row["status"] == EmailDelivery.Status.SENT for row in rows),
+            failed_count=sum(row["status"] == EmailDelivery.Status.FAILED for row in rows),
+            first_created_at=rows[0]["created_at"],
+            last_created_at=rows[-1]["created_at"],
+            deliveries=zlib.compress(payload.encode("utf-8")),
+        )
+        # Delete exactly what was archived, never rows that finished since the read.
+        ids = [row["id"] for row in rows]
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            EmailDelivery.objects.filter(pk__in=ids[start : start + DELETE_CHUNK_SIZE]).delete()
+        if not message.deliveries.exists():
+            message.delete()
+    return len(rows)
+
+
+def archive_finished_deliveries(now: datetime | None = None, days: int | None = None) -> int:
+    """
+    Move SENT/FAILED deliveries older than the retention window into
+    `EmailDeliveryArchive`, one compressed row per notification message, so the hot
+    table stays bounded. Returns the number of deliveries archived.
+
+    Each message is archived in its own transaction; at most
+    `EMAIL_ARCHIVE_MAX_MESSAGES` messages are handled per run.
+    """
+    now = now or timezone.now()
+    days = settings.EMAIL_DELIVERY_RETENTION_DAYS if days is None else days
+    finished = EmailDelivery.objects.filter(
+        status__in=[EmailDelivery.Status.SENT, EmailDelivery.Status.FAILED],
+        created_at__lt=now - timedelta(days=days),
+    )
+    message_ids = list(
+        finished.order_by().values_list("message_id", flat=True).distinct()[
+            : settings.EMAIL_ARCHIVE_MAX_MESSAGES
+        ]
+    )
+    return sum(_archive_message_deliveries(message_id, finished) for message_id in message_ids)
+
+
+def archived_deliveries(archive: EmailDeliveryArchive) -> list[dict]:
+    """Decode an archive row back into the delivery dicts it was built from."""
+    payload = zlib.decompress(bytes(archive.deliveries)).decode("utf-8")
+    return [json.loads(line) for line in payload.splitlines()]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import re
+import smtplib
+import time
+from collections import defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from incidents.models import NotificationMessage
+
+BUCKET_STATE_TTL = 60 * 60  # seconds; idle buckets are full again long before this
+LOCK_TIMEOUT = 5  # seconds
+LOCK_WAIT = 0.01  # seconds
+
+_RETRY_HINT = re.compile(r"(?:retry|try again)\D{0,20}?(\d+)\s*(?:s\b|sec|second)", re.IGNORECASE)
+_RATE_LIMITED = re.compile(r"rate|limit|too many|throttl", re.IGNORECASE)
+
+
+def domain_of(email: str) -> str:
+    return email.rpartition("@")[2].strip().lower()
+
+
+def limit_for(domain: str) -> tuple[float, int]:
+    """Return `(messages per second, burst)` for a recipient domain."""
+    return settings.EMAIL_DOMAIN_RATE_LIMITS.get(
+        domain,
+        (settings.EMAIL_DOMAIN_DEFAULT_RATE, settings.EMAIL_DOMAIN_DEFAULT_BURST),
+    )
+
+
+def group_by_domain(emails: Iterable[tuple[str, str]]) -> dict[str, list[str]]:
+    """Group `(key, email)` pairs into `{domain: [key, ...]}`, preserving order."""
+    grouped: dict[str, list[str]] = defaultdict(list)
+    for key, email in emails:
+        grouped[domain_of(email)].append(key)
+    return dict(grouped)
+
+
+def _bucket_key(domain: str, priority: str | None = None) -> str:
+    return f"email_bucket:{domain}:{priority}" if priority else f"email_bucket:{domain}"
+
+
+def _deferral_key(domain: str) -> str:
+    return f"email_deferred:{domain}"
+
+
+def _acquire(lock_key: str) -> None:
+    # The lock expires after LOCK_TIMEOUT, so even a holder that died can't keep us out
+    # past that; failing to get it by then means the cache itself is misbehaving.
+    deadline = time.monotonic() + LOCK_TIMEOUT + 1
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Timed out waiting for {lock_key}")
+        time.sleep(LOCK_WAIT)
+
+
+def deferred_for(domain: str, now: float | None = None) -> float:
+    """Seconds until a provider-requested pause on `domain` ends (0 if none)."""
+    now = time.time() if now is None else now
+    until = cache.get(_deferral_key(domain))
+    return max(0.0, until - now) if until else 0.0
+
+
+def deferred_domains(domains: Iterable[str], now: float | None = None) -> dict[str, float]:
+    """Return `{domain: seconds remaining}` for the domains currently paused, in one lookup."""
+    now = time.time() if now is None else now
+    keys = {_deferral_key(domain): domain for domain in set(domains)}
+    paused = {}
+    for key, until in cache.get_many(list(keys)).items():
+        if until and until > now:
+            paused[keys[key]] = until - now
+    return paused
+
+
+def defer(domain: str, seconds: float, now: float | None = None) -> None:
+    """Pause all sends to `domain` for `seconds`, never shortening an existing pause."""
+    now = time.time() if now is None else now
+    until = now + seconds
+    current = cache.get(_deferral_key(domain))
+    if current is None or current < until:
+        cache.set(_deferral_key(domain), until, int(seconds) + 1)
+
+
+def _charge(key: str, count: int, rate: float, burst: int, start: float, now: float) -> float:
+    tokens, updated_at = cache.get(key, (float(burst), start))
+    if updated_at < start:
+        tokens = min(float(burst), tokens + (start - updated_at) * rate)
+        updated_at = start
+    tokens -= count
+    cache.set(key, (tokens, updated_at), BUCKET_STATE_TTL)
+    return max(0.0, updated_at - now) + max(0.0, -tokens) / rate
+
+
+def reserve(domain: str, count: int, now: float | None = None, priority: str | None = None) -> float:
+    """
+    Reserve `count` sends against the domain's token bucket and return how many seconds
+    the caller must wait before sending them as one burst.
+
+    Tokens refill at `rate` per second up to `burst`. Reservations may drive the bucket
+    negative, which is what queues later batches behind earlier ones, so callers should
+    keep `count` at or below the burst size. While a domain is deferred the bucket's
+    clock starts at the end of the pause, so queued batches stay spaced out instead of
+    all firing the moment it lifts.
+
+    Critical mail pre-empts the queue: it is charged to the shared bucket, so later
+    normal and bulk batches make room for it, but its own wait comes from a separate
+    critical-only bucket and never includes a bulk backlog. Provider pauses still apply.
+
+    Bucket state lives in the shared cache so every web and worker process paces against
+    the same budget; the update is guarded by a short `cache.add` lock, waited for rather
+    than skipped, so concurrent reservations never overwrite each other.
+    """
+    now = time.time() if now is None else now
+    rate, burst = limit_for(domain)
+    start = now + deferred_for(domain, now)
+    key = _bucket_key(domain)
+    lock_key = f"{key}:lock"
+    _acquire(lock_key)
+    try:
+        wait = _charge(key, count, rate, burst, start, now)
+        if priority == NotificationMessage.Priority.CRITICAL:
+            wait = _charge(_bucket_key(domain, priority), count, rate, burst, start, now)
+    finally:
+        cache.delete(lock_key)
+    return wait
+
+
+def deferral_hint(exc: Exception) -> float | None:
+    """
+    Return how long to pause a domain after `exc`, or None if the failure isn't the
+    domain telling us to back off.
+
+    Only connection- and rate-level replies pause the whole domain: SMTP 421 (service
+    unavailable), 4xx replies that say they are rate limiting ("rate limited", "too
+    many ...", "throttled"), and API errors with a `retry_after` attribute. Other 4xx
+    replies, such as a full or busy mailbox, concern one recipient, who is retried on
+    their own. A "retry in N seconds" hint in the reply text overrides the default pause.
+    """
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        return float(retry_after)
+
+    replies: list[tuple[int, bytes | str]] = []
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        replies = list(exc.recipients.values())
+    elif isinstance(exc, smtplib.SMTPResponseException):
+        replies = [(exc.smtp_code, exc.smtp_error)]
+    backoff = []
+    for code, text in replies:
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", errors="replace")
+        if code == 421 or (400 <= code < 500 and _RATE_LIMITED.search(text)):
+            backoff.append(text)
+    if not backoff:
+        return None
+    for text in backoff:
+        match = _RETRY_HINT.search(text)
+        if match:
+            return float(match.group(1))
+    return float(settings.EMAIL_DOMAIN_DEFER_SECONDS)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import structlog
+from django.conf import settings
+from django.db import connections
+
+logger = structlog.get_logger(__name__)
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=getattr(settings, "TASK_EXECUTOR_THREADS", 4),
+                thread_name_prefix="incident-tasks",
+            )
+        return _EXECUTOR
+
+
+def _run_in_thread(task, args: tuple, kwargs: dict):
+    try:
+        result = task.apply(args=args, kwargs=kwargs)
+        # `apply` stores a task's exception on the result instead of raising it, and
+        # nobody waits on these futures, so report it here.
+        if result.failed():
+            logger.error(
+                "task_failed",
+                task=task.name,
+                error=repr(result.result),
+                traceback=result.traceback,
+            )
+        return result
+    finally:
+        # Worker threads get their own DB connections; don't leak them.
+        connections.close_all()
+
+
+def submit(task, *args, queue: str | None = None, **kwargs) -> Future | object:
+    """
+    Dispatch a Celery task according to `TASK_EXECUTOR`.
+
+    - "celery" (default): `apply_async`, which runs inline when `CELERY_TASK_ALWAYS_EAGER`
+      is on and goes to the broker otherwise. `queue` overrides the task's route.
+    - "thread": run the task in a local thread pool so dev setups without a broker don't
+      hold the web request open while recipients are resolved and SMTP is spoken.
+    """
+    if getattr(settings, "TASK_EXECUTOR", "celery") == "thread":
+        return _get_thread_pool().submit(_run_in_thread, task, args, kwargs)
+    options = {"queue": queue} if queue else {}
+    return task.apply_async(args=args, kwargs=kwargs, **options)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+from datetime import date, datetime, time
+
+from django.db.models import Max
+from django.utils import timezone
+
+from incidents.models import Incident
+from incidents.serializers import IncidentSerializer
+from incidents.services import cache as two_tier_cache
+from incidents.services.public import render_cached_payload
+
+HISTORY_PAGE_SIZE = 50
+CURRENT_MONTH_TTL = 60  # seconds
+CLOSED_MONTH_TTL = 60 * 60 * 24 * 30
+# Closed months only change if an old incident is edited or reopened, which bumps
+# the month's version server-side; browsers/CDNs may keep their copy for a day.
+CLOSED_MONTH_HTTP_MAX_AGE = 60 * 60 * 24
+
+
+def parse_month(value: str) -> date:
+    """Parse `YYYY-MM` into the first day of that month, raising ValueError otherwise."""
+    parsed = datetime.strptime(value, "%Y-%m")
+    return date(parsed.year, parsed.month, 1)
+
+
+def format_month(month: date) -> str:
+    return month.strftime("%Y-%m")
+
+
+def current_month() -> date:
+    today = timezone.now().date()
+    return date(today.year, today.month, 1)
+
+
+def shift_month(month: date, delta: int) -> date:
+    index = month.year * 12 + (month.month - 1) + delta
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def is_closed_month(month: date) -> bool:
+    return month < current_month()
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(month, time.min), tz)
+    end = timezone.make_aware(datetime.combine(shift_month(month, 1), time.min), tz)
+    return start, end
+
+
+def history_cache_scope(month: date) -> str:
+    return f"public_history:{format_month(month)}"
+
+
+def _resolved_public_incidents():
+    return Incident.objects.filter(
+        is_public=True,
+        status=Incident.Status.RESOLVED,
+        resolved_at__isnull=False,
+    )
+
+
+def _month_incidents(month: date):
+    start, end = month_bounds(month)
+    return _resolved_public_incidents().filter(resolved_at__gte=start, resolved_at__lt=end)
+
+
+def _build_month_page(month: date, page: int) -> dict:
+    start, _ = month_bounds(month)
+    month_incidents = _month_incidents(month)
+    total = month_incidents.count()
+    num_pages = max(1, math.ceil(total / HISTORY_PAGE_SIZE))
+    offset = (page - 1) * HISTORY_PAGE_SIZE
+    incidents = list(month_incidents.order_by("-resolved_at")[offset : offset + HISTORY_PAGE_SIZE])
+
+    previous_resolved = _resolved_public_incidents().filter(resolved_at__lt=start).aggregate(
+        latest=Max("resolved_at")
+    )["latest"]
+    previous_month = None
+    if previous_resolved is not None:
+        local = timezone.localtime(previous_resolved)
+        previous_month = format_month(date(local.year, local.month, 1))
+    next_month = format_month(shift_month(month, 1)) if is_closed_month(month) else None
+
+    return render_cached_payload(
+        {
+            "month": format_month(month),
+            "closed": is_closed_month(month),
+            "previous_month": previous_month,
+            "next_month": next_month,
+            "page": page,
+            "num_pages": num_pages,
+            "count": total,
+            "incidents": list(IncidentSerializer(incidents, many=True).data),
+        }
+    )
+
+
+def get_month_archive(month: date, page: int = 1) -> dict | None:
+    """
+    Return `{"data": ..., "etag": ...}` for one page of resolved public incidents in
+    `month`, or None past the month's last page.
+
+    Closed months are kept in the shared cache for weeks; the current month expires quickly
+    and is also invalidated by the incident services. The page count is cached alongside,
+    so out-of-range pages are turned away without a cache entry of their own.
+    """
+    ttl = CLOSED_MONTH_TTL if is_closed_month(month) else CURRENT_MONTH_TTL
+    scope = history_cache_scope(month)
+    num_pages = two_tier_cache.get_or_set(
+        scope,
+        "num_pages",
+        lambda: max(1, math.ceil(_month_incidents(month).count() / HISTORY_PAGE_SIZE)),
+        ttl,
+    )
+    if page > num_pages:
+        return None
+    return two_tier_cache.get_or_set(
+        scope,
+        f"page:{page}",
+        lambda: _build_month_page(month, page),
+        ttl,
+    )
+
+
+def invalidate_for_incident(incident: Incident, previous_resolved_at: datetime | None = None) -> None:
+    """Bump the current month's archive plus any month the incident was resolved in."""
+    months = {current_month()}
+    for resolved_at in (incident.resolved_at, previous_resolved_at):
+        if resolved_at is not None:
+            local = timezone.localtime(resolved_at)
+            months.add(date(local.year, local.month, 1))
+    for month in months:
+        two_tier_cache.bump_version(history_cache_scope(month))
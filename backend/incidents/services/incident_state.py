@@ -7,7 +7,19 @@ from django.utils import timezone
 
 from incidents.models import AuditEvent, Incident, IncidentUpdate
 
-from . import notifications, sse, status as status_service
+from . import (
+    history as history_service,
+    metrics_snapshot,
+    notifications,
+    public as public_service,
+    rollups,
+    sketches,
+    sse,
+    static_status,
+    status as status_service,
+    time_in_status,
+    uptime as uptime_service,
+)
 
 ALLOWED_TRANSITIONS = {
     Incident.Status.INVESTIGATING: {
@@ -24,6 +36,12 @@ ALLOWED_TRANSITIONS = {
 }
 
 
+def lock_incident(incident: Incident) -> Incident:
+    """Lock the incident's row for the current transaction and reload `incident` from it."""
+    incident.refresh_from_db(from_queryset=Incident.objects.select_for_update())
+    return incident
+
+
 def transition_incident(
     incident: Incident,
     new_status: str,
@@ -40,23 +58,31 @@ def transition_incident(
     if new_status not in Incident.Status.values:
         raise ValueError(f"Unsupported status: {new_status}")
 
-    if incident.status == new_status:
-        raise ValueError("Incident is already in the requested status")
+    with transaction.atomic():
+        # Validate and count against the committed row, not the caller's copy, so two
+        # concurrent transitions can't both move the same counters.
+        lock_incident(incident)
+        if incident.status == new_status:
+            raise ValueError("Incident is already in the requested status")
 
-    allowed = ALLOWED_TRANSITIONS.get(incident.status, set())
-    if new_status not in allowed:
-        raise ValueError(f"Cannot transition from {incident.status} to {new_status}")
+        allowed = ALLOWED_TRANSITIONS.get(incident.status, set())
+        if new_status not in allowed:
+            raise ValueError(f"Cannot transition from {incident.status} to {new_status}")
 
-    previous_status = incident.status
+        previous_status = incident.status
+        previous_resolved_at = incident.resolved_at
+        previous_resolution = sketches.snapshot(incident)
+        previous_counts = rollups.snapshot(incident)
 
-    with transaction.atomic():
         incident.status = new_status
-        incident.updated_at = timezone.now()
+        incident.updated_at = incident.last_activity_at = timezone.now()
         if new_status == Incident.Status.RESOLVED:
             incident.resolved_at = incident.resolved_at or timezone.now()
         else:
             incident.resolved_at = None
-        incident.save(update_fields=["status", "updated_at", "resolved_at"])
+        incident.save(update_fields=["status", "updated_at", "last_activity_at", "resolved_at"])
+        sketches.record_resolution_change(previous_resolution, incident)
+        rollups.record_incident_change(previous_counts, incident)
 
         body = message or f"Status changed to {Incident.Status(new_status).label}"
         update = IncidentUpdate.objects.create(
@@ -65,6 +91,7 @@ def transition_incident(
             status_at_time=new_status,
             created_by_name=actor_name,
         )
+        time_in_status.record_update(update)
 
         AuditEvent.objects.create(
             actor_name=actor_name,
@@ -77,6 +104,11 @@ def transition_incident(
             notifications.notify_status_changed(incident, update)
             sse.broadcast_incident_status_changed(incident, update)
             status_service.invalidate_public_status_cache()
+            public_service.invalidate_public_incident(incident.id)
+            history_service.invalidate_for_incident(incident, previous_resolved_at)
+            uptime_service.refresh_for_incident(incident, previous_resolved_at)
+            static_status.request_publish()
+            metrics_snapshot.mark_stale()
 
         transaction.on_commit(after_commit)
 
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
 from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from incidents.models import AuditEvent, Incident, IncidentUpdate
-from incidents.services import notifications, sse, status as status_service
+from incidents.services import (
+    history as history_service,
+    metrics_snapshot,
+    notifications,
+    public as public_service,
+    rollups,
+    sketches,
+    sse,
+    static_status,
+    status as status_service,
+    time_in_status,
+    uptime as uptime_service,
+)
+from incidents.services.incident_state import lock_incident
 from incidents.services.incident_state import transition_incident as transition_service
 
 
 def create_incident(*, data: dict) -> Incident:
     with transaction.atomic():
-        incident = Incident.objects.create(**data)
+        incident = Incident.objects.create(
+            **data, initial_status=data.get("status", Incident.Status.INVESTIGATING)
+        )
+        sketches.record_resolution_change(None, incident)
+        rollups.record_incident_change(None, incident)
         AuditEvent.objects.create(
             actor_name=incident.created_by_name,
             action="INCIDENT_CREATED",
@@ -22,6 +41,9 @@ def create_incident(*, data: dict) -> Incident:
             notifications.notify_incident_created(incident)
             sse.broadcast_incident_created(incident)
             status_service.invalidate_public_status_cache()
+            uptime_service.refresh_for_incident(incident)
+            static_status.request_publish()
+            metrics_snapshot.mark_stale()
 
         transaction.on_commit(after_commit)
     return incident
@@ -29,6 +51,10 @@ def create_incident(*, data: dict) -> Incident:
 
 def update_incident_partial(*, incident: Incident, data: dict, actor_name: str) -> Incident:
     with transaction.atomic():
+        lock_incident(incident)
+        previous_resolved_at = incident.resolved_at
+        previous_resolution = sketches.snapshot(incident)
+        previous_counts = rollups.snapshot(incident)
         for field, value in data.items():
             setattr(incident, field, value)
         incident.updated_at = timezone.now()
@@ -38,6 +64,9 @@ def update_incident_partial(*, incident: Incident, data: dict, actor_name: str)
             elif data["status"] != Incident.Status.RESOLVED:
                 incident.resolved_at = None
         incident.save()
+        sketches.record_resolution_change(previous_resolution, incident)
+        rollups.record_incident_change(previous_counts, incident)
+        time_in_status.record_incident_change(previous_counts, incident)
 
         AuditEvent.objects.create(
             actor_name=actor_name,
@@ -49,6 +78,11 @@ def update_incident_partial(*, incident: Incident, data: dict, actor_name: str)
         def after_commit():
             sse.broadcast_incident_updated(incident)
             status_service.invalidate_public_status_cache()
+            public_service.invalidate_public_incident(incident.id)
+            history_service.invalidate_for_incident(incident, previous_resolved_at)
+            uptime_service.refresh_for_incident(incident, previous_resolved_at)
+            static_status.request_publish()
+            metrics_snapshot.mark_stale()
 
         transaction.on_commit(after_commit)
     return incident
@@ -56,14 +90,15 @@ def update_incident_partial(*, incident: Incident, data: dict, actor_name: str)
 
 def post_update(*, incident: Incident, data: dict) -> IncidentUpdate:
     with transaction.atomic():
-        incident.updated_at = timezone.now()
-        incident.save(update_fields=["updated_at"])
+        incident.updated_at = incident.last_activity_at = timezone.now()
+        incident.save(update_fields=["updated_at", "last_activity_at"])
         update = IncidentUpdate.objects.create(
             incident=incident,
             message=data["message"],
             status_at_time=data.get("status_at_time", incident.status),
             created_by_name=data["created_by_name"],
         )
+        time_in_status.record_update(update)
         AuditEvent.objects.create(
             actor_name=update.created_by_name,
             action="INCIDENT_UPDATE_POSTED",
@@ -75,6 +110,10 @@ def post_update(*, incident: Incident, data: dict) -> IncidentUpdate:
             notifications.notify_update_posted(incident, update)
             sse.broadcast_incident_update_posted(incident, update)
             status_service.invalidate_public_status_cache()
+            public_service.invalidate_public_incident(incident.id)
+            history_service.invalidate_for_incident(incident)
+            static_status.request_publish()
+            metrics_snapshot.mark_stale()
 
         transaction.on_commit(after_commit)
     return update
@@ -87,3 +126,19 @@ def transition_incident(*, incident: Incident, new_status: str, actor_name: str,
         actor_name=actor_name,
         message=message,
     )
+
+
+def refresh_last_activity(incidents=None) -> int:
+    """
+    Recompute `last_activity_at` from the latest update (or creation) for `incidents`
+    (all by default), for data written outside the services such as seeds.
+    """
+    latest_update = (
+        IncidentUpdate.objects.filter(incident=OuterRef("pk"))
+        .order_by()
+        .values("incident")
+        .annotate(latest=Max("created_at"))
+        .values("latest")
+    )
+    incidents = Incident.objects.all() if incidents is None else incidents
+    return incidents.update(last_activity_at=Coalesce(Subquery(latest_update), "created_at"))
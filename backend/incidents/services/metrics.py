@@ -1,152 +1,189 @@
 from __future__ import annotations
 
 import math
-from datetime import timedelta
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
 
-from django.db.models import Count, DurationField, ExpressionWrapper, F, Max
-from django.db.models.functions import TruncDate
+import numpy as np
+from django.db.models import Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-from incidents.models import ActionItem, EmailDelivery, Incident, Subscriber
+from incidents.models import ActionItem, Incident, MetricRollup
 from incidents.services import analytics as analytics_service
+from incidents.services import analytics_engine, page_views, rollups, sketches
 
+Metric = MetricRollup.Metric
 
-def _resolution_durations(queryset):
-    resolution_duration = ExpressionWrapper(
-        F("resolved_at") - F("created_at"),
-        output_field=DurationField(),
+DEFAULT_MTTR_WEEKS = 8
+MAX_MTTR_WEEKS = 52
+SLA_TARGET = 3
+DEFAULT_RANGE_DAYS = 30
+# Most buckets a ranged request may ask for: ~41 days hourly, ~2.7 years daily.
+MAX_RANGE_BUCKETS = 1000
+WATCHLIST_LIMIT = 20
+STALE_AFTER = timedelta(minutes=60)
+
+
+def _mttr_series(starts: list, bucket: str) -> dict[str, list[tuple]]:
+    """
+    `(bucket start, MTTR hours or None)` per bucket for all, public and internal
+    incidents, from one grouped query over the resolution count and time-sum rollups.
+    """
+    totals = rollups.series(
+        starts[0],
+        rollups.next_bucket(starts[-1], bucket),
+        bucket,
+        "metric",
+        "visibility",
+        metric__in=[Metric.RESOLUTIONS, Metric.RESOLUTION_SECONDS],
     )
-    durations = (
-        queryset.filter(resolved_at__isnull=False)
-        .annotate(duration=resolution_duration)
-        .values_list("duration", flat=True)
+    # {bucket start: {series: [resolutions, seconds]}}
+    by_bucket: dict = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for (start, metric, shown), total in totals.items():
+        index = 0 if metric == Metric.RESOLUTIONS else 1
+        by_bucket[start]["all"][index] += total
+        by_bucket[start][shown][index] += total
+
+    series: dict[str, list[tuple]] = {"all": [], "public": [], "internal": []}
+    for start in starts:
+        cell = by_bucket.get(start, {})
+        for key, points in series.items():
+            resolved, seconds = cell.get(key, (0, 0))
+            points.append((start, round(seconds / resolved / 3600, 2) if resolved else None))
+    return series
+
+
+def _weekly_mttr(weeks: int = DEFAULT_MTTR_WEEKS) -> dict[str, list[dict[str, object]]]:
+    """Weekly MTTR for all, public and internal incidents over the last `weeks` weeks."""
+    this_week = rollups.bucket_floor(timezone.now(), rollups.WEEK)
+    starts = rollups.bucket_starts(
+        this_week - timedelta(weeks=weeks - 1), rollups.next_bucket(this_week, rollups.WEEK), rollups.WEEK
     )
-    return [value.total_seconds() / 3600 for value in durations if value is not None]
-
-
-def _percentile(values: list[float], percentile: float) -> float | None:
-    if not values:
-        return None
-    if len(values) == 1:
-        return round(values[0], 2)
-    values_sorted = sorted(values)
-    k = (len(values_sorted) - 1) * percentile
-    f = math.floor(k)
-    c = math.ceil(k)
-    if f == c:
-        return round(values_sorted[int(k)], 2)
-    lower = values_sorted[f]
-    upper = values_sorted[c]
-    return round(lower + (upper - lower) * (k - f), 2)
-
-
-def _weekly_mttr_for_queryset(queryset, weeks: int = 8):
-    now = timezone.now()
-    start_of_week = now - timedelta(days=now.weekday())
-    start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-    data: list[dict[str, object]] = []
-    for offset in reversed(range(weeks)):
-        start = start_of_week - timedelta(weeks=offset)
-        end = start + timedelta(weeks=1)
-        durations = _resolution_durations(
-            queryset.filter(resolved_at__gte=start, resolved_at__lt=end)
-        )
-        average = round(sum(durations) / len(durations), 2) if durations else None
-        data.append(
-            {
-                "week_start": start.date().isoformat(),
-                "mttr_hours": average,
-            }
-        )
-    return data
+    return {
+        key: [
+            {"week_start": start.date().isoformat(), "mttr_hours": mttr_hours}
+            for start, mttr_hours in points
+        ]
+        for key, points in _mttr_series(starts, rollups.WEEK).items()
+    }
 
 
-def _active_incident_timeline(hours: int = 24):
-    now = timezone.now()
-    start = now - timedelta(hours=hours - 1)
-    incidents = list(
-        Incident.objects.values("created_at", "resolved_at", "status")
+def _active_incident_timeline(
+    window: timedelta = timedelta(hours=24),
+    bucket: timedelta = timedelta(hours=1),
+    end=None,
+):
+    """
+    Count incidents open at each bucket boundary in `window`, ending at `end` (now).
+
+    Only incidents overlapping the window are fetched; counts come from a single sweep
+    over the sorted open/resolve timestamps, so the cost is O(n log n + buckets) instead
+    of buckets x all incidents.
+    """
+    end = end or timezone.now()
+    points_count = max(1, math.ceil(window / bucket))
+    start = end - bucket * (points_count - 1)
+    overlapping = Incident.objects.filter(created_at__lte=end).filter(
+        Q(resolved_at__isnull=True) | Q(resolved_at__gte=start)
     )
+    opened: list = []
+    resolved: list = []
+    for created_at, resolved_at in overlapping.values_list("created_at", "resolved_at"):
+        opened.append(created_at)
+        if resolved_at is not None:
+            resolved.append(resolved_at)
+    opened.sort()
+    resolved.sort()
+
+    # An incident counts at `point` if created_at <= point <= resolved_at.
     timeline = []
-    for index in range(hours):
-        point = start + timedelta(hours=index)
-        count = 0
-        for incident in incidents:
-            created = incident["created_at"]
-            resolved = incident["resolved_at"]
-            if created <= point and (resolved is None or resolved >= point):
-                count += 1
-        timeline.append({"timestamp": point.isoformat(), "count": count})
-    current_open = sum(
-        1 for incident in incidents if incident["status"] != Incident.Status.RESOLVED
-    )
+    opened_index = resolved_index = 0
+    for index in range(points_count):
+        point = start + bucket * index
+        while opened_index < len(opened) and opened[opened_index] <= point:
+            opened_index += 1
+        while resolved_index < len(resolved) and resolved[resolved_index] < point:
+            resolved_index += 1
+        timeline.append({"timestamp": point.isoformat(), "count": opened_index - resolved_index})
+
+    current_open = analytics_service.active_incident_count()
     return timeline, current_open
 
 
 def _subscriber_growth(days: int = 7):
-    now = timezone.now()
-    start = (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
-    counts = (
-        Subscriber.objects.filter(created_at__gte=start)
-        .annotate(day=TruncDate("created_at"))
-        .values("day")
-        .annotate(total=Count("id"))
-        .order_by("day")
+    today = rollups.bucket_floor(timezone.now(), rollups.DAY)
+    starts = rollups.bucket_starts(
+        today - timedelta(days=days - 1), rollups.next_bucket(today, rollups.DAY), rollups.DAY
     )
-    by_date = {row["day"]: row["total"] for row in counts}
-    growth = []
-    for offset in range(days):
-        current_day = (start + timedelta(days=offset)).date()
-        growth.append(
-            {
-                "date": current_day.isoformat(),
-                "count": by_date.get(current_day, 0),
-            }
-        )
-    return growth
+    totals = rollups.series(
+        starts[0], rollups.next_bucket(today, rollups.DAY), rollups.DAY, metric=Metric.SUBSCRIBERS
+    )
+    return [{"date": start.date().isoformat(), "count": totals[(start,)]} for start in starts]
+
+
+def _status_page_views(days: int = 7):
+    today = timezone.localdate()
+    first = today - timedelta(days=days - 1)
+    views = page_views.daily_views(first, today + timedelta(days=1))
+    dates = [first + timedelta(days=offset) for offset in range(days)]
+    return [{"date": day.isoformat(), "views": views.get(day, 0)} for day in dates]
+
+
+def _status_page_views_series(starts: list, stop, bucket: str) -> list[dict[str, object]]:
+    """Views per bucket; the counts table is daily, so hour buckets report None."""
+    if bucket == rollups.HOUR:
+        return [{"timestamp": point.isoformat(), "views": None} for point in starts]
+    totals: Counter = Counter()
+    for day, views in page_views.daily_views(starts[0].date(), stop.date()).items():
+        midnight = timezone.make_aware(datetime.combine(day, time.min))
+        totals[rollups.bucket_floor(midnight, bucket)] += views
+    return [{"timestamp": point.isoformat(), "views": totals[point]} for point in starts]
 
 
 def _email_delivery_stats():
-    stats = EmailDelivery.objects.values("status").annotate(total=Count("id"))
+    stats = rollups.breakdown(Metric.DELIVERIES, "status")
     return [
-        {"status": row["status"], "count": row["total"]}
-        for row in stats
+        {"status": status, "count": total}
+        for status, total in stats.items()
     ]
 
 
-def _automation_watchlist():
+def _automation_watchlist(limit: int = WATCHLIST_LIMIT):
+    """
+    Oldest stale incidents, most recent resolutions lacking a postmortem and most
+    overdue action items, `limit` of each. Each list is one range scan over the
+    `(status, last_activity_at)` or `(status, due_date)` index that stops at the limit,
+    so cost doesn't grow with the number of incidents.
+    """
     now = timezone.now()
-    stale_threshold = now - timedelta(minutes=60)
-    unresolved = (
-        Incident.objects.exclude(status=Incident.Status.RESOLVED)
-        .annotate(last_update=Max("updates__created_at"))
-        .values("id", "title", "created_at", "last_update")
+    stale_threshold = now - STALE_AFTER
+    unresolved = [status for status in Incident.Status.values if status != Incident.Status.RESOLVED]
+    stale = (
+        Incident.objects.filter(status__in=unresolved, last_activity_at__lt=stale_threshold)
+        .order_by("last_activity_at")
+        .values("id", "title", "last_activity_at")[:limit]
     )
-    stale_incidents = []
-    for incident in unresolved:
-        last_activity = incident["last_update"] or incident["created_at"]
-        if last_activity < stale_threshold:
-            minutes = int((now - last_activity).total_seconds() // 60)
-            stale_incidents.append(
-                {
-                    "id": str(incident["id"]),
-                    "title": incident["title"],
-                    "minutes_since_update": minutes,
-                }
-            )
+    stale_incidents = [
+        {
+            "id": str(incident["id"]),
+            "title": incident["title"],
+            "minutes_since_update": int((now - incident["last_activity_at"]).total_seconds() // 60),
+        }
+        for incident in stale
+    ]
 
     missing_postmortem = list(
         Incident.objects.filter(status=Incident.Status.RESOLVED, postmortem__isnull=True)
-        .values("id", "title", "severity")[:20]
+        .order_by("-last_activity_at")
+        .values("id", "title", "severity")[:limit]
     )
 
+    open_statuses = [status for status in ActionItem.Status.values if status != ActionItem.Status.DONE]
     overdue_items = list(
-        ActionItem.objects.filter(
-            due_date__isnull=False,
-            due_date__lt=now.date(),
-        )
-        .exclude(status=ActionItem.Status.DONE)
-        .values("id", "title", "owner_name", "due_date")
+        ActionItem.objects.filter(status__in=open_statuses, due_date__lt=now.date())
+        .order_by("due_date")
+        .values("id", "title", "owner_name", "due_date")[:limit]
     )
 
     # Cast UUIDs to string for JSON serialization
@@ -162,57 +199,41 @@ def _automation_watchlist():
     }
 
 
-def get_admin_metrics():
-    timeline, current_open = _active_incident_timeline(hours=48)
+def get_admin_metrics(weeks: int = DEFAULT_MTTR_WEEKS):
+    timeline, current_open = _active_incident_timeline(window=timedelta(hours=48))
     severity_breakdown = analytics_service.incidents_per_severity()
 
-    incidents = Incident.objects.all()
-    weekly_all = _weekly_mttr_for_queryset(incidents)
-    weekly_public = _weekly_mttr_for_queryset(incidents.filter(is_public=True))
-    weekly_internal = _weekly_mttr_for_queryset(incidents.filter(is_public=False))
+    weekly_mttr = _weekly_mttr(weeks)
 
-    all_durations = _resolution_durations(incidents.filter(resolved_at__isnull=False))
-    percentiles = {
-        "p50": _percentile(all_durations, 0.5),
-        "p90": _percentile(all_durations, 0.9),
-    }
+    percentiles = sketches.resolution_percentiles()
 
     thirty_days_ago = timezone.now() - timedelta(days=30)
-    resolved_last_month = (
-        Incident.objects.filter(resolved_at__gte=thirty_days_ago, resolved_at__isnull=False)
-        .values("severity")
-        .annotate(total=Count("id"))
-    )
+    resolved_last_month = rollups.breakdown(Metric.RESOLUTIONS, "severity", since=thirty_days_ago)
     resolved_by_severity = [
-        {"severity": row["severity"], "count": row["total"]} for row in resolved_last_month
+        {"severity": severity, "count": total} for severity, total in resolved_last_month.items()
     ]
 
     subscriber_growth = _subscriber_growth()
     email_stats = _email_delivery_stats()
-    status_views = [
-        {"date": entry["date"], "views": None} for entry in subscriber_growth
-    ]
+    status_views = _status_page_views()
 
     watchlist = _automation_watchlist()
 
+    by_visibility = rollups.breakdown(Metric.INCIDENTS, "visibility")
     visibility_breakdown = {
-        "public": incidents.filter(is_public=True).count(),
-        "internal": incidents.filter(is_public=False).count(),
+        "public": by_visibility.get("public", 0),
+        "internal": by_visibility.get("internal", 0),
     }
 
     return {
         "incident_pulse": {
             "timeline": timeline,
             "current_open": current_open,
-            "sla_target": 3,
+            "sla_target": SLA_TARGET,
             "severity_breakdown": severity_breakdown,
         },
         "resolution_health": {
-            "weekly_mttr": {
-                "all": weekly_all,
-                "public": weekly_public,
-                "internal": weekly_internal,
-            },
+            "weekly_mttr": weekly_mttr,
             "percentiles": percentiles,
             "resolved_by_severity": resolved_by_severity,
             "visibility_breakdown": visibility_breakdown,
@@ -224,3 +245,187 @@ def get_admin_metrics():
         },
         "automation_watchlist": watchlist,
     }
+
+
+def parse_moment(value: str):
+    """
+    Parse an ISO datetime, or a date meaning local midnight, into an aware datetime;
+    raises ValueError otherwise.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date or datetime: {value}")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _open_timeline(starts: list, bucket: str) -> list[dict[str, object]]:
+    """
+    Open incidents at each bucket start, from the rollups: everything opened before
+    the range minus everything resolved before it, then running opened/resolved
+    totals per bucket. Cost depends on the bucket count, not the incident count.
+    """
+    first = starts[0]
+    open_count = rollups.total(Metric.INCIDENTS, until=first) - rollups.total(
+        Metric.RESOLUTIONS, until=first
+    )
+    changes = rollups.series(
+        first,
+        rollups.next_bucket(starts[-1], bucket),
+        bucket,
+        "metric",
+        metric__in=[Metric.INCIDENTS, Metric.RESOLUTIONS],
+    )
+    timeline = []
+    for start in starts:
+        timeline.append({"timestamp": start.isoformat(), "count": open_count})
+        open_count += changes[(start, Metric.INCIDENTS)] - changes[(start, Metric.RESOLUTIONS)]
+    return timeline
+
+
+def get_range_metrics(start, end, bucket: str = rollups.DAY):
+    """
+    Admin metrics over an arbitrary `[start, end)` range in hour, day or week buckets.
+
+    Every series is read from the metric rollups with one grouped query per metric, so
+    the cost grows with the number of buckets rather than with the range's incidents.
+    Percentiles use the weekly sketches overlapping the range. Callers must keep the
+    range within `MAX_RANGE_BUCKETS` (see `rollups.bucket_count`).
+    """
+    starts = rollups.bucket_starts(start, end, bucket)
+    stop = rollups.next_bucket(starts[-1], bucket)
+    opened = rollups.series(
+        starts[0], stop, bucket, "severity", "visibility", metric=Metric.INCIDENTS
+    )
+    resolved = rollups.series(starts[0], stop, bucket, "severity", metric=Metric.RESOLUTIONS)
+    subscribers = rollups.series(starts[0], stop, bucket, metric=Metric.SUBSCRIBERS)
+    deliveries = rollups.series(starts[0], stop, bucket, "status", metric=Metric.DELIVERIES)
+
+    severity_breakdown = {severity: 0 for severity in Incident.Severity.values}
+    visibility_breakdown = {"public": 0, "internal": 0}
+    for (_, severity, shown), total in opened.items():
+        severity_breakdown[severity] += total
+        visibility_breakdown[shown] += total
+    resolved_by_severity: dict[str, int] = defaultdict(int)
+    for (_, severity), total in resolved.items():
+        resolved_by_severity[severity] += total
+    email_stats: dict[str, int] = defaultdict(int)
+    for (_, status), total in deliveries.items():
+        email_stats[status] += total
+
+    mttr = {
+        key: [{"timestamp": point.isoformat(), "mttr_hours": mttr_hours} for point, mttr_hours in points]
+        for key, points in _mttr_series(starts, bucket).items()
+    }
+    return {
+        "range": {
+            "from": starts[0].isoformat(),
+            "to": stop.isoformat(),
+            "bucket": bucket,
+            "buckets": len(starts),
+        },
+        "incident_pulse": {
+            "timeline": _open_timeline(starts, bucket),
+            "current_open": analytics_service.active_incident_count(),
+            "sla_target": SLA_TARGET,
+            "severity_breakdown": severity_breakdown,
+        },
+        "resolution_health": {
+            "mttr": mttr,
+            "percentiles": sketches.resolution_percentiles(
+                since=starts[0].date(), until=stop.date()
+            ),
+            "resolved_by_severity": [
+                {"severity": severity, "count": total}
+                for severity, total in resolved_by_severity.items()
+                if total
+            ],
+            "visibility_breakdown": visibility_breakdown,
+        },
+        "engagement": {
+            "subscriber_growth": [
+                {"timestamp": point.isoformat(), "count": subscribers[(point,)]} for point in starts
+            ],
+            "email_delivery": [
+                {"status": status, "count": total} for status, total in email_stats.items() if total
+            ],
+            "status_page_views": _status_page_views_series(starts, stop, bucket),
+        },
+        "automation_watchlist": _automation_watchlist(),
+    }
+
+
+def _hours_or_none(value) -> float | None:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def get_incident_report(start, end, bucket: str = rollups.WEEK, frame=None) -> dict:
+    """
+    Offline report over `[start, end)` computed from raw incidents by the NumPy engine
+    (`analytics_engine.IncidentFrame`): per-bucket opened/resolved/open counts and MTTR,
+    exact percentiles and a resolution-time histogram. Unlike `get_range_metrics` it
+    doesn't depend on the rollups and has no bucket limit; pass `frame` to report on
+    preloaded (or synthetic) data.
+    """
+    if frame is None:
+        frame = analytics_engine.IncidentFrame.load(start, end)
+    starts = rollups.bucket_starts(start, end, bucket)
+    stop = rollups.next_bucket(starts[-1], bucket)
+    edges = np.array([point.timestamp() for point in starts] + [stop.timestamp()])
+
+    opened_mask = (frame.created >= edges[0]) & (frame.created < edges[-1])
+    with np.errstate(invalid="ignore"):
+        resolved_mask = (frame.resolved >= edges[0]) & (frame.resolved < edges[-1])
+    opened = frame.counts_by_bucket(edges)
+    resolved = frame.counts_by_bucket(edges, frame.resolved[~np.isnan(frame.resolved)])
+    open_at_start = frame.open_at(edges[:-1])
+    mttr = {
+        "mttr_hours": frame.mttr_by_bucket(edges),
+        "mttr_hours_public": frame.mttr_by_bucket(edges, is_public=True),
+        "mttr_hours_internal": frame.mttr_by_bucket(edges, is_public=False),
+    }
+    buckets = [
+        {
+            "timestamp": point.isoformat(),
+            "opened": int(opened[index]),
+            "resolved": int(resolved[index]),
+            "open_at_start": int(open_at_start[index]),
+            **{key: _hours_or_none(values[index]) for key, values in mttr.items()},
+        }
+        for index, point in enumerate(starts)
+    ]
+
+    resolved_in_range = frame.subset(resolved_mask)
+    counts, hour_edges = resolved_in_range.resolution_histogram()
+    opened_public = int(np.count_nonzero(frame.is_public[opened_mask]))
+    return {
+        "range": {
+            "from": starts[0].isoformat(),
+            "to": stop.isoformat(),
+            "bucket": bucket,
+            "buckets": len(starts),
+        },
+        "buckets": buckets,
+        "severity_breakdown": frame.severity_counts(opened_mask),
+        "visibility_breakdown": {
+            "public": opened_public,
+            "internal": int(np.count_nonzero(opened_mask)) - opened_public,
+        },
+        "percentiles": resolved_in_range.percentiles(),
+        "percentiles_by_severity": {
+            severity: resolved_in_range.percentiles(severity=severity)
+            for severity in analytics_engine.SEVERITIES
+        },
+        "resolution_histogram": [
+            {
+                "min_hours": float(hour_edges[index]),
+                "max_hours": None if np.isinf(hour_edges[index + 1]) else float(hour_edges[index + 1]),
+                "count": int(count),
+            }
+            for index, count in enumerate(counts)
+        ],
+    }
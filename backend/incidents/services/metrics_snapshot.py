@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from incidents.services import executor
+from incidents.services import metrics as metrics_service
+from incidents.tasks import refresh_admin_metrics_snapshot
+
+SNAPSHOT_CACHE_TIMEOUT = 24 * 60 * 60  # seconds; staleness is decided by age, not expiry
+REFRESH_LOCK_TIMEOUT = 60  # seconds; a refresh that dies frees the lock by expiry
+RETRY_AFTER_SECONDS = 2  # hinted to clients that arrive while the first snapshot computes
+DIRTY_KEY = "admin_metrics:dirty_at"
+
+
+def _snapshot_key(weeks: int) -> str:
+    return f"admin_metrics:snapshot:{weeks}"
+
+
+def _lock_key(weeks: int) -> str:
+    return f"admin_metrics:refresh:{weeks}"
+
+
+def mark_stale(now: float | None = None) -> None:
+    """Record that incident data changed, so snapshots computed before now are stale."""
+    cache.set(DIRTY_KEY, time.time() if now is None else now, None)
+
+
+def is_stale(snapshot: dict, now: float | None = None) -> bool:
+    """
+    A snapshot is stale once it is `ADMIN_METRICS_SNAPSHOT_TTL` old, or once a write
+    happened after it was computed and it is at least `ADMIN_METRICS_MIN_REFRESH_SECONDS`
+    old (so a burst of writes doesn't recompute on every read).
+    """
+    now = time.time() if now is None else now
+    age = now - snapshot["computed_at"]
+    if age >= settings.ADMIN_METRICS_SNAPSHOT_TTL:
+        return True
+    dirty_at = cache.get(DIRTY_KEY)
+    return (
+        dirty_at is not None
+        and dirty_at > snapshot["computed_at"]
+        and age >= settings.ADMIN_METRICS_MIN_REFRESH_SECONDS
+    )
+
+
+def _take_lock(weeks: int) -> str | None:
+    """Take the refresh lock for `weeks`; returns the token that owns it, or None if held."""
+    token = uuid.uuid4().hex
+    return token if cache.add(_lock_key(weeks), token, REFRESH_LOCK_TIMEOUT) else None
+
+
+def refresh(weeks: int = metrics_service.DEFAULT_MTTR_WEEKS, lock_token: str | None = None) -> dict:
+    """
+    Compute and store a snapshot. With the `lock_token` the caller took the refresh lock
+    with, release the lock afterwards; a refresh without one (the beat task) leaves
+    whoever holds it alone.
+    """
+    try:
+        # Stamped before computing, so writes that land mid-refresh still mark it stale.
+        snapshot = {"computed_at": time.time()}
+        snapshot["payload"] = metrics_service.get_admin_metrics(weeks=weeks)
+        cache.set(_snapshot_key(weeks), snapshot, SNAPSHOT_CACHE_TIMEOUT)
+    finally:
+        # Only ours to delete if it hasn't expired and been taken by someone else since.
+        if lock_token is not None and cache.get(_lock_key(weeks)) == lock_token:
+            cache.delete(_lock_key(weeks))
+    return snapshot
+
+
+def get_snapshot(weeks: int = metrics_service.DEFAULT_MTTR_WEEKS) -> dict | None:
+    """
+    Return the admin metrics payload plus a `snapshot` entry with when it was
+    computed and its age in seconds.
+
+    Reads are served from the shared cache. A stale snapshot is still returned while
+    one background refresh is scheduled; the `cache.add` lock makes sure concurrent
+    readers don't each schedule their own. With no snapshot at all, one request
+    computes it; the others get None instead of tying up a worker waiting for it, and
+    should ask again after `RETRY_AFTER_SECONDS`.
+    """
+    snapshot = cache.get(_snapshot_key(weeks))
+    if snapshot is None:
+        token = _take_lock(weeks)
+        if token is None:
+            return None
+        snapshot = refresh(weeks, lock_token=token)
+    elif is_stale(snapshot) and (token := _take_lock(weeks)):
+        executor.submit(refresh_admin_metrics_snapshot, weeks, token)
+    computed_at = snapshot["computed_at"]
+    return {
+        **snapshot["payload"],
+        "snapshot": {
+            "generated_at": datetime.fromtimestamp(computed_at, tz=dt_timezone.utc).isoformat(),
+            "age_seconds": round(max(0.0, time.time() - computed_at), 1),
+        },
+    }
@@ -1,42 +1,167 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from datetime import timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List
 
-from incidents.models import EmailDelivery, Incident, IncidentUpdate, Postmortem, Subscriber
-from incidents.tasks import send_email_delivery
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
 
+from incidents.models import (
+    DigestEntry,
+    EmailDelivery,
+    Incident,
+    IncidentUpdate,
+    NotificationMessage,
+    Postmortem,
+    Subscriber,
+)
+from incidents.services import email_throttle, executor, rollups
+from incidents.tasks import fan_out_notification, notification_queue, send_email_delivery_batch
 
-def get_recipients_for_incident(incident: Incident) -> List[str]:
-    emails = set(
-        Subscriber.objects.filter(is_active=True, scope=Subscriber.Scope.GLOBAL).values_list(
-            "email", flat=True
+
+RECIPIENT_ITERATOR_CHUNK_SIZE = 2000
+
+
+def iter_recipients_for_incident(incident: Incident) -> Iterator[str]:
+    """
+    Stream the distinct active recipients (global + incident-scoped) for an incident.
+
+    One `SELECT DISTINCT` backed by the (is_active, scope, incident) index, read with a
+    server-side cursor where supported, so memory stays flat as the subscriber list grows.
+    """
+    return (
+        Subscriber.objects.filter(is_active=True)
+        .filter(
+            Q(scope=Subscriber.Scope.GLOBAL)
+            | Q(scope=Subscriber.Scope.INCIDENT, incident=incident)
         )
+        .order_by("email")
+        .values_list("email", flat=True)
+        .distinct()
+        .iterator(chunk_size=RECIPIENT_ITERATOR_CHUNK_SIZE)
     )
 
-    incident_specific = Subscriber.objects.filter(
-        is_active=True, scope=Subscriber.Scope.INCIDENT, incident=incident
-    ).values_list("email", flat=True)
 
-    emails.update(incident_specific)
-    return sorted(emails)
+def get_recipients_for_incident(incident: Incident) -> List[str]:
+    return list(iter_recipients_for_incident(incident))
 
 
-def enqueue_email_deliveries(incident: Incident | None, subject: str, body: str, recipients: Iterable[str]):
-    deliveries: List[EmailDelivery] = []
-    for email in recipients:
-        delivery = EmailDelivery.objects.create(
-            incident=incident,
-            subscriber_email=email,
-            subject=subject,
-            body=body,
-        )
-        deliveries.append(delivery)
-        send_email_delivery.delay(str(delivery.id))
-    return deliveries
+def _chunked(values: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
-def notify_incident_created(incident: Incident) -> None:
-    recipients = get_recipients_for_incident(incident)
+def enqueue_email_deliveries(
+    incident: Incident | None,
+    subject: str,
+    body: str,
+    recipients: Iterable[str],
+    batch_size: int | None = None,
+    event: str = "",
+):
+    """
+    Create deliveries with one `bulk_create` per chunk and dispatch one batch task per
+    chunk, so a notification costs O(recipients / batch_size) round trips. Recipients
+    may be a lazy iterator; only one chunk is held in memory at a time.
+
+    The rendered content is stored once in a `NotificationMessage`; delivery rows only
+    carry the recipient and send state. Batches go to the Celery queue for the
+    message's priority (see `priority_for`).
+
+    Returns the number of deliveries created.
+    """
+    batch_size = batch_size or settings.EMAIL_DELIVERY_BATCH_SIZE
+    created_count = 0
+    priority = priority_for(event, incident)
+    message = None
+    for chunk in _chunked(recipients, batch_size):
+        if message is None:
+            message = NotificationMessage.objects.create(
+                incident=incident, event=event, priority=priority, subject=subject, body=body
+            )
+        with transaction.atomic():
+            created = EmailDelivery.objects.bulk_create(
+                [
+                    EmailDelivery(incident=incident, message=message, subscriber_email=email)
+                    for email in chunk
+                ]
+            )
+            rollups.record_deliveries(created)
+        created_count += len(created)
+        dispatch_deliveries(created, priority)
+    return created_count
+
+
+def dispatch_deliveries(
+    deliveries: List[EmailDelivery],
+    priority: str = NotificationMessage.Priority.NORMAL,
+    deferrals: int = 0,
+) -> None:
+    """
+    Reserve per-domain send budget for a chunk and dispatch it to the priority's queue.
+
+    Domains with tokens to spare go out together in one immediate batch; the rest of a
+    throttled domain is split into burst-sized batches scheduled with a countdown, so
+    one slow provider never holds back mail to everyone else. Every row is stamped with
+    when its batch is due. `deferrals` is passed on to batches being requeued after a
+    provider pause.
+    """
+    queue = notification_queue(priority)
+    task_kwargs = ({"deferrals": deferrals},) if deferrals else ()
+    now = timezone.now()
+    ready: List[str] = []
+    by_domain = email_throttle.group_by_domain(
+        (str(delivery.id), delivery.subscriber_email) for delivery in deliveries
+    )
+    for domain, delivery_ids in by_domain.items():
+        _, burst = email_throttle.limit_for(domain)
+        for batch in _chunked(delivery_ids, max(1, burst)):
+            wait = email_throttle.reserve(domain, len(batch), priority=priority)
+            if wait > 0:
+                _schedule(batch, now + timedelta(seconds=wait))
+                send_email_delivery_batch.apply_async(
+                    (batch,), *task_kwargs, countdown=wait, queue=queue
+                )
+            else:
+                ready.extend(batch)
+    if ready:
+        _schedule(ready, now)
+        send_email_delivery_batch.apply_async((ready,), *task_kwargs, queue=queue)
+
+
+def _schedule(delivery_ids: List[str], due_at) -> None:
+    # Paced batches can sit in the broker longer than the stale window; record when
+    # they're due so `sweep_stale_pending` doesn't mistake them for lost work.
+    EmailDelivery.objects.filter(id__in=delivery_ids).update(next_attempt_at=due_at)
+
+
+INCIDENT_CREATED = "INCIDENT_CREATED"
+INCIDENT_STATUS_CHANGED = "INCIDENT_STATUS_CHANGED"
+INCIDENT_UPDATE_POSTED = "INCIDENT_UPDATE_POSTED"
+POSTMORTEM_PUBLISHED = "POSTMORTEM_PUBLISHED"
+DIGEST = "DIGEST"
+
+
+def priority_for(event: str, incident: Incident | None) -> str:
+    """
+    SEV1 notifications are critical; postmortems and SEV4 chatter are bulk. Digests are
+    never critical, since urgent events bypass them anyway.
+    """
+    Priority = NotificationMessage.Priority
+    if incident is None:
+        return Priority.NORMAL
+    if event == POSTMORTEM_PUBLISHED or incident.severity == Incident.Severity.SEV4:
+        return Priority.BULK
+    if incident.severity == Incident.Severity.SEV1 and event != DIGEST:
+        return Priority.CRITICAL
+    return Priority.NORMAL
+
+
+def _render_incident_created(incident: Incident, object_id: str | None):
     subject = f"[Incident] {incident.title} created"
     body = (
         f"A new incident has been created.\n\n"
@@ -45,28 +170,175 @@ def notify_incident_created(incident: Incident) -> None:
         f"Status: {incident.status}\n\n"
         f"{incident.summary}"
     )
-    enqueue_email_deliveries(incident, subject, body, recipients)
+    return subject, body
 
 
-def notify_status_changed(incident: Incident, update: IncidentUpdate) -> None:
-    recipients = get_recipients_for_incident(incident)
-    subject = f"[Incident] {incident.title} status changed to {incident.status}"
+def _render_status_changed(incident: Incident, object_id: str | None):
+    update = IncidentUpdate.objects.filter(pk=object_id, incident=incident).first()
+    if update is None:
+        return None
+    subject = f"[Incident] {incident.title} status changed to {update.status_at_time}"
     body = f"{update.created_by_name} updated the incident:\n\n{update.message}"
-    enqueue_email_deliveries(incident, subject, body, recipients)
+    return subject, body
 
 
-def notify_update_posted(incident: Incident, update: IncidentUpdate) -> None:
-    recipients = get_recipients_for_incident(incident)
+def _render_update_posted(incident: Incident, object_id: str | None):
+    update = IncidentUpdate.objects.filter(pk=object_id, incident=incident).first()
+    if update is None:
+        return None
     subject = f"[Incident] Update on {incident.title}"
     body = f"{update.created_by_name} wrote:\n\n{update.message}"
-    enqueue_email_deliveries(incident, subject, body, recipients)
+    return subject, body
 
 
-def notify_postmortem_published(incident: Incident, postmortem: Postmortem) -> None:
-    recipients = get_recipients_for_incident(incident)
+def _render_postmortem_published(incident: Incident, object_id: str | None):
+    postmortem = Postmortem.objects.filter(pk=object_id, incident=incident).first()
+    if postmortem is None:
+        return None
     subject = f"[Incident] Postmortem published for {incident.title}"
     body = (
         f"A postmortem has been published for the incident '{incident.title}'.\n\n"
         f"Summary:\n{postmortem.summary or 'No summary provided.'}"
     )
-    enqueue_email_deliveries(incident, subject, body, recipients)
+    return subject, body
+
+
+_RENDERERS = {
+    INCIDENT_CREATED: _render_incident_created,
+    INCIDENT_STATUS_CHANGED: _render_status_changed,
+    INCIDENT_UPDATE_POSTED: _render_update_posted,
+    POSTMORTEM_PUBLISHED: _render_postmortem_published,
+}
+
+
+def fan_out(event: str, incident_id: str, object_id: str | None = None) -> int:
+    """
+    Resolve recipients and create deliveries for a notification event.
+
+    Runs inside the `fan_out_notification` task, so none of this work (recipient
+    lookups, inserts, SMTP) happens on the web request path.
+    """
+    renderer = _RENDERERS.get(event)
+    if renderer is None:
+        raise ValueError(f"Unknown notification event: {event}")
+
+    incident = Incident.objects.filter(pk=incident_id).first()
+    if incident is None:
+        return 0
+    rendered = renderer(incident, object_id)
+    if rendered is None:
+        return 0
+
+    if settings.NOTIFICATION_DIGEST_ENABLED:
+        if _should_digest(event, incident, object_id):
+            DigestEntry.objects.create(
+                incident=incident,
+                event=event,
+                update_id=object_id if event != INCIDENT_CREATED else None,
+            )
+            return 0
+        # Deliver anything already waiting first so subscribers read events in order.
+        flush_incident_digest(incident)
+
+    subject, body = rendered
+    recipients = iter_recipients_for_incident(incident)
+    return enqueue_email_deliveries(incident, subject, body, recipients, event=event)
+
+
+def _should_digest(event: str, incident: Incident, object_id: str | None) -> bool:
+    """
+    Timeline chatter is digested; resolutions, new SEV1s and postmortems always go out
+    immediately.
+    """
+    if event == INCIDENT_CREATED:
+        return incident.severity != Incident.Severity.SEV1
+    if event == INCIDENT_STATUS_CHANGED:
+        return not IncidentUpdate.objects.filter(
+            pk=object_id, status_at_time=Incident.Status.RESOLVED
+        ).exists()
+    return event == INCIDENT_UPDATE_POSTED
+
+
+def _render_digest(incident: Incident, entries: List[DigestEntry]):
+    lines = []
+    for entry in entries:
+        timestamp = entry.created_at.strftime("%H:%M UTC")
+        if entry.update is None:
+            lines.append(
+                f"[{timestamp}] Incident opened ({incident.severity}): {incident.summary}"
+            )
+        else:
+            lines.append(
+                f"[{timestamp}] {entry.update.created_by_name} "
+                f"({entry.update.status_at_time}): {entry.update.message}"
+            )
+    noun = "update" if len(entries) == 1 else "updates"
+    subject = f"[Incident] {len(entries)} {noun} on {incident.title}"
+    body = (
+        f"Recent activity on '{incident.title}' (currently {incident.status}):\n\n"
+        + "\n\n".join(lines)
+    )
+    return subject, body
+
+
+def flush_incident_digest(incident: Incident) -> int:
+    """Send one combined email per subscriber for an incident's pending digest entries."""
+    claimed_at = timezone.now()
+    claimed = DigestEntry.objects.filter(incident=incident, flushed_at__isnull=True).update(
+        flushed_at=claimed_at
+    )
+    if not claimed:
+        return 0
+    # Claiming with a single UPDATE keeps concurrent flushers from double-sending.
+    entries = list(
+        DigestEntry.objects.filter(incident=incident, flushed_at=claimed_at)
+        .select_related("update")
+        .order_by("created_at")
+    )
+    subject, body = _render_digest(incident, entries)
+    return enqueue_email_deliveries(
+        incident, subject, body, iter_recipients_for_incident(incident), event=DIGEST
+    )
+
+
+def flush_due_digests(now=None) -> int:
+    """Flush every incident whose oldest pending entry has waited a full digest window."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW_SECONDS)
+    incident_ids = (
+        DigestEntry.objects.filter(flushed_at__isnull=True)
+        .values("incident_id")
+        .annotate(oldest=Min("created_at"))
+        .filter(oldest__lte=cutoff)
+        .values_list("incident_id", flat=True)
+    )
+    flushed = 0
+    for incident in Incident.objects.filter(pk__in=list(incident_ids)):
+        flushed += flush_incident_digest(incident)
+    return flushed
+
+
+def _dispatch(event: str, incident: Incident, object_id=None) -> None:
+    executor.submit(
+        fan_out_notification,
+        event,
+        str(incident.id),
+        str(object_id) if object_id is not None else None,
+        queue=notification_queue(priority_for(event, incident)),
+    )
+
+
+def notify_incident_created(incident: Incident) -> None:
+    _dispatch(INCIDENT_CREATED, incident)
+
+
+def notify_status_changed(incident: Incident, update: IncidentUpdate) -> None:
+    _dispatch(INCIDENT_STATUS_CHANGED, incident, update.id)
+
+
+def notify_update_posted(incident: Incident, update: IncidentUpdate) -> None:
+    _dispatch(INCIDENT_UPDATE_POSTED, incident, update.id)
+
+
+def notify_postmortem_published(incident: Incident, postmortem: Postmortem) -> None:
+    _dispatch(POSTMORTEM_PUBLISHED, incident, postmortem.id)
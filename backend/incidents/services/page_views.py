@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from datetime import date
+
+import structlog
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from incidents.models import StatusPageViews
+
+logger = structlog.get_logger(__name__)
+
+
+class ViewCounter:
+    """
+    Per-process status page view counts, written to `StatusPageViews` in batches.
+
+    A hit is a dict increment under a lock and never touches the database. A background
+    flusher, started per web worker by `gunicorn.conf.py`, swaps the pending counts out
+    every `STATUS_PAGE_VIEWS_FLUSH_SECONDS`, or as soon as a hit brings them to
+    `STATUS_PAGE_VIEWS_FLUSH_THRESHOLD`, and writes them with one upsert per day; the
+    worker's exit hook stops it and writes the rest. Processes that never start it
+    (tests, management commands) only write on an explicit `flush()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._count = 0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def record(self, day: date | None = None) -> None:
+        with self._lock:
+            self._pending[day or timezone.localdate()] += 1
+            self._count += 1
+            due = self._count >= settings.STATUS_PAGE_VIEWS_FLUSH_THRESHOLD
+        if due:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write whatever is pending now. Returns the number of views written."""
+        with self._lock:
+            batch = self._take()
+        self._write(batch)
+        return sum(batch.values())
+
+    def pending(self) -> int:
+        return self._count
+
+    def discard(self) -> None:
+        """Drop pending counts without writing them (tests, mainly)."""
+        with self._lock:
+            self._take()
+
+    def start(self) -> None:
+        """Start the background flusher, once per process."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="status-page-views", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> int:
+        """Stop the background flusher, if running, and write what is left."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+        if thread is not None:
+            self._wake.set()
+            thread.join(timeout)
+        return self.flush()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(settings.STATUS_PAGE_VIEWS_FLUSH_SECONDS)
+            self._wake.clear()
+            if self._stopping:
+                return
+            self.flush()
+            # This thread sits outside the request cycle, so nothing else recycles its connection.
+            close_old_connections()
+
+    def _take(self) -> Counter:
+        batch, self._pending, self._count = self._pending, Counter(), 0
+        return batch
+
+    def _write(self, batch: Counter) -> None:
+        if not batch:
+            return
+        try:
+            with transaction.atomic():
+                for day in sorted(batch):
+                    _add_views(day, batch[day])
+        except DatabaseError:
+            # Keep the counts for the next flush rather than losing them.
+            logger.exception("status_page_views_flush_failed", views=sum(batch.values()))
+            with self._lock:
+                self._pending.update(batch)
+                self._count += sum(batch.values())
+
+
+def _add_views(day: date, views: int) -> None:
+    if StatusPageViews.objects.filter(date=day).update(views=F("views") + views):
+        return
+    try:
+        with transaction.atomic():
+            StatusPageViews.objects.create(date=day, views=views)
+    except IntegrityError:
+        # Another worker created the day first.
+        StatusPageViews.objects.filter(date=day).update(views=F("views") + views)
+
+
+counter = ViewCounter()
+
+
+def record_view() -> None:
+    counter.record()
+
+
+def daily_views(start: date, end: date) -> dict[date, int]:
+    """Flushed views per day in [start, end); days without views are omitted."""
+    rows = StatusPageViews.objects.filter(date__gte=start, date__lt=end)
+    return dict(rows.values_list("date", "views"))
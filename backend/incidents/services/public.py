@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from incidents.models import Incident, Postmortem
+from incidents.serializers import IncidentSerializer, PostmortemSerializer
+from incidents.services import cache as two_tier_cache
+
+PUBLIC_PAYLOAD_TTL = 300  # seconds; writes bump the version so this only bounds memory
+PUBLIC_HTTP_MAX_AGE = 15  # browsers
+PUBLIC_HTTP_SHARED_MAX_AGE = 60  # CDNs / reverse proxies
+
+
+def incident_cache_scope(incident_id) -> str:
+    return f"public_incident:{incident_id}"
+
+
+def compute_etag(data) -> str:
+    encoded = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def render_cached_payload(data) -> dict:
+    return {"data": data, "etag": compute_etag(data)}
+
+
+def _build_incident_payload(incident_id) -> dict | None:
+    incident = Incident.objects.filter(pk=incident_id, is_public=True).first()
+    if incident is None:
+        return None
+    return render_cached_payload(dict(IncidentSerializer(incident).data))
+
+
+def _build_postmortem_payload(incident_id) -> dict | None:
+    postmortem = (
+        Postmortem.objects.filter(
+            incident_id=incident_id, incident__is_public=True, published=True
+        )
+        .prefetch_related("action_items")
+        .first()
+    )
+    if postmortem is None:
+        return None
+    return render_cached_payload(dict(PostmortemSerializer(postmortem).data))
+
+
+def get_public_incident_payload(incident_id) -> dict | None:
+    """
+    Return `{"data": ..., "etag": ...}` for a public incident, or None when it is not public.
+    """
+    return two_tier_cache.get_or_set(
+        incident_cache_scope(incident_id),
+        "incident",
+        lambda: _build_incident_payload(incident_id),
+        PUBLIC_PAYLOAD_TTL,
+    )
+
+
+def get_public_postmortem_payload(incident_id) -> dict | None:
+    """
+    Return `{"data": ..., "etag": ...}` for a published public postmortem, or None.
+    """
+    return two_tier_cache.get_or_set(
+        incident_cache_scope(incident_id),
+        "postmortem",
+        lambda: _build_postmortem_payload(incident_id),
+        PUBLIC_PAYLOAD_TTL,
+    )
+
+
+def invalidate_public_incident(incident_id) -> None:
+    two_tier_cache.bump_version(incident_cache_scope(incident_id))
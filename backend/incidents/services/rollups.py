@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Optional, Tuple
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q, QuerySet, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from incidents.models import EmailDelivery, EmailDeliveryArchive, Incident, MetricRollup, Subscriber
+
+Grain = MetricRollup.Grain
+Metric = MetricRollup.Metric
+KEY_FIELDS = ("grain", "metric", "bucket_start", "severity", "visibility", "status")
+REBUILD_BATCH_SIZE = 1000
+
+IncidentSnapshot = Tuple[str, bool, str, datetime, Optional[datetime]]
+
+
+def hour_start(value: datetime) -> datetime:
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(value: datetime) -> datetime:
+    return timezone.localtime(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def visibility(is_public: bool) -> str:
+    return "public" if is_public else "internal"
+
+
+def add(
+    deltas: Counter,
+    metric: str,
+    at: datetime,
+    amount: int = 1,
+    severity: str = "",
+    visibility: str = "",
+    status: str = "",
+) -> None:
+    """Add `amount` to both the hourly and the daily cell for `at` in `deltas`."""
+    deltas[(Grain.HOUR, metric, hour_start(at), severity, visibility, status)] += amount
+    deltas[(Grain.DAY, metric, day_start(at), severity, visibility, status)] += amount
+
+
+def apply(deltas: Counter) -> None:
+    """
+    Add each delta to its rollup cell, creating missing cells. Cells are touched in a
+    fixed order so concurrent writers can't deadlock; call inside the transaction that
+    changed the source rows so the counters commit (or roll back) with them.
+    """
+    with transaction.atomic():
+        for key in sorted(key for key, amount in deltas.items() if amount):
+            amount = deltas[key]
+            cell = dict(zip(KEY_FIELDS, key))
+            if MetricRollup.objects.filter(**cell).update(value=F("value") + amount):
+                continue
+            try:
+                with transaction.atomic():
+                    MetricRollup.objects.create(value=amount, **cell)
+            except IntegrityError:
+                # Another writer created the cell first.
+                MetricRollup.objects.filter(**cell).update(value=F("value") + amount)
+
+
+def snapshot(incident: Incident) -> IncidentSnapshot:
+    """The incident fields the rollups are keyed on."""
+    return (
+        incident.severity,
+        incident.is_public,
+        incident.status,
+        incident.created_at,
+        incident.resolved_at,
+    )
+
+
+def _add_incident(deltas: Counter, incident: IncidentSnapshot, sign: int) -> None:
+    severity, is_public, status, created_at, resolved_at = incident
+    shown = visibility(is_public)
+    add(deltas, Metric.INCIDENTS, created_at, sign, severity, shown, status)
+    if resolved_at is not None:
+        seconds = max(0, round((resolved_at - created_at).total_seconds()))
+        add(deltas, Metric.RESOLUTIONS, resolved_at, sign, severity, shown)
+        add(deltas, Metric.RESOLUTION_SECONDS, resolved_at, sign * seconds, severity, shown)
+
+
+def record_incident_change(before: IncidentSnapshot | None, incident: Incident) -> None:
+    """Apply the difference between an incident's previous snapshot (None when new) and now."""
+    deltas: Counter = Counter()
+    if before is not None:
+        _add_incident(deltas, before, -1)
+    _add_incident(deltas, snapshot(incident), 1)
+    apply(deltas)
+
+
+def record_subscribers(created_at: Iterable[datetime]) -> None:
+    deltas: Counter = Counter()
+    for value in created_at:
+        add(deltas, Metric.SUBSCRIBERS, value)
+    apply(deltas)
+
+
+def record_deliveries(deliveries: Iterable[EmailDelivery], previous_status: str | None = None) -> None:
+    """
+    Count new deliveries under their status, or, given `previous_status`, move existing
+    ones from it to their current status.
+    """
+    deltas: Counter = Counter()
+    for delivery in deliveries:
+        add(deltas, Metric.DELIVERIES, delivery.created_at, status=delivery.status)
+        if previous_status is not None:
+            add(deltas, Metric.DELIVERIES, delivery.created_at, -1, status=previous_status)
+    apply(deltas)
+
+
+def _cells(
+    metric: str, since: datetime | None = None, until: datetime | None = None, **filters
+) -> QuerySet:
+    """
+    Cells covering [since, until), to the hour: whole days come from the daily grain
+    and only the ragged ends from the hourly grain. Open bounds cover all history.
+    """
+    since_hour = hour_start(since) if since is not None else None
+    until_hour = hour_start(until) if until is not None else None
+    first_day = last_day = None
+    if since_hour is not None:
+        first_day = day_start(since_hour)
+        if first_day < since_hour:
+            first_day += timedelta(days=1)
+    if until_hour is not None:
+        last_day = day_start(until_hour)
+
+    if first_day is not None and last_day is not None and first_day >= last_day:
+        window = Q(grain=Grain.HOUR, bucket_start__gte=since_hour, bucket_start__lt=until_hour)
+    else:
+        days = {"grain": Grain.DAY}
+        if first_day is not None:
+            days["bucket_start__gte"] = first_day
+        if last_day is not None:
+            days["bucket_start__lt"] = last_day
+        window = Q(**days)
+        if since_hour is not None:
+            window |= Q(grain=Grain.HOUR, bucket_start__gte=since_hour, bucket_start__lt=first_day)
+        if until_hour is not None:
+            window |= Q(grain=Grain.HOUR, bucket_start__gte=last_day, bucket_start__lt=until_hour)
+    return MetricRollup.objects.filter(window, metric=metric, **filters)
+
+
+def total(metric: str, since: datetime | None = None, until: datetime | None = None, **filters) -> int:
+    return _cells(metric, since, until, **filters).aggregate(total=Sum("value"))["total"] or 0
+
+
+def breakdown(
+    metric: str, field: str, since: datetime | None = None, until: datetime | None = None, **filters
+) -> dict[str, int]:
+    """Totals per value of `field` (severity, visibility or status); zero totals are omitted."""
+    rows = _cells(metric, since, until, **filters).values(field).annotate(total=Sum("value")).order_by()
+    return {row[field]: row["total"] for row in rows if row["total"]}
+
+
+HOUR = "hour"
+DAY = "day"
+WEEK = "week"
+BUCKETS = (HOUR, DAY, WEEK)
+
+
+def bucket_floor(value: datetime, bucket: str) -> datetime:
+    """Start of the hour, day or (Monday-based) week containing `value`, in local time."""
+    if bucket == HOUR:
+        return hour_start(value)
+    start = day_start(value)
+    if bucket == WEEK:
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def next_bucket(start: datetime, bucket: str) -> datetime:
+    if bucket == HOUR:
+        # Step in absolute time so DST changes don't repeat or skip an hour.
+        return timezone.localtime(start.astimezone(dt_timezone.utc) + timedelta(hours=1))
+    # Aware arithmetic steps in wall-clock time, landing on the next local midnight.
+    return start + (timedelta(weeks=1) if bucket == WEEK else timedelta(days=1))
+
+
+def bucket_count(start: datetime, end: datetime, bucket: str) -> int:
+    """Number of buckets needed to cover [start, end), without materialising them."""
+    step = {HOUR: timedelta(hours=1), DAY: timedelta(days=1), WEEK: timedelta(weeks=1)}[bucket]
+    return max(1, math.ceil((end - bucket_floor(start, bucket)) / step))
+
+
+def bucket_starts(start: datetime, end: datetime, bucket: str) -> list[datetime]:
+    """Starts of the buckets covering [start, end); the first is `start` aligned down."""
+    starts = [bucket_floor(start, bucket)]
+    while (following := next_bucket(starts[-1], bucket)) < end:
+        starts.append(following)
+    return starts
+
+
+def series(
+    start: datetime, end: datetime, bucket: str, *fields: str, **filters
+) -> Counter:
+    """
+    Totals per `(bucket start, *fields)` for cells in [start, end) matching `filters`
+    (e.g. `metric=` or `metric__in=`), from one grouped query. Hour buckets read the
+    hourly cells; day and week buckets read the daily cells, weeks folded here, so a
+    year of daily buckets costs a few hundred rows per metric and dimension.
+    """
+    grain = Grain.HOUR if bucket == HOUR else Grain.DAY
+    rows = (
+        MetricRollup.objects.filter(
+            grain=grain,
+            bucket_start__gte=bucket_floor(start, bucket),
+            bucket_start__lt=end,
+            **filters,
+        )
+        .values("bucket_start", *fields)
+        .annotate(total=Sum("value"))
+        .order_by()
+    )
+    totals: Counter = Counter()
+    for row in rows:
+        key = (bucket_floor(row["bucket_start"], bucket), *(row[field] for field in fields))
+        totals[key] += row["total"]
+    return totals
+
+
+def add_source_counts(
+    deltas: Counter, incidents: QuerySet, subscribers: QuerySet, deliveries: QuerySet, archives: QuerySet
+) -> None:
+    """
+    Add the incident, subscriber and delivery cells for every row of the given source
+    querysets to `deltas`. Takes the querysets so migrations can pass historical models.
+    """
+    from incidents.services.email_maintenance import archived_deliveries
+
+    rows = incidents.values_list("severity", "is_public", "status", "created_at", "resolved_at")
+    for incident in rows.iterator(chunk_size=2000):
+        _add_incident(deltas, incident, 1)
+    for created_at in subscribers.values_list("created_at", flat=True).iterator(chunk_size=2000):
+        add(deltas, Metric.SUBSCRIBERS, created_at)
+    for created_at, status in deliveries.values_list("created_at", "status").iterator(chunk_size=2000):
+        add(deltas, Metric.DELIVERIES, created_at, status=status)
+    # Archived deliveries are gone from the hot table but still count towards history.
+    for archive in archives.iterator(chunk_size=50):
+        for row in archived_deliveries(archive):
+            add(deltas, Metric.DELIVERIES, parse_datetime(row["created_at"]), status=row["status"])
+
+
+def lock_cells() -> None:
+    """
+    Block counter writes until the current transaction ends, so a rebuild's scan and
+    swap can't lose increments that land in between. Writers apply their deltas in the
+    transaction that changed the source rows, so they wait here and add onto the rebuilt
+    cells afterwards. Other backends serialize write transactions already.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {MetricRollup._meta.db_table} IN SHARE ROW EXCLUSIVE MODE")
+
+
+def rebuild_all() -> int:
+    """Recompute every rollup cell from the source tables. Returns the number of cells written."""
+    from incidents.services import time_in_status
+
+    deltas: Counter = Counter()
+    with transaction.atomic():
+        lock_cells()
+        add_source_counts(
+            deltas,
+            Incident.objects.all(),
+            Subscriber.objects.all(),
+            EmailDelivery.objects.all(),
+            EmailDeliveryArchive.objects.all(),
+        )
+        time_in_status.add_status_durations(deltas)
+        return replace_cells(deltas)
+
+
+def replace_cells(deltas: Counter, metrics: Iterable[str] | None = None) -> int:
+    """
+    Swap in freshly computed cells, in one transaction, for the given metrics (every
+    metric by default). Returns the number of cells written.
+    """
+    cells = [
+        MetricRollup(value=amount, **dict(zip(KEY_FIELDS, key)))
+        for key, amount in deltas.items()
+        if amount
+    ]
+    stale = MetricRollup.objects.all()
+    if metrics is not None:
+        stale = stale.filter(metric__in=list(metrics))
+    with transaction.atomic():
+        stale.delete()
+        MetricRollup.objects.bulk_create(cells, batch_size=REBUILD_BATCH_SIZE)
+    return len(cells)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from incidents.models import Incident, ResolutionSketch
+
+RELATIVE_ACCURACY = 0.01
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+# Durations shorter than this (hours) land in the zero bucket.
+MIN_INDEXABLE_HOURS = 1e-6
+
+SketchKey = Tuple[date, str, bool]
+ResolutionSnapshot = Tuple[str, bool, datetime, datetime]
+
+
+class DDSketch:
+    """
+    Minimal DDSketch (Masson et al., 2019): values fall into logarithmic buckets of
+    width `gamma`, so any quantile is reported within `relative_accuracy` of the true
+    value. Sketches merge by adding bucket counts and support deletion by subtracting
+    them, which is what lets a reopened incident be taken back out.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value < MIN_INDEXABLE_HOURS:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            updated = self.bins.get(key, 0) + weight
+            if updated > 0:
+                self.bins[key] = updated
+            else:
+                self.bins.pop(key, None)
+        self.count += weight
+
+    def merge(self, other: "DDSketch") -> None:
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        key = None
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                break
+        if key is None:
+            return 0.0
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "bins": {str(key): count for key, count in self.bins.items()},
+            "zero_count": self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DDSketch":
+        sketch = cls()
+        sketch.bins = {int(key): count for key, count in (data.get("bins") or {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+def week_start(value: datetime) -> date:
+    local = timezone.localtime(value).date()
+    return local - timedelta(days=local.weekday())
+
+
+def _hours(created_at: datetime, resolved_at: datetime) -> float:
+    return max(0.0, (resolved_at - created_at).total_seconds() / 3600)
+
+
+def snapshot(incident: Incident) -> ResolutionSnapshot | None:
+    """The fields that place an incident's resolution in a sketch, or None if unresolved."""
+    if incident.resolved_at is None:
+        return None
+    return (incident.severity, incident.is_public, incident.created_at, incident.resolved_at)
+
+
+def _apply(resolution: ResolutionSnapshot, weight: int) -> None:
+    severity, is_public, created_at, resolved_at = resolution
+    row, _ = ResolutionSketch.objects.select_for_update().get_or_create(
+        week=week_start(resolved_at), severity=severity, is_public=is_public
+    )
+    sketch = DDSketch.from_dict(row.sketch)
+    sketch.add(_hours(created_at, resolved_at), weight)
+    row.sketch = sketch.to_dict()
+    row.count = sketch.count
+    row.save(update_fields=["sketch", "count", "updated_at"])
+
+
+def record_resolution_change(before: ResolutionSnapshot | None, incident: Incident) -> None:
+    """
+    Move an incident's resolution time between sketch cells after a change: a resolve
+    adds it, a reopen removes it, and edits to severity/visibility/timestamps of a
+    resolved incident move it. Call inside the transaction that saved the incident.
+    """
+    after = snapshot(incident)
+    if before == after:
+        return
+    with transaction.atomic():
+        if before is not None:
+            _apply(before, -1)
+        if after is not None:
+            _apply(after, 1)
+
+
+def rebuild_all() -> int:
+    """Recompute every sketch from resolved incidents. Returns the number of cells written."""
+    sketches: Dict[SketchKey, DDSketch] = {}
+    resolved = Incident.objects.filter(resolved_at__isnull=False).values_list(
+        "severity", "is_public", "created_at", "resolved_at"
+    )
+    for severity, is_public, created_at, resolved_at in resolved.iterator(chunk_size=2000):
+        key = (week_start(resolved_at), severity, is_public)
+        sketches.setdefault(key, DDSketch()).add(_hours(created_at, resolved_at))
+
+    with transaction.atomic():
+        ResolutionSketch.objects.all().delete()
+        ResolutionSketch.objects.bulk_create(
+            [
+                ResolutionSketch(
+                    week=week,
+                    severity=severity,
+                    is_public=is_public,
+                    count=sketch.count,
+                    sketch=sketch.to_dict(),
+                )
+                for (week, severity, is_public), sketch in sketches.items()
+            ]
+        )
+    return len(sketches)
+
+
+def merged_sketch(
+    severities: Iterable[str] | None = None,
+    is_public: bool | None = None,
+    since: date | None = None,
+    until: date | None = None,
+) -> DDSketch:
+    """
+    Merge the sketches for any combination of severities, visibility and weeks. Date
+    bounds select whole weeks: those overlapping `[since, until)`.
+    """
+    rows = ResolutionSketch.objects.filter(count__gt=0)
+    if severities is not None:
+        rows = rows.filter(severity__in=list(severities))
+    if is_public is not None:
+        rows = rows.filter(is_public=is_public)
+    if since is not None:
+        rows = rows.filter(week__gte=since - timedelta(days=since.weekday()))
+    if until is not None:
+        rows = rows.filter(week__lt=until)
+    merged = DDSketch()
+    for data in rows.values_list("sketch", flat=True):
+        merged.merge(DDSketch.from_dict(data))
+    return merged
+
+
+def resolution_percentiles(**filters) -> dict[str, float | None]:
+    """p50/p90/p95/p99 resolution time in hours (within 1%) for the selected cells."""
+    sketch = merged_sketch(**filters)
+    return {
+        name: (round(value, 2) if value is not None else None)
+        for name, value in ((name, sketch.quantile(q)) for name, q in PERCENTILES.items())
+    }
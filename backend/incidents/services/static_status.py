@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.html import escape
+
+from incidents.services import executor
+from incidents.services import status as status_service
+from incidents.tasks import publish_static_status
+
+logger = structlog.get_logger(__name__)
+
+STATUS_JSON_FILENAME = "status.json"
+STATUS_HTML_FILENAME = "status.html"
+GENERATION_KEY = "status_snapshot:generation"
+PUBLISH_LOCK_KEY = "status_snapshot:publish"
+PUBLISH_LOCK_TIMEOUT = 60  # seconds; a publisher that dies frees the lock by expiry
+
+
+def get_snapshot_dir() -> Path | None:
+    configured = getattr(settings, "STATUS_SNAPSHOT_DIR", "")
+    if not configured:
+        return None
+    return Path(configured)
+
+
+def render_status_json(data: dict) -> str:
+    return json.dumps(data, cls=DjangoJSONEncoder, indent=2)
+
+
+def render_status_html(data: dict) -> str:
+    rows = []
+    for incident in data["active_incidents"]:
+        latest = incident.get("latest_update") or {}
+        rows.append(
+            "<li>"
+            f"<strong>{escape(incident['title'])}</strong> "
+            f"<span>{escape(incident['severity'])} &middot; {escape(incident['status'])}</span>"
+            f"<p>{escape(latest.get('message') or incident['summary'])}</p>"
+            "</li>"
+        )
+    incidents_html = "<ul>" + "".join(rows) + "</ul>" if rows else "<p>No active incidents.</p>"
+    return (
+        "<!doctype html>\n"
+        '<html lang="en">\n'
+        "<head>\n"
+        '<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        '<meta http-equiv="refresh" content="60">\n'
+        "<title>System Status</title>\n"
+        "</head>\n"
+        "<body>\n"
+        f"<h1>{escape(data['overall_status'])}</h1>\n"
+        f"{incidents_html}\n"
+        f"<footer>Last updated {escape(data['generated_at'])}</footer>\n"
+        "</body>\n"
+        "</html>\n"
+    )
+
+
+def _atomic_write(directory: Path, filename: str, content: str) -> None:
+    """
+    Write to a temp file in the target directory and rename it into place so
+    readers (nginx, CDN origin pulls) never observe a partially written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(content)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, directory / filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def publish_status_snapshot(*, directory: Path | None = None, raise_errors: bool = False) -> Path | None:
+    """
+    Render the public status to `status.json` + `status.html` in the snapshot directory.
+
+    Returns the directory written to, or None when publishing is disabled or failed.
+    """
+    target = directory or get_snapshot_dir()
+    if target is None:
+        return None
+
+    # Built from the database rather than the cache, which may still hold a copy
+    # rendered before the change that triggered this publish.
+    data = dict(status_service.build_public_status_payload())
+    data["generated_at"] = timezone.now().isoformat()
+
+    try:
+        target.mkdir(parents=True, exist_ok=True)
+        _atomic_write(target, STATUS_JSON_FILENAME, render_status_json(data))
+        _atomic_write(target, STATUS_HTML_FILENAME, render_status_html(data))
+    except OSError:
+        if raise_errors:
+            raise
+        logger.exception("status_snapshot_publish_failed", directory=str(target))
+        return None
+    return target
+
+
+def _generation() -> int:
+    return cache.get(GENERATION_KEY, 0)
+
+
+def request_publish() -> None:
+    """
+    Queue a snapshot publish after incident data changed (called from `on_commit` hooks).
+
+    Bumping the generation first means a publish already under way notices the change
+    and renders again, so the last write always reflects the latest committed state.
+    """
+    if get_snapshot_dir() is None:
+        return
+    cache.add(GENERATION_KEY, 0, None)
+    cache.incr(GENERATION_KEY)
+    executor.submit(publish_static_status)
+
+
+def publish_pending() -> None:
+    """
+    Publish until the snapshot on disk is at the current generation.
+
+    Only one publisher runs at a time (a `cache.add` lock); one that finds the lock held
+    leaves the work to its holder, which re-renders while the generation keeps moving and
+    checks once more after letting go, so a change that lands just as it finishes is
+    still picked up by someone.
+    """
+    while True:
+        token = uuid.uuid4().hex
+        if not cache.add(PUBLISH_LOCK_KEY, token, PUBLISH_LOCK_TIMEOUT):
+            return
+        try:
+            while True:
+                generation = _generation()
+                publish_status_snapshot()
+                if _generation() == generation:
+                    break
+        finally:
+            # Only ours to delete if it hasn't expired and been taken by someone else since.
+            if cache.get(PUBLISH_LOCK_KEY) == token:
+                cache.delete(PUBLISH_LOCK_KEY)
+        if _generation() == generation:
+            return
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from django.core.cache import cache
-
 from incidents.models import Incident
+from incidents.serializers import IncidentSerializer
+from incidents.services import cache as two_tier_cache
 
+PUBLIC_STATUS_CACHE_SCOPE = "public_status"
 PUBLIC_STATUS_CACHE_KEY = "public_status_payload"
 PUBLIC_STATUS_TTL = 15  # seconds
 
@@ -21,22 +22,25 @@ def compute_overall_status(active_incidents: Iterable[Incident]) -> str:
     return "All Systems Operational"
 
 
-def get_public_status_payload():
-    cached = cache.get(PUBLIC_STATUS_CACHE_KEY)
-    if cached:
-        return cached
-
+def build_public_status_payload() -> dict:
     active_incidents = list(
         Incident.objects.filter(is_public=True).exclude(status=Incident.Status.RESOLVED)
     )
-    overall_status = compute_overall_status(active_incidents)
-    payload = {
-        "overall_status": overall_status,
-        "active_incidents": active_incidents,
+    return {
+        "overall_status": compute_overall_status(active_incidents),
+        "active_incidents": list(IncidentSerializer(active_incidents, many=True).data),
     }
-    cache.set(PUBLIC_STATUS_CACHE_KEY, payload, PUBLIC_STATUS_TTL)
-    return payload
+
+
+def get_public_status_payload() -> dict:
+    """Return the serialized public status, served from the two-tier cache."""
+    return two_tier_cache.get_or_set(
+        PUBLIC_STATUS_CACHE_SCOPE,
+        PUBLIC_STATUS_CACHE_KEY,
+        build_public_status_payload,
+        PUBLIC_STATUS_TTL,
+    )
 
 
 def invalidate_public_status_cache():
-    cache.delete(PUBLIC_STATUS_CACHE_KEY)
+    two_tier_cache.bump_version(PUBLIC_STATUS_CACHE_SCOPE)
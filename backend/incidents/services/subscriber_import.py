@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import csv
+import json
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from incidents.models import Incident, Subscriber
+from incidents.services import rollups
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+EXPORT_FIELDS = ["email", "scope", "incident", "is_active", "created_at"]
+
+_SCOPES = frozenset(Subscriber.Scope.values)
+_TRUE = {"1", "true", "t", "yes", "y"}
+_FALSE = {"0", "false", "f", "no", "n"}
+
+
+@dataclass
+class ImportResult:
+    received: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+        }
+
+
+def detect_format(content_type: str = "", filename: str = "") -> str:
+    """Pick CSV or NDJSON from a media type or file extension (CSV by default)."""
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return NDJSON
+    if filename.lower().endswith((".ndjson", ".jsonl")):
+        return NDJSON
+    return CSV
+
+
+def iter_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lazily yield `(line number, row)` from a text stream. CSV rows are dicts keyed by
+    the header; NDJSON rows are whatever each line decodes to (or the raw text when it
+    doesn't parse, so the validator can report it).
+    """
+    if fmt == CSV:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, line
+
+
+def _clean(raw: Any) -> Dict[str, Any]:
+    """Validate one row into Subscriber field values, raising ValidationError."""
+    if not isinstance(raw, dict):
+        raise ValidationError("Row must be an object")
+    email = str(raw.get("email") or "").strip()
+    validate_email(email)
+
+    scope = str(raw.get("scope") or Subscriber.Scope.GLOBAL).strip().upper()
+    if scope not in _SCOPES:
+        raise ValidationError(f"Unknown scope '{scope}'")
+
+    incident_id = None
+    if scope == Subscriber.Scope.INCIDENT:
+        try:
+            incident_id = uuid.UUID(str(raw.get("incident") or ""))
+        except ValueError:
+            raise ValidationError("INCIDENT scoped rows need a valid incident id") from None
+
+    is_active = raw.get("is_active", True)
+    if isinstance(is_active, str):
+        value = is_active.strip().lower()
+        if value in _TRUE or value == "":
+            is_active = True
+        elif value in _FALSE:
+            is_active = False
+        else:
+            raise ValidationError(f"Invalid is_active '{is_active}'")
+
+    return {"email": email, "scope": scope, "incident_id": incident_id, "is_active": bool(is_active)}
+
+
+def _import_chunk(chunk: List[Tuple[int, Any]], result: ImportResult) -> None:
+    cleaned: List[Tuple[int, Dict[str, Any]]] = []
+    for line_number, raw in chunk:
+        try:
+            cleaned.append((line_number, _clean(raw)))
+        except ValidationError as exc:
+            result.add_error(line_number, "; ".join(exc.messages))
+
+    # One lookup per chunk for every incident referenced in it.
+    incident_ids = {values["incident_id"] for _, values in cleaned if values["incident_id"]}
+    known = set(Incident.objects.filter(pk__in=incident_ids).values_list("pk", flat=True))
+
+    subscribers = []
+    for line_number, values in cleaned:
+        if values["incident_id"] and values["incident_id"] not in known:
+            result.add_error(line_number, f"Unknown incident {values['incident_id']}")
+            continue
+        subscribers.append(Subscriber(id=uuid.uuid4(), **values))
+    if not subscribers:
+        return
+
+    # Duplicates (within the file or against existing rows) hit the partial unique
+    # constraints and are skipped by the database instead of being checked row by row.
+    with transaction.atomic():
+        Subscriber.objects.bulk_create(subscribers, ignore_conflicts=True)
+        # Ids are generated here, so the rows that made it in are exactly those that exist.
+        created_at = list(
+            Subscriber.objects.filter(pk__in=[s.id for s in subscribers]).values_list(
+                "created_at", flat=True
+            )
+        )
+        rollups.record_subscribers(created_at)
+    created = len(created_at)
+    result.created += created
+    result.duplicates += len(subscribers) - created
+
+
+def import_subscribers(
+    rows: Iterable[Tuple[int, Any]], chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportResult:
+    """
+    Validate and insert subscribers from `(line number, row)` pairs, `chunk_size` rows
+    per round trip. Only one chunk is held in memory, so inputs can be arbitrarily large.
+    """
+    result = ImportResult()
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        result.received += len(chunk)
+        _import_chunk(chunk, result)
+    return result
+
+
+class _Echo:
+    """File-like object whose `write` hands the row back, for streaming `csv.writer`."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_export_csv() -> Iterator[str]:
+    """Yield the subscriber list as CSV lines, read with a server-side cursor."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    rows = (
+        Subscriber.objects.order_by("created_at", "id")
+        .values_list("email", "scope", "incident_id", "is_active", "created_at")
+        .iterator(chunk_size=2000)
+    )
+    for email, scope, incident_id, is_active, created_at in rows:
+        yield writer.writerow(
+            [email, scope, incident_id or "", "true" if is_active else "false", created_at.isoformat()]
+        )
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from incidents.models import Incident, IncidentUpdate, MetricRollup
+from incidents.services import rollups
+
+Metric = MetricRollup.Metric
+METRICS = (
+    Metric.ACKNOWLEDGEMENTS,
+    Metric.ACKNOWLEDGE_SECONDS,
+    Metric.STATUS_STAYS,
+    Metric.STATUS_SECONDS,
+)
+# Incidents created outside `create_incident` have no recorded initial status; they
+# are taken to have opened here, where the state machine starts.
+INITIAL_STATUS = Incident.Status.INVESTIGATING
+SCAN_CHUNK_SIZE = 2000
+
+
+def _seconds(start: datetime, end: datetime) -> int:
+    return max(0, round((end - start).total_seconds()))
+
+
+class _Timeline:
+    """
+    One incident's walk through its updates in order. An incident is acknowledged by its
+    first update; a stay in a status runs from entering it (creation, for the initial
+    status) until an update reports a different one, and is bucketed when it ends.
+    """
+
+    def __init__(self, created_at: datetime, severity: str, is_public: bool, initial_status: str):
+        self.created_at = created_at
+        self.severity, self.shown = severity, rollups.visibility(is_public)
+        self.status, self.entered_at = initial_status or INITIAL_STATUS, created_at
+        self.acknowledged = False
+
+    def step(self, deltas: Counter, status: str, at: datetime) -> None:
+        cell = (self.severity, self.shown)
+        if not self.acknowledged:
+            self.acknowledged = True
+            rollups.add(deltas, Metric.ACKNOWLEDGEMENTS, at, 1, *cell)
+            rollups.add(deltas, Metric.ACKNOWLEDGE_SECONDS, at, _seconds(self.created_at, at), *cell)
+        if status != self.status:
+            rollups.add(deltas, Metric.STATUS_STAYS, at, 1, *cell, self.status)
+            rollups.add(deltas, Metric.STATUS_SECONDS, at, _seconds(self.entered_at, at), *cell, self.status)
+            self.status, self.entered_at = status, at
+
+
+def add_status_durations(deltas: Counter, updates: QuerySet | None = None) -> None:
+    """
+    Add acknowledgement and time-in-status cells to `deltas` from one scan over every
+    update ordered by (incident, created_at), holding only the current incident's
+    state (see `_Timeline`). Stays still in progress aren't counted. `updates` defaults
+    to every `IncidentUpdate` (migrations pass a historical manager).
+    """
+    updates = (
+        (IncidentUpdate.objects.all() if updates is None else updates)
+        .order_by("incident_id", "created_at")
+        .values_list(
+            "incident_id",
+            "incident__created_at",
+            "incident__severity",
+            "incident__is_public",
+            "incident__initial_status",
+            "status_at_time",
+            "created_at",
+        )
+        .iterator(chunk_size=SCAN_CHUNK_SIZE)
+    )
+    current = timeline = None
+    for incident_id, created_at, severity, is_public, initial_status, status, at in updates:
+        if incident_id != current:
+            current, timeline = incident_id, _Timeline(created_at, severity, is_public, initial_status)
+        timeline.step(deltas, status, at)
+
+
+def _current_stay(incident: Incident, earlier: QuerySet, latest: str) -> tuple[str, datetime]:
+    """
+    The status the incident is in after `earlier` (whose latest update reported `latest`)
+    and when it entered it, from indexed lookups on (incident, created_at): the stay
+    began at the first update after the latest one reporting something else, or at
+    creation if nothing else was ever reported and the incident opened in `latest`.
+    """
+    changed_at = (
+        earlier.exclude(status_at_time=latest)
+        .order_by("-created_at")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    if changed_at is None and latest == (incident.initial_status or INITIAL_STATUS):
+        return latest, incident.created_at
+    since = earlier if changed_at is None else earlier.filter(created_at__gt=changed_at)
+    return latest, since.order_by("created_at").values_list("created_at", flat=True).first()
+
+
+def record_update(update: IncidentUpdate) -> None:
+    """
+    Apply the cells a newly posted update completes: the incident's acknowledgement if
+    it is the first update, and the stay it ends if it reports a new status. Call in the
+    transaction that created it; the current stay is looked up (see `_current_stay`)
+    rather than replayed from the incident's earlier updates.
+    """
+    incident = update.incident
+    cell = (incident.severity, rollups.visibility(incident.is_public))
+    at = update.created_at
+    earlier = IncidentUpdate.objects.filter(incident=incident, created_at__lte=at).exclude(pk=update.pk)
+    latest = earlier.order_by("-created_at").values_list("status_at_time", flat=True).first()
+    deltas: Counter = Counter()
+    if latest is None:
+        # No earlier update, so this one acknowledges the incident.
+        rollups.add(deltas, Metric.ACKNOWLEDGEMENTS, at, 1, *cell)
+        rollups.add(deltas, Metric.ACKNOWLEDGE_SECONDS, at, _seconds(incident.created_at, at), *cell)
+        status, entered_at = incident.initial_status or INITIAL_STATUS, incident.created_at
+    else:
+        status, entered_at = _current_stay(incident, earlier, latest)
+    if update.status_at_time != status:
+        rollups.add(deltas, Metric.STATUS_STAYS, at, 1, *cell, status)
+        rollups.add(deltas, Metric.STATUS_SECONDS, at, _seconds(entered_at, at), *cell, status)
+    rollups.apply(deltas)
+
+
+def record_incident_change(before: rollups.IncidentSnapshot, incident: Incident) -> None:
+    """
+    Move an incident's cells when its severity or visibility changed (`before` is its
+    `rollups.snapshot` from before the change): cells are keyed on the current values,
+    like the rebuild, so one pass over its updates yields the cells to add, and the
+    same cells under the old key are subtracted. A no-op otherwise.
+    """
+    previous = (before[0], rollups.visibility(before[1]))
+    if previous == (incident.severity, rollups.visibility(incident.is_public)):
+        return
+    timeline = _Timeline(incident.created_at, incident.severity, incident.is_public, incident.initial_status)
+    cells: Counter = Counter()
+    updates = IncidentUpdate.objects.filter(incident=incident).order_by("created_at")
+    for status, at in updates.values_list("status_at_time", "created_at").iterator():
+        timeline.step(cells, status, at)
+    deltas = Counter(cells)
+    for (grain, metric, bucket_start, _, _, status), amount in cells.items():
+        deltas[(grain, metric, bucket_start, *previous, status)] -= amount
+    rollups.apply(deltas)
+
+
+def refresh() -> int:
+    """
+    Recompute the acknowledgement and time-in-status cells from scratch, serialized
+    against incremental writes like `rollups.rebuild_all`. Returns the number written.
+    """
+    deltas: Counter = Counter()
+    with transaction.atomic():
+        rollups.lock_cells()
+        add_status_durations(deltas)
+        return rollups.replace_cells(deltas, METRICS)
+
+
+def _mean_hours(seconds: int, count: int) -> float | None:
+    return round(seconds / count / 3600, 2) if count else None
+
+
+def mtta_hours(**filters) -> float | None:
+    """Mean time from opening an incident to its first update, in hours."""
+    return _mean_hours(
+        rollups.total(Metric.ACKNOWLEDGE_SECONDS, **filters),
+        rollups.total(Metric.ACKNOWLEDGEMENTS, **filters),
+    )
+
+
+def status_durations(**filters) -> dict[str, dict[str, object]]:
+    """Mean hours spent in each unresolved status per completed stay, and the stay count."""
+    stays = rollups.breakdown(Metric.STATUS_STAYS, "status", **filters)
+    seconds = rollups.breakdown(Metric.STATUS_SECONDS, "status", **filters)
+    return {
+        status: {
+            "mean_hours": _mean_hours(seconds.get(status, 0), stays.get(status, 0)),
+            "stays": stays.get(status, 0),
+        }
+        for status in Incident.Status.values
+        if status != Incident.Status.RESOLVED
+    }
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from incidents.models import DailyUptime, Incident
+from incidents.services import cache as two_tier_cache
+from incidents.services.public import render_cached_payload
+
+UPTIME_CACHE_SCOPE = "public_uptime"
+UPTIME_CACHE_TTL = 60  # seconds
+DEFAULT_UPTIME_DAYS = 90
+MAX_UPTIME_DAYS = 365
+MINUTES_PER_DAY = 24 * 60
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def _local_date(value: datetime) -> date:
+    return timezone.localtime(value).date()
+
+
+def compute_days(first_day: date, last_day: date) -> dict[date, dict]:
+    """
+    Compute per-day uptime stats for public incidents between two dates (inclusive).
+
+    Uses a single query for every incident overlapping the range; overlapping incidents
+    are merged so concurrent outages are not double counted.
+    """
+    now = timezone.now()
+    range_start, _ = _day_bounds(first_day)
+    _, range_end = _day_bounds(last_day)
+    incidents = Incident.objects.filter(is_public=True, created_at__lt=range_end).filter(
+        Q(resolved_at__isnull=True) | Q(resolved_at__gt=range_start)
+    ).values_list("severity", "created_at", "resolved_at")
+
+    per_day: dict[date, dict] = {}
+    for severity, created_at, resolved_at in incidents:
+        opened = max(created_at, range_start)
+        closed = min(resolved_at or now, range_end, now)
+        if closed <= opened:
+            continue
+        day = _local_date(opened)
+        while day <= last_day:
+            day_start, day_end = _day_bounds(day)
+            if day_start >= closed:
+                break
+            stats = per_day.setdefault(day, {"severities": set(), "intervals": []})
+            stats["severities"].add(severity)
+            stats["intervals"].append((max(opened, day_start), min(closed, day_end)))
+            day += timedelta(days=1)
+
+    results: dict[date, dict] = {}
+    for day, stats in per_day.items():
+        outage_seconds = 0.0
+        current_start = current_end = None
+        for start, end in sorted(stats["intervals"]):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    outage_seconds += (current_end - current_start).total_seconds()
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            outage_seconds += (current_end - current_start).total_seconds()
+        results[day] = {
+            "worst_severity": min(stats["severities"]),
+            "outage_minutes": min(MINUTES_PER_DAY, round(outage_seconds / 60)),
+            "incident_count": len(stats["intervals"]),
+        }
+    return results
+
+
+def refresh_days(first_day: date, last_day: date) -> int:
+    """
+    Recompute and persist the rollup rows for a date range. Returns rows written.
+
+    Rows are upserted on `date`, so concurrent refreshes of the same day both succeed
+    (the last one wins) instead of racing a delete against the unique constraint.
+    """
+    computed = compute_days(first_day, last_day)
+    with transaction.atomic():
+        DailyUptime.objects.filter(date__gte=first_day, date__lte=last_day).exclude(
+            date__in=list(computed)
+        ).delete()
+        DailyUptime.objects.bulk_create(
+            [DailyUptime(date=day, **stats) for day, stats in sorted(computed.items())],
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=["worst_severity", "outage_minutes", "incident_count", "updated_at"],
+        )
+    two_tier_cache.bump_version(UPTIME_CACHE_SCOPE)
+    return len(computed)
+
+
+def refresh_for_incident(incident: Incident, previous_resolved_at: datetime | None = None) -> None:
+    """
+    Incrementally refresh only the days an incident touches (including the span it
+    covered before a reopen), clamped to the longest window the endpoint serves.
+    """
+    today = _local_date(timezone.now())
+    earliest_allowed = today - timedelta(days=MAX_UPTIME_DAYS - 1)
+    first_day = max(_local_date(incident.created_at), earliest_allowed)
+    last_candidates = [today if incident.resolved_at is None else _local_date(incident.resolved_at)]
+    if previous_resolved_at is not None:
+        last_candidates.append(_local_date(previous_resolved_at))
+    last_day = min(max(last_candidates), today)
+    if last_day < first_day:
+        return
+    refresh_days(first_day, last_day)
+
+
+def _build_uptime_payload(days: int) -> dict:
+    today = _local_date(timezone.now())
+    first_day = today - timedelta(days=days - 1)
+    stored = {
+        row.date: {
+            "worst_severity": row.worst_severity,
+            "outage_minutes": row.outage_minutes,
+            "incident_count": row.incident_count,
+        }
+        for row in DailyUptime.objects.filter(date__gte=first_day, date__lte=today)
+    }
+
+    # Rows touched by still-open incidents were written mid-day; recompute them live.
+    earliest_active = Incident.objects.filter(is_public=True, resolved_at__isnull=True).aggregate(
+        earliest=Min("created_at")
+    )["earliest"]
+    live_from = today
+    if earliest_active is not None:
+        live_from = max(min(_local_date(earliest_active), today), first_day)
+    for day in [d for d in stored if d >= live_from]:
+        del stored[day]
+    stored.update(compute_days(live_from, today))
+
+    empty = {"worst_severity": "", "outage_minutes": 0, "incident_count": 0}
+    series = []
+    total_outage = 0
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        stats = stored.get(day, empty)
+        total_outage += stats["outage_minutes"]
+        series.append(
+            {
+                "date": day.isoformat(),
+                "worst_severity": stats["worst_severity"] or None,
+                "outage_minutes": stats["outage_minutes"],
+                "incident_count": stats["incident_count"],
+                "uptime_percent": round(100 * (1 - stats["outage_minutes"] / MINUTES_PER_DAY), 3),
+            }
+        )
+
+    return render_cached_payload(
+        {
+            "days": series,
+            "uptime_percent": round(100 * (1 - total_outage / (MINUTES_PER_DAY * days)), 3),
+        }
+    )
+
+
+def get_uptime_payload(days: int = DEFAULT_UPTIME_DAYS) -> dict:
+    """Return `{"data": ..., "etag": ...}` for the last `days` days of public uptime."""
+    return two_tier_cache.get_or_set(
+        UPTIME_CACHE_SCOPE,
+        f"days:{days}",
+        lambda: _build_uptime_payload(days),
+        UPTIME_CACHE_TTL,
+    )
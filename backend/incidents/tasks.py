@@ -1,28 +1,86 @@
+import uuid
+from datetime import timedelta
+
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
 from incidents.models import EmailDelivery
+from incidents.services import email_throttle, rollups
+
+
+def _retry_backoff(attempts: int) -> int:
+    return min(60 * (2 ** (attempts - 1)), 900)
+
+
+def notification_queue(priority: str) -> str:
+    """Celery queue for a `NotificationMessage.Priority` (declared in config/celery.py)."""
+    return f"notifications.{priority}"
+
+
+def _claim(delivery_ids: list[str]) -> list[EmailDelivery]:
+    """
+    Claim the given deliveries for this task and return the ones it got.
+
+    One UPDATE stamps a fresh claim token, bumps `attempts` and sets `last_attempt_at` on
+    rows that are still PENDING and not held by another task (claims older than
+    `EMAIL_STALE_PENDING_SECONDS` are presumed dead), and only rows carrying that token
+    are sent. Overlapping tasks for the same ids therefore never both send a row.
+    """
+    token = uuid.uuid4()
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.EMAIL_STALE_PENDING_SECONDS)
+    EmailDelivery.objects.filter(id__in=delivery_ids, status=EmailDelivery.Status.PENDING).filter(
+        Q(claim_token__isnull=True) | Q(last_attempt_at__lt=expired)
+    ).update(claim_token=token, attempts=F("attempts") + 1, last_attempt_at=now)
+    claimed = EmailDelivery.objects.filter(id__in=delivery_ids, claim_token=token).select_related("message")
+    # Send in the order the caller queued them.
+    position = {str(delivery_id): index for index, delivery_id in enumerate(delivery_ids)}
+    return sorted(claimed, key=lambda delivery: position[str(delivery.id)])
+
+
+def _release(deliveries: list[EmailDelivery], fields: list[str]) -> list[EmailDelivery]:
+    """
+    Write `fields` back for the claimed rows this task still holds, release their claim,
+    and move the finished ones' delivery counters, all in one transaction. Returns the
+    rows written; a row whose claim expired and was taken over belongs to the other task.
+    """
+    Status = EmailDelivery.Status
+    tokens = {delivery.claim_token for delivery in deliveries}
+    with transaction.atomic():
+        held = set(
+            EmailDelivery.objects.select_for_update()
+            .filter(
+                id__in=[delivery.id for delivery in deliveries],
+                claim_token__in=tokens,
+                status=Status.PENDING,
+            )
+            .values_list("id", flat=True)
+        )
+        written = [delivery for delivery in deliveries if delivery.id in held]
+        for delivery in written:
+            delivery.claim_token = None
+        EmailDelivery.objects.bulk_update(written, [*fields, "claim_token"])
+        rollups.record_deliveries([d for d in written if d.status != Status.PENDING], Status.PENDING)
+    return written
 
 
 @shared_task(bind=True, max_retries=5)
 def send_email_delivery(self, delivery_id: str):
-    try:
-        delivery = EmailDelivery.objects.get(id=delivery_id)
-    except EmailDelivery.DoesNotExist:
+    claimed = _claim([delivery_id])
+    if not claimed:
         return
-
-    delivery.attempts += 1
-    delivery.last_attempt_at = timezone.now()
-    delivery.save(update_fields=["attempts", "last_attempt_at"])
+    delivery = claimed[0]
 
     from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "status@example.com")
 
     try:
         send_mail(
-            subject=delivery.subject,
-            message=delivery.body,
+            subject=delivery.message.subject,
+            message=delivery.message.body,
             from_email=from_email,
             recipient_list=[delivery.subscriber_email],
             fail_silently=False,
@@ -30,13 +88,183 @@ def send_email_delivery(self, delivery_id: str):
         delivery.status = EmailDelivery.Status.SENT
         delivery.sent_at = timezone.now()
         delivery.last_error = ""
-        delivery.save(update_fields=["status", "sent_at", "last_error"])
+        _release([delivery], ["status", "sent_at", "last_error"])
     except Exception as exc:  # pragma: no cover - relies on email backend
         delivery.last_error = str(exc)
-        delivery.save(update_fields=["last_error"])
         if delivery.attempts >= self.max_retries:
             delivery.status = EmailDelivery.Status.FAILED
-            delivery.save(update_fields=["status"])
+            _release([delivery], ["status", "last_error"])
             return
-        backoff = min(60 * (2 ** (delivery.attempts - 1)), 900)
-        raise self.retry(exc=exc, countdown=backoff)
+        domain = email_throttle.domain_of(delivery.subscriber_email)
+        pause = email_throttle.deferral_hint(exc)
+        if pause is not None:
+            email_throttle.defer(domain, pause)
+        countdown = max(_retry_backoff(delivery.attempts), email_throttle.deferred_for(domain))
+        delivery.next_attempt_at = timezone.now() + timedelta(seconds=countdown)
+        if _release([delivery], ["last_error", "next_attempt_at"]):
+            raise self.retry(exc=exc, countdown=countdown)
+
+
+MAX_BATCH_DEFERRALS = 5
+
+
+@shared_task
+def send_email_delivery_batch(delivery_ids: list[str], deferrals: int = 0):
+    """
+    Send one chunk of pending deliveries over a single backend connection.
+
+    Rows are claimed first (see `_claim`), so only PENDING rows no other task holds are
+    sent. Each message is still accounted individually: the claim records the attempt,
+    results are written back with one bulk update that also releases the claim (see
+    `_release`), and failures below the retry limit are handed to `send_email_delivery`
+    with the usual backoff.
+
+    A connection- or rate-level reply pauses the recipient's domain (see
+    `email_throttle.deferral_hint`); the rest of that domain's messages in the batch are
+    not attempted and go back through `dispatch_deliveries`, paced from when the pause
+    lifts, up to `MAX_BATCH_DEFERRALS` times. Other temporary failures only retry the
+    one recipient.
+    """
+    deliveries = _claim(delivery_ids)
+    if not deliveries:
+        return
+
+    paused = email_throttle.deferred_domains(
+        email_throttle.domain_of(delivery.subscriber_email) for delivery in deliveries
+    )
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "status@example.com")
+    sent: list[EmailDelivery] = []
+    errored: list[EmailDelivery] = []
+    skipped: list[EmailDelivery] = []
+    deferred: list[EmailDelivery] = []
+    connection = get_connection(fail_silently=False)
+    try:
+        for delivery in deliveries:
+            domain = email_throttle.domain_of(delivery.subscriber_email)
+            if domain in paused:
+                skipped.append(delivery)
+                continue
+            message = EmailMessage(
+                subject=delivery.message.subject,
+                body=delivery.message.body,
+                from_email=from_email,
+                to=[delivery.subscriber_email],
+                connection=connection,
+            )
+            try:
+                # Opening is a no-op while the session is alive; after a failure we
+                # closed it, so this transparently reconnects for the next message.
+                connection.open()
+                if not connection.send_messages([message]):
+                    raise RuntimeError("Email backend did not accept the message")
+            except Exception as exc:
+                delivery.last_error = str(exc)
+                pause = email_throttle.deferral_hint(exc)
+                if pause is not None:
+                    email_throttle.defer(domain, pause)
+                    paused[domain] = pause
+                if delivery.attempts >= send_email_delivery.max_retries:
+                    delivery.status = EmailDelivery.Status.FAILED
+                elif pause is not None:
+                    deferred.append(delivery)
+                errored.append(delivery)
+                connection.close()
+                continue
+            delivery.status = EmailDelivery.Status.SENT
+            delivery.sent_at = timezone.now()
+            delivery.last_error = ""
+            sent.append(delivery)
+    finally:
+        connection.close()
+
+    for delivery in skipped:
+        # Never handed to the backend, so the attempt recorded by the claim doesn't count.
+        delivery.attempts -= 1
+
+    # Work out what runs next before writing back, so every row still PENDING carries
+    # when its follow-up task is due (requeued rows are stamped by dispatch_deliveries).
+    now = timezone.now()
+    requeue = skipped + deferred
+    if requeue and deferrals < MAX_BATCH_DEFERRALS:
+        deferred_ids = {delivery.id for delivery in deferred}
+        retry_individually = [d for d in errored if d.id not in deferred_ids]
+    else:
+        requeue = []
+        retry_individually = errored + skipped
+    retries: list[tuple[EmailDelivery, float]] = []
+    for delivery in retry_individually:
+        if delivery.status == EmailDelivery.Status.PENDING:
+            domain = email_throttle.domain_of(delivery.subscriber_email)
+            countdown = max(
+                _retry_backoff(max(delivery.attempts, 1)), email_throttle.deferred_for(domain)
+            )
+            delivery.next_attempt_at = now + timedelta(seconds=countdown)
+            retries.append((delivery, countdown))
+
+    written = _release(deliveries, ["status", "attempts", "sent_at", "last_error", "next_attempt_at"])
+    # Follow-ups only for rows this task still held when writing back.
+    held = {delivery.id for delivery in written}
+
+    # Batches are dispatched per message priority, so the first row speaks for all.
+    priority = deliveries[0].message.priority
+    requeue = [delivery for delivery in requeue if delivery.id in held]
+    if requeue:
+        from incidents.services import notifications
+
+        # Back through the domain's token bucket, whose clock starts when the pause lifts.
+        notifications.dispatch_deliveries(requeue, priority, deferrals=deferrals + 1)
+    queue = notification_queue(priority)
+    for delivery, countdown in retries:
+        if delivery.id in held:
+            send_email_delivery.apply_async((str(delivery.id),), countdown=countdown, queue=queue)
+
+
+@shared_task
+def fan_out_notification(event: str, incident_id: str, object_id: str | None = None):
+    """Resolve recipients and create deliveries for a notification, off the request path."""
+    from incidents.services import notifications
+
+    return notifications.fan_out(event, incident_id, object_id)
+
+
+@shared_task
+def flush_notification_digests():
+    """Scheduled by celery beat; sends digests whose window has elapsed."""
+    from incidents.services import notifications
+
+    return notifications.flush_due_digests()
+
+
+@shared_task
+def refresh_admin_metrics_snapshot(weeks: int | None = None, lock_token: str | None = None):
+    """
+    Recompute the cached admin metrics snapshot (scheduled by beat, or on a stale read,
+    which passes the refresh lock it took so this releases it).
+    """
+    from incidents.services import metrics, metrics_snapshot
+
+    metrics_snapshot.refresh(weeks or metrics.DEFAULT_MTTR_WEEKS, lock_token=lock_token)
+
+
+@shared_task
+def publish_static_status():
+    """Re-render the static status files after a change (see `static_status.request_publish`)."""
+    from incidents.services import static_status
+
+    static_status.publish_pending()
+
+
+@shared_task
+def sweep_stale_email_deliveries():
+    """Scheduled by celery beat; re-dispatches PENDING deliveries whose task was lost."""
+    from incidents.services import email_maintenance
+
+    return email_maintenance.sweep_stale_pending()
+
+
+@shared_task
+def archive_email_deliveries():
+    """Scheduled by celery beat; moves old finished deliveries to the archive table."""
+    from incidents.services import email_maintenance
+
+    return email_maintenance.archive_finished_deliveries()
@@ -0,0 +1,141 @@
+"""
+Minimal threaded SMTP sink for exercising the real SMTP email backend in tests.
+
+Speaks just enough SMTP for `smtplib` (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT),
+stores nothing but message/connection counters, and can refuse (550), report busy
+(450) or rate-limit (451) chosen recipients to simulate per-message failures and
+provider throttling. `aiosmtpd` would work too, but the stdlib keeps the
+test suite dependency-free (`smtpd` was removed in Python 3.12).
+
+Run standalone for local throughput experiments:
+
+    python -m incidents.tests.smtp_sink 1025
+"""
+from __future__ import annotations
+
+import socketserver
+import sys
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        sink: SMTPSink = self.server.sink
+        sink._record_connection()
+        self._reply("220 localhost SMTP sink ready")
+        recipients: list[str] = []
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line in (b".\r\n", b".\n"):
+                    in_data = False
+                    sink._record_message(recipients)
+                    recipients = []
+                    self._reply("250 OK: queued")
+                continue
+
+            command = line.strip().decode("ascii", errors="replace")
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250 8BITMIME\r\n")
+            elif verb == "HELO":
+                self._reply("250 localhost")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in sink.refuse_recipients:
+                    self._reply("550 Mailbox unavailable")
+                elif address in sink.defer_recipients:
+                    self._reply("451 4.7.1 Rate limited, try again in 45 seconds")
+                elif address in sink.busy_recipients:
+                    self._reply("450 4.2.1 Mailbox busy")
+                else:
+                    recipients.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                in_data = True
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+            elif verb in ("RSET", "NOOP"):
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPSink:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        refuse_recipients=(),
+        defer_recipients=(),
+        busy_recipients=(),
+    ):
+        self.refuse_recipients = set(refuse_recipients)
+        self.defer_recipients = set(defer_recipients)
+        self.busy_recipients = set(busy_recipients)
+        self.connections = 0
+        self.messages = 0
+        self.recipients: list[str] = []
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.sink = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _record_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def _record_message(self, recipients: list[str]) -> None:
+        with self._lock:
+            self.messages += 1
+            self.recipients.extend(recipients)
+
+    def start(self) -> "SMTPSink":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":  # pragma: no cover - manual tool
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 1025
+    sink = SMTPSink(port=port).start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\n{sink.messages} messages over {sink.connections} connections")
+        sink.stop()
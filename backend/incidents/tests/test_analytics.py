@@ -4,6 +4,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from incidents.models import Incident
+from incidents.services import rollups
 from incidents.services.analytics import get_incident_analytics
 
 
@@ -28,6 +29,8 @@ class IncidentAnalyticsTests(TestCase):
             is_public=True,
             created_by_name="Bob",
         )
+        # Seeded straight through the ORM, so the rollups are rebuilt from the table.
+        rollups.rebuild_all()
 
     def test_returns_mttr_and_counts(self):
         analytics = get_incident_analytics()
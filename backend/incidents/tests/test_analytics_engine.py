@@ -0,0 +1,138 @@
+import io
+import json
+import math
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from incidents.models import Incident
+from incidents.services import metrics, rollups
+from incidents.services.analytics_engine import SEVERITIES, IncidentFrame
+
+
+class IncidentFrameTests(TestCase):
+    def setUp(self):
+        self.end = timezone.now()
+        self.start = self.end - timedelta(days=30)
+        self.frame = IncidentFrame.synthetic(2000, self.start, self.end, seed=11, open_ratio=0.1)
+        self.rows = list(
+            zip(
+                self.frame.created.tolist(),
+                self.frame.resolved.tolist(),
+                self.frame.severity.tolist(),
+                self.frame.is_public.tolist(),
+            )
+        )
+
+    def test_open_counts_match_brute_force(self):
+        points = [self.start.timestamp() + hours * 3600 for hours in range(0, 30 * 24, 7)]
+        expected = [
+            sum(1 for created, resolved, _, _ in self.rows if created <= point and not resolved < point)
+            for point in points
+        ]
+        self.assertEqual(self.frame.open_at(points).tolist(), expected)
+
+    def test_bucket_counts_and_mttr_match_brute_force(self):
+        edges = [self.start.timestamp() + days * 86400 for days in range(31)]
+        for is_public in (None, True, False):
+            with self.subTest(is_public=is_public):
+                mttr = self.frame.mttr_by_bucket(edges, is_public=is_public)
+                for index in range(30):
+                    hours = [
+                        (resolved - created) / 3600
+                        for created, resolved, _, public in self.rows
+                        if edges[index] <= resolved < edges[index + 1]
+                        and (is_public is None or public == is_public)
+                    ]
+                    if hours:
+                        self.assertAlmostEqual(mttr[index], sum(hours) / len(hours), places=6)
+                    else:
+                        self.assertTrue(math.isnan(mttr[index]))
+
+        opened = self.frame.counts_by_bucket(edges)
+        self.assertEqual(int(opened.sum()), len(self.rows))
+        self.assertEqual(
+            int(opened[3]), sum(1 for created, *_ in self.rows if edges[3] <= created < edges[4])
+        )
+
+    def test_percentiles_histogram_and_severities(self):
+        hours = sorted(
+            (resolved - created) / 3600 for created, resolved, *_ in self.rows if not math.isnan(resolved)
+        )
+        median = (hours[(len(hours) - 1) // 2] + hours[len(hours) // 2]) / 2
+        self.assertAlmostEqual(self.frame.percentiles()["p50"], median, places=2)
+
+        counts, edges = self.frame.resolution_histogram()
+        self.assertEqual(int(counts.sum()), len(hours))
+        self.assertEqual(int(counts[0]), sum(1 for value in hours if value < edges[1]))
+
+        self.assertEqual(
+            self.frame.severity_counts(),
+            {severity: sum(1 for row in self.rows if row[2] == code) for code, severity in enumerate(SEVERITIES)},
+        )
+
+
+class IncidentReportTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.end = rollups.bucket_floor(now, rollups.DAY)
+        self.start = self.end - timedelta(days=7)
+        spans = [
+            (Incident.Severity.SEV1, True, timedelta(days=6), timedelta(hours=2)),
+            (Incident.Severity.SEV2, False, timedelta(days=3), timedelta(hours=5)),
+            (Incident.Severity.SEV3, True, timedelta(days=2), None),
+            (Incident.Severity.SEV4, True, timedelta(days=20), timedelta(days=1)),  # outside the range
+        ]
+        for severity, is_public, ago, duration in spans:
+            created_at = self.end - ago + timedelta(hours=1)
+            incident = Incident.objects.create(
+                title="Incident",
+                summary="",
+                severity=severity,
+                is_public=is_public,
+                status=Incident.Status.RESOLVED if duration else Incident.Status.INVESTIGATING,
+                created_by_name="Alice",
+            )
+            Incident.objects.filter(pk=incident.pk).update(
+                created_at=created_at, resolved_at=created_at + duration if duration else None
+            )
+        rollups.rebuild_all()
+
+    def test_report_from_database_matches_rollup_timeline(self):
+        frame = IncidentFrame.load(self.start, self.end)
+        self.assertEqual(len(frame), 3)
+
+        report = metrics.get_incident_report(self.start, self.end, rollups.DAY)
+        self.assertEqual(report["range"]["buckets"], 7)
+        self.assertEqual(sum(row["opened"] for row in report["buckets"]), 3)
+        self.assertEqual(sum(row["resolved"] for row in report["buckets"]), 2)
+        self.assertEqual(report["visibility_breakdown"], {"public": 2, "internal": 1})
+        self.assertEqual(report["percentiles"]["p50"], 3.5)
+        self.assertEqual(report["percentiles_by_severity"][Incident.Severity.SEV1]["p50"], 2.0)
+
+        mttr = [row["mttr_hours"] for row in report["buckets"] if row["mttr_hours"] is not None]
+        self.assertEqual(mttr, [2.0, 5.0])
+
+        ranged = metrics.get_range_metrics(self.start, self.end, rollups.DAY)
+        self.assertEqual(
+            [row["open_at_start"] for row in report["buckets"]],
+            [point["count"] for point in ranged["incident_pulse"]["timeline"]],
+        )
+
+    def test_command_writes_synthetic_report(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "incident_report",
+            "--from=2025-01-01",
+            "--to=2025-04-01",
+            "--bucket=day",
+            "--synthetic=5000",
+            stdout=stdout,
+            stderr=stderr,
+        )
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["range"]["buckets"], 90)
+        self.assertEqual(sum(report["severity_breakdown"].values()), 5000)
+        self.assertIn("5000 incidents", stderr.getvalue())
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from incidents.services import cache as two_tier_cache
+
+
+class LocalLRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_entry(self):
+        lru = two_tier_cache.LocalLRUCache(max_entries=2)
+        lru.set("a", 1, timeout=60)
+        lru.set("b", 2, timeout=60)
+        lru.get("a")
+        lru.set("c", 3, timeout=60)
+
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIs(lru.get("b"), two_tier_cache._MISSING)
+        self.assertEqual(len(lru), 2)
+
+    def test_expired_entries_are_misses(self):
+        lru = two_tier_cache.LocalLRUCache(max_entries=2)
+        lru.set("a", 1, timeout=0)
+        self.assertIs(lru.get("a"), two_tier_cache._MISSING)
+
+
+class VersionedCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        two_tier_cache.local_cache.clear()
+
+    def test_local_tier_serves_repeat_reads(self):
+        builder = mock.Mock(return_value={"value": 1})
+        two_tier_cache.get_or_set("scope", "key", builder, timeout=60)
+
+        with mock.patch.object(cache, "get", wraps=cache.get) as shared_get:
+            value = two_tier_cache.get_or_set("scope", "key", builder, timeout=60)
+
+        self.assertEqual(value, {"value": 1})
+        builder.assert_called_once()
+        # Only the version counter is read from the shared tier.
+        shared_get.assert_called_once_with("cache_version:scope")
+
+    def test_bump_version_invalidates_other_workers(self):
+        two_tier_cache.get_or_set("scope", "key", lambda: "old", timeout=60)
+        two_tier_cache.bump_version("scope")
+
+        # A different worker has its own (still populated) LRU but observes the new version.
+        value = two_tier_cache.get_or_set("scope", "key", lambda: "new", timeout=60)
+        self.assertEqual(value, "new")
+
+    def test_shared_tier_fills_empty_local_tier(self):
+        two_tier_cache.get_or_set("scope", "key", lambda: "shared", timeout=60)
+        two_tier_cache.local_cache.clear()
+
+        builder = mock.Mock(return_value="rebuilt")
+        value = two_tier_cache.get_or_set("scope", "key", builder, timeout=60)
+        self.assertEqual(value, "shared")
+        builder.assert_not_called()
+
+    def test_version_survives_eviction_without_reuse(self):
+        first = two_tier_cache.get_version("scope")
+        cache.delete("cache_version:scope")
+        self.assertGreater(two_tier_cache.bump_version("scope"), first)
+
+    @override_settings(CACHE_VERSION_TTL=600)
+    def test_versions_and_misses_expire(self):
+        with mock.patch.object(cache, "add", wraps=cache.add) as shared_add, mock.patch.object(
+            cache, "set", wraps=cache.set
+        ) as shared_set:
+            self.assertIsNone(two_tier_cache.get_or_set("unknown", "key", lambda: None, timeout=600))
+
+        shared_add.assert_called_once_with(mock.ANY, mock.ANY, timeout=600)
+        shared_set.assert_called_once_with(mock.ANY, None, two_tier_cache.EMPTY_RESULT_TTL)
@@ -0,0 +1,151 @@
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from incidents.models import EmailDelivery, Incident, NotificationMessage
+from incidents.services import email_throttle
+from incidents.tasks import send_email_delivery, send_email_delivery_batch
+from incidents.tests.smtp_sink import SMTPSink
+
+
+class SMTPBatchSendTests(TestCase):
+    def setUp(self):
+        self.incident = Incident.objects.create(
+            title="DB outage",
+            summary="Investigating database connectivity",
+            severity=Incident.Severity.SEV1,
+            status=Incident.Status.INVESTIGATING,
+            is_public=True,
+            created_by_name="Alice",
+        )
+        cache.clear()
+        self.sink = SMTPSink(
+            refuse_recipients={"bounce@example.com"},
+            defer_recipients={"throttled@slow.test"},
+        ).start()
+        self.addCleanup(self.sink.stop)
+
+    def _smtp_settings(self):
+        return override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST=self.sink.host,
+            EMAIL_PORT=self.sink.port,
+            EMAIL_USE_TLS=False,
+        )
+
+    def _deliveries(self, emails, attempts=0):
+        message = NotificationMessage.objects.create(
+            incident=self.incident, subject="Subject", body="Body"
+        )
+        return EmailDelivery.objects.bulk_create(
+            [
+                EmailDelivery(
+                    incident=self.incident,
+                    message=message,
+                    subscriber_email=email,
+                    attempts=attempts,
+                )
+                for email in emails
+            ]
+        )
+
+    def test_batch_reuses_one_smtp_connection(self):
+        deliveries = self._deliveries([f"user{index}@example.com" for index in range(200)])
+        with self._smtp_settings():
+            send_email_delivery_batch.run([str(delivery.id) for delivery in deliveries])
+
+        self.assertEqual(self.sink.connections, 1)
+        self.assertEqual(self.sink.messages, 200)
+        self.assertEqual(
+            EmailDelivery.objects.filter(status=EmailDelivery.Status.SENT, attempts=1).count(),
+            200,
+        )
+
+    def test_refused_recipient_is_accounted_individually(self):
+        deliveries = self._deliveries(
+            ["first@example.com", "bounce@example.com", "last@example.com"],
+            attempts=send_email_delivery.max_retries - 1,
+        )
+        with self._smtp_settings():
+            send_email_delivery_batch.run([str(delivery.id) for delivery in deliveries])
+
+        statuses = dict(EmailDelivery.objects.values_list("subscriber_email", "status"))
+        self.assertEqual(statuses["first@example.com"], EmailDelivery.Status.SENT)
+        self.assertEqual(statuses["last@example.com"], EmailDelivery.Status.SENT)
+        self.assertEqual(statuses["bounce@example.com"], EmailDelivery.Status.FAILED)
+        bounced = EmailDelivery.objects.get(subscriber_email="bounce@example.com")
+        self.assertEqual(bounced.attempts, send_email_delivery.max_retries)
+        self.assertIn("550", bounced.last_error)
+        self.assertEqual(self.sink.recipients, ["first@example.com", "last@example.com"])
+
+    @mock.patch("incidents.tasks.send_email_delivery_batch.apply_async")
+    def test_deferral_pauses_domain_and_reschedules_its_rest(self, mock_reschedule):
+        deliveries = self._deliveries(
+            [
+                "first@slow.test",
+                "throttled@slow.test",
+                "later@slow.test",
+                "other@example.com",
+            ]
+        )
+        with self._smtp_settings():
+            send_email_delivery_batch.run([str(delivery.id) for delivery in deliveries])
+
+        self.assertEqual(self.sink.recipients, ["first@slow.test", "other@example.com"])
+        rows = {row.subscriber_email: row for row in EmailDelivery.objects.all()}
+        self.assertEqual(rows["throttled@slow.test"].status, EmailDelivery.Status.PENDING)
+        self.assertEqual(rows["throttled@slow.test"].attempts, 1)
+        self.assertEqual(rows["later@slow.test"].attempts, 0)
+
+        ((rescheduled,), kwargs), call_kwargs = mock_reschedule.call_args
+        self.assertCountEqual(
+            rescheduled,
+            [str(rows["throttled@slow.test"].id), str(rows["later@slow.test"].id)],
+        )
+        self.assertEqual(kwargs, {"deferrals": 1})
+        self.assertAlmostEqual(call_kwargs["countdown"], 45, delta=1)
+
+    @override_settings(EMAIL_DOMAIN_RATE_LIMITS={"slow.test": (1.0, 10)})
+    @mock.patch("incidents.tasks.send_email_delivery_batch.apply_async")
+    def test_deferred_rows_are_requeued_through_the_domain_bucket(self, mock_reschedule):
+        deliveries = self._deliveries(["throttled@slow.test", "later@slow.test"])
+        # Other batches already owe the domain 60 sends at one per second.
+        email_throttle.reserve("slow.test", 70)
+        with self._smtp_settings():
+            send_email_delivery_batch.run([str(delivery.id) for delivery in deliveries])
+
+        (_, kwargs), call_kwargs = mock_reschedule.call_args
+        self.assertEqual(kwargs, {"deferrals": 1})
+        # The 45 second pause repays 45 of them; these 2 wait for the other 15 as well.
+        self.assertAlmostEqual(call_kwargs["countdown"], 45 + 17, delta=1)
+        self.assertIsNotNone(EmailDelivery.objects.get(subscriber_email="later@slow.test").next_attempt_at)
+
+    @mock.patch("incidents.tasks.send_email_delivery.apply_async")
+    def test_busy_mailbox_retries_the_recipient_without_pausing_its_domain(self, mock_retry):
+        self.sink.stop()
+        self.sink = SMTPSink(busy_recipients={"busy@slow.test"}).start()
+        deliveries = self._deliveries(["busy@slow.test", "next@slow.test"])
+        with self._smtp_settings():
+            send_email_delivery_batch.run([str(delivery.id) for delivery in deliveries])
+
+        self.assertEqual(self.sink.recipients, ["next@slow.test"])
+        self.assertEqual(email_throttle.deferred_for("slow.test"), 0.0)
+        ((retried,),), _ = mock_retry.call_args
+        self.assertEqual(retried, str(deliveries[0].id))
+
+    def test_overlapping_batches_send_each_row_once(self):
+        deliveries = self._deliveries(["first@example.com", "second@example.com"])
+        ids = [str(delivery.id) for delivery in deliveries]
+        # Another task already holds the first row.
+        EmailDelivery.objects.filter(id=ids[0]).update(claim_token=uuid.uuid4(), last_attempt_at=timezone.now())
+        with self._smtp_settings():
+            send_email_delivery_batch.run(ids)
+            send_email_delivery_batch.run(ids)
+
+        self.assertEqual(self.sink.recipients, ["second@example.com"])
+        second = EmailDelivery.objects.get(id=ids[1])
+        self.assertEqual((second.status, second.attempts, second.claim_token), (EmailDelivery.Status.SENT, 1, None))
+        self.assertEqual(EmailDelivery.objects.get(id=ids[0]).status, EmailDelivery.Status.PENDING)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from incidents.models import EmailDelivery, EmailDeliveryArchive, Incident, NotificationMessage
+from incidents.services import email_maintenance
+from incidents.tasks import archive_email_deliveries, sweep_stale_email_deliveries
+
+
+class EmailMaintenanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.incident = Incident.objects.create(
+            title="DB outage",
+            summary="Investigating database connectivity",
+            severity=Incident.Severity.SEV2,
+            created_by_name="Alice",
+        )
+        self.message = NotificationMessage.objects.create(
+            incident=self.incident, subject="Subject", body="Body"
+        )
+
+    def _delivery(self, email, status=EmailDelivery.Status.PENDING, age=timedelta(0), **fields):
+        delivery = EmailDelivery.objects.create(
+            incident=self.incident,
+            message=self.message,
+            subscriber_email=email,
+            status=status,
+            **fields,
+        )
+        # created_at is auto_now_add, so backdate it with an update.
+        EmailDelivery.objects.filter(pk=delivery.pk).update(created_at=timezone.now() - age)
+        return delivery
+
+    @mock.patch("incidents.services.notifications.send_email_delivery_batch")
+    def test_sweeper_redispatches_only_stale_pending(self, mock_task):
+        stale = self._delivery("lost@example.com", age=timedelta(hours=2))
+        self._delivery("fresh@example.com", age=timedelta(minutes=5))
+        self._delivery(
+            "retrying@example.com",
+            age=timedelta(hours=2),
+            last_attempt_at=timezone.now() - timedelta(minutes=10),
+        )
+        self._delivery("done@example.com", status=EmailDelivery.Status.SENT, age=timedelta(hours=2))
+
+        self.assertEqual(sweep_stale_email_deliveries.run(), 1)
+        mock_task.apply_async.assert_called_once_with(
+            ([str(stale.id)],), queue="notifications.normal"
+        )
+
+    @mock.patch("incidents.services.notifications.send_email_delivery_batch")
+    def test_sweeper_leaves_paced_and_claimed_rows_alone(self, mock_task):
+        now = timezone.now()
+        # Scheduled behind a long throttle countdown and not due yet.
+        self._delivery("paced@example.com", age=timedelta(hours=2), next_attempt_at=now + timedelta(hours=1))
+        # Due recently; its task may simply be queued behind others.
+        self._delivery("due@example.com", age=timedelta(hours=2), next_attempt_at=now - timedelta(minutes=5))
+        lost = self._delivery(
+            "lost@example.com", age=timedelta(hours=3), next_attempt_at=now - timedelta(hours=2)
+        )
+
+        self.assertEqual(email_maintenance.sweep_stale_pending(), 1)
+        mock_task.apply_async.assert_called_once_with(([str(lost.id)],), queue="notifications.normal")
+        self.assertGreaterEqual(EmailDelivery.objects.get(pk=lost.pk).next_attempt_at, now)
+
+    def test_retention_moves_old_finished_rows_into_compressed_archive(self):
+        old_sent = self._delivery("a@example.com", status=EmailDelivery.Status.SENT, age=timedelta(days=40))
+        self._delivery(
+            "b@example.com",
+            status=EmailDelivery.Status.FAILED,
+            age=timedelta(days=40),
+            last_error="550 Mailbox unavailable",
+        )
+        recent = self._delivery("c@example.com", status=EmailDelivery.Status.SENT, age=timedelta(days=1))
+
+        self.assertEqual(archive_email_deliveries.run(), 2)
+
+        self.assertEqual(list(EmailDelivery.objects.values_list("id", flat=True)), [recent.id])
+        archive = EmailDeliveryArchive.objects.get()
+        self.assertEqual((archive.sent_count, archive.failed_count), (1, 1))
+        self.assertEqual(archive.subject, "Subject")
+        rows = email_maintenance.archived_deliveries(archive)
+        self.assertEqual(rows[0]["id"], str(old_sent.id))
+        self.assertEqual(rows[1]["last_error"], "550 Mailbox unavailable")
+        # The message is still referenced by the recent delivery.
+        self.assertTrue(NotificationMessage.objects.filter(pk=self.message.pk).exists())
+
+        EmailDelivery.objects.filter(pk=recent.pk).update(created_at=timezone.now() - timedelta(days=40))
+        self.assertEqual(email_maintenance.archive_finished_deliveries(), 1)
+        self.assertFalse(NotificationMessage.objects.filter(pk=self.message.pk).exists())
+        self.assertEqual(EmailDeliveryArchive.objects.count(), 2)
@@ -0,0 +1,87 @@
+import smtplib
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from incidents.models import EmailDelivery, Incident, NotificationMessage
+from incidents.services import email_throttle, notifications
+
+
+@override_settings(EMAIL_DOMAIN_RATE_LIMITS={"slow.test": (10.0, 2)})
+class DomainTokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_reservations_queue_behind_the_burst(self):
+        waits = [email_throttle.reserve("slow.test", 2, now=1000.0) for _ in range(3)]
+        self.assertEqual(waits, [0.0, 0.2, 0.4])
+        # Half a second refills 5 of the 4 owed tokens; the next 2 wait for one more.
+        self.assertAlmostEqual(email_throttle.reserve("slow.test", 2, now=1000.5), 0.1)
+
+    def test_deferral_delays_and_spaces_out_reservations(self):
+        email_throttle.defer("slow.test", 30, now=1000.0)
+        first = email_throttle.reserve("slow.test", 2, now=1000.0)
+        second = email_throttle.reserve("slow.test", 2, now=1000.0)
+        self.assertEqual((first, second), (30.0, 30.2))
+        self.assertEqual(email_throttle.deferred_domains(["slow.test", "x.test"], now=1010.0), {
+            "slow.test": 20.0,
+        })
+
+    def test_deferral_hint_recognises_temporary_smtp_failures(self):
+        hinted = smtplib.SMTPRecipientsRefused(
+            {"a@slow.test": (451, b"4.7.1 Rate limit exceeded, try again in 45 seconds")}
+        )
+        self.assertEqual(email_throttle.deferral_hint(hinted), 45.0)
+        unhinted = smtplib.SMTPSenderRefused(421, b"Too many connections", "status@example.com")
+        with override_settings(EMAIL_DOMAIN_DEFER_SECONDS=60):
+            self.assertEqual(email_throttle.deferral_hint(unhinted), 60.0)
+        # A busy or full mailbox is about one recipient, not the whole domain.
+        mailbox = smtplib.SMTPRecipientsRefused({"a@slow.test": (452, b"4.2.2 Mailbox full")})
+        self.assertIsNone(email_throttle.deferral_hint(mailbox))
+        permanent = smtplib.SMTPRecipientsRefused({"a@slow.test": (550, b"No such user")})
+        self.assertIsNone(email_throttle.deferral_hint(permanent))
+        self.assertIsNone(email_throttle.deferral_hint(RuntimeError("boom")))
+
+    @mock.patch("incidents.services.notifications.send_email_delivery_batch")
+    def test_enqueue_sends_unthrottled_domains_now_and_paces_the_rest(self, mock_task):
+        incident = Incident.objects.create(
+            title="DB outage",
+            summary="Investigating",
+            severity=Incident.Severity.SEV1,
+            created_by_name="Alice",
+        )
+        recipients = [f"user{index}@slow.test" for index in range(5)] + [
+            "a@fast.test",
+            "b@fast.test",
+        ]
+
+        created = notifications.enqueue_email_deliveries(incident, "Subject", "Body", recipients)
+
+        self.assertEqual(created, 7)
+        calls = mock_task.apply_async.call_args_list
+        ready = calls[-1]
+        self.assertEqual(len(ready.args[0][0]), 4)
+        self.assertNotIn("countdown", ready.kwargs)
+        paced = [(len(call.args[0][0]), call.kwargs["countdown"]) for call in calls[:-1]]
+        self.assertEqual([size for size, _ in paced], [2, 1])
+        self.assertAlmostEqual(paced[0][1], 0.2, delta=0.05)
+        self.assertAlmostEqual(paced[1][1], 0.3, delta=0.05)
+
+    @mock.patch("incidents.services.notifications.send_email_delivery_batch")
+    def test_critical_mail_is_not_queued_behind_bulk(self, mock_task):
+        bulk = [EmailDelivery(id=uuid.uuid4(), subscriber_email=f"user{i}@slow.test") for i in range(6)]
+        notifications.dispatch_deliveries(bulk, NotificationMessage.Priority.BULK)
+        # Burst 2: the first two go now, the rest queue behind them.
+        backlog = max(call.kwargs.get("countdown", 0) for call in mock_task.apply_async.call_args_list)
+        self.assertGreater(backlog, 0)
+
+        mock_task.reset_mock()
+        critical = [EmailDelivery(id=uuid.uuid4(), subscriber_email="oncall@slow.test")]
+        notifications.dispatch_deliveries(critical, NotificationMessage.Priority.CRITICAL)
+        mock_task.apply_async.assert_called_once_with(
+            ([str(critical[0].id)],), queue="notifications.critical"
+        )
+        # Bulk mail queued afterwards still pays for it.
+        self.assertGreater(email_throttle.reserve("slow.test", 1), backlog + 0.1)
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from incidents.models import Incident
+from incidents.services import cache as two_tier_cache
+from incidents.services import history as history_service
+from incidents.services import incidents as incident_services
+
+
+class PublicHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        two_tier_cache.local_cache.clear()
+        self.this_month = history_service.current_month()
+        self.last_month = history_service.shift_month(self.this_month, -1)
+        start, _ = history_service.month_bounds(self.last_month)
+        self.old_incident = Incident.objects.create(
+            title="Old outage",
+            summary="Resolved last month",
+            severity=Incident.Severity.SEV2,
+            status=Incident.Status.RESOLVED,
+            is_public=True,
+            created_by_name="Alice",
+            resolved_at=start + timedelta(days=2),
+        )
+        Incident.objects.create(
+            title="Internal",
+            summary="Never public",
+            severity=Incident.Severity.SEV3,
+            status=Incident.Status.RESOLVED,
+            is_public=False,
+            created_by_name="Alice",
+            resolved_at=start + timedelta(days=3),
+        )
+        self.url = reverse("public-history")
+
+    def test_closed_month_is_immutable(self):
+        response = self.client.get(self.url, {"month": history_service.format_month(self.last_month)})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertTrue(payload["closed"])
+        self.assertEqual([item["title"] for item in payload["incidents"]], ["Old outage"])
+        self.assertEqual(payload["next_month"], history_service.format_month(self.this_month))
+        self.assertIn("immutable", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {"month": history_service.format_month(self.last_month)})
+
+    def test_current_month_invalidated_by_transition(self):
+        first = self.client.get(self.url).json()
+        self.assertEqual(first["count"], 0)
+        self.assertEqual(first["previous_month"], history_service.format_month(self.last_month))
+
+        incident = Incident.objects.create(
+            title="Fresh outage",
+            summary="Now",
+            severity=Incident.Severity.SEV1,
+            status=Incident.Status.MONITORING,
+            is_public=True,
+            created_by_name="Bob",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            incident_services.transition_incident(
+                incident=incident,
+                new_status=Incident.Status.RESOLVED,
+                actor_name="Bob",
+                message=None,
+            )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()["count"], 1)
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+    def test_reopening_old_incident_invalidates_its_month(self):
+        month = history_service.format_month(self.last_month)
+        self.assertEqual(self.client.get(self.url, {"month": month}).json()["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            incident_services.transition_incident(
+                incident=self.old_incident,
+                new_status=Incident.Status.INVESTIGATING,
+                actor_name="Alice",
+                message="Regressed",
+            )
+
+        self.assertEqual(self.client.get(self.url, {"month": month}).json()["count"], 0)
+
+    def test_rejects_invalid_and_future_months(self):
+        self.assertEqual(self.client.get(self.url, {"month": "2024-13"}).status_code, 400)
+        future = history_service.shift_month(self.this_month, 1)
+        response = self.client.get(self.url, {"month": history_service.format_month(future)})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pages_past_the_last_are_not_found_and_not_cached(self):
+        month = history_service.format_month(self.last_month)
+        self.assertEqual(self.client.get(self.url, {"month": month, "page": 1}).status_code, 200)
+        with mock.patch.object(history_service, "_build_month_page") as build:
+            response = self.client.get(self.url, {"month": month, "page": 2})
+        self.assertEqual(response.status_code, 404)
+        # Pages are only cached via their builder, so nothing was stored for page 2.
+        build.assert_not_called()
@@ -0,0 +1,313 @@
+import random
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from incidents.models import ActionItem, Incident, Postmortem
+from incidents.services import metrics as metrics_service
+from incidents.services import metrics_snapshot
+from incidents.services import rollups
+from incidents.services.incidents import create_incident, post_update
+
+
+class ActiveIncidentTimelineTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        rng = random.Random(42)
+        self.spans = []
+        for index in range(60):
+            created_at = self.now - timedelta(minutes=rng.randint(0, 6 * 24 * 60))
+            resolved_at = None
+            if rng.random() < 0.8:
+                resolved_at = created_at + timedelta(minutes=rng.randint(0, 36 * 60))
+                if resolved_at > self.now:
+                    resolved_at = None
+            incident = Incident.objects.create(
+                title=f"Incident {index}",
+                summary="Synthetic",
+                severity=Incident.Severity.SEV3,
+                status=Incident.Status.RESOLVED if resolved_at else Incident.Status.INVESTIGATING,
+                created_by_name="Alice",
+                resolved_at=resolved_at,
+            )
+            # created_at is auto_now_add, so backdate it with an update.
+            Incident.objects.filter(pk=incident.pk).update(created_at=created_at)
+            self.spans.append((created_at, resolved_at))
+        rollups.rebuild_all()
+
+    def _brute_force(self, points):
+        return [
+            sum(
+                1
+                for created_at, resolved_at in self.spans
+                if created_at <= point and (resolved_at is None or resolved_at >= point)
+            )
+            for point in points
+        ]
+
+    def test_sweep_matches_point_in_time_counts(self):
+        for window, bucket in [
+            (timedelta(hours=48), timedelta(hours=1)),
+            (timedelta(days=7), timedelta(hours=6)),
+            (timedelta(hours=3), timedelta(minutes=15)),
+        ]:
+            with self.subTest(window=window, bucket=bucket):
+                with self.assertNumQueries(2):
+                    timeline, current_open = metrics_service._active_incident_timeline(
+                        window=window, bucket=bucket, end=self.now
+                    )
+                self.assertEqual(len(timeline), window // bucket)
+                points = [
+                    self.now - bucket * (len(timeline) - 1 - index) for index in range(len(timeline))
+                ]
+                self.assertEqual(timeline[-1]["timestamp"], self.now.isoformat())
+                self.assertEqual([entry["count"] for entry in timeline], self._brute_force(points))
+                self.assertEqual(
+                    current_open, sum(1 for _, resolved_at in self.spans if resolved_at is None)
+                )
+
+    def test_rollup_timeline_matches_point_in_time_counts(self):
+        for bucket in (rollups.HOUR, rollups.DAY):
+            with self.subTest(bucket=bucket):
+                starts = rollups.bucket_starts(self.now - timedelta(days=5), self.now, bucket)
+                timeline = metrics_service._open_timeline(starts, bucket)
+                # Rollup cells are whole buckets, so an incident opened exactly at a
+                # boundary counts from the next one.
+                expected = [
+                    sum(
+                        1
+                        for created_at, resolved_at in self.spans
+                        if created_at < point and (resolved_at is None or resolved_at >= point)
+                    )
+                    for point in starts
+                ]
+                self.assertEqual([entry["count"] for entry in timeline], expected)
+
+
+class WeeklyMttrTests(TestCase):
+    def _resolved(self, is_public, resolved_at, hours):
+        incident = Incident.objects.create(
+            title="Resolved",
+            summary="Synthetic",
+            severity=Incident.Severity.SEV2,
+            status=Incident.Status.RESOLVED,
+            is_public=is_public,
+            created_by_name="Alice",
+            resolved_at=resolved_at,
+        )
+        Incident.objects.filter(pk=incident.pk).update(created_at=resolved_at - timedelta(hours=hours))
+
+    def test_all_series_come_from_one_grouped_query(self):
+        now = timezone.now()
+        this_week = now - timedelta(days=now.weekday())
+        this_week = this_week.replace(hour=0, minute=0, second=0, microsecond=0)
+        self._resolved(True, this_week + timedelta(minutes=5), hours=2)
+        self._resolved(False, this_week + timedelta(minutes=10), hours=4)
+        self._resolved(True, this_week - timedelta(weeks=2) + timedelta(hours=1), hours=6)
+        self._resolved(True, this_week - timedelta(weeks=20), hours=100)
+        rollups.rebuild_all()
+
+        with self.assertNumQueries(1):
+            series = metrics_service._weekly_mttr(weeks=4)
+
+        self.assertEqual(
+            [point["week_start"] for point in series["all"]],
+            [(this_week - timedelta(weeks=offset)).date().isoformat() for offset in (3, 2, 1, 0)],
+        )
+        self.assertEqual([point["mttr_hours"] for point in series["all"]], [None, 6.0, None, 3.0])
+        self.assertEqual([point["mttr_hours"] for point in series["public"]], [None, 6.0, None, 2.0])
+        self.assertEqual([point["mttr_hours"] for point in series["internal"]], [None, None, None, 4.0])
+
+    def test_admin_metrics_accepts_week_count(self):
+        response = self.client.get(reverse("admin-metrics"), {"weeks": 12})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["resolution_health"]["weekly_mttr"]["all"]), 12)
+        self.assertEqual(self.client.get(reverse("admin-metrics"), {"weeks": 0}).status_code, 400)
+
+
+@override_settings(ADMIN_METRICS_SNAPSHOT_TTL=60, ADMIN_METRICS_MIN_REFRESH_SECONDS=5)
+class MetricsSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_snapshot_is_served_from_cache_with_its_age(self):
+        with mock.patch.object(
+            metrics_snapshot.metrics_service, "get_admin_metrics", return_value={"value": 1}
+        ) as compute:
+            first = metrics_snapshot.get_snapshot(weeks=8)
+            second = metrics_snapshot.get_snapshot(weeks=8)
+        compute.assert_called_once_with(weeks=8)
+        self.assertEqual(second["value"], 1)
+        self.assertGreaterEqual(second["snapshot"]["age_seconds"], 0)
+        self.assertEqual(first["snapshot"]["generated_at"], second["snapshot"]["generated_at"])
+
+    @mock.patch("incidents.services.metrics_snapshot.executor.submit")
+    def test_stale_reads_schedule_one_background_refresh(self, submit):
+        computed_at = time.time() - 10
+        cache.set(
+            metrics_snapshot._snapshot_key(8), {"computed_at": computed_at, "payload": {"value": 1}}
+        )
+        for _ in range(3):
+            self.assertEqual(metrics_snapshot.get_snapshot(weeks=8)["value"], 1)
+        submit.assert_not_called()
+
+        metrics_snapshot.mark_stale()
+        for _ in range(3):
+            payload = metrics_snapshot.get_snapshot(weeks=8)
+            self.assertEqual(payload["value"], 1)
+            self.assertGreaterEqual(payload["snapshot"]["age_seconds"], 10)
+        submit.assert_called_once_with(
+            metrics_snapshot.refresh_admin_metrics_snapshot, 8, cache.get(metrics_snapshot._lock_key(8))
+        )
+
+        with mock.patch.object(
+            metrics_snapshot.metrics_service, "get_admin_metrics", return_value={"value": 2}
+        ):
+            metrics_snapshot.refresh(8)
+        self.assertEqual(metrics_snapshot.get_snapshot(weeks=8)["value"], 2)
+        self.assertEqual(submit.call_count, 1)
+
+    def test_cold_readers_are_told_to_retry_while_one_request_computes(self):
+        cache.add(metrics_snapshot._lock_key(8), "other-request")
+        with mock.patch.object(metrics_snapshot.metrics_service, "get_admin_metrics") as compute:
+            self.assertIsNone(metrics_snapshot.get_snapshot(weeks=8))
+            response = self.client.get(reverse("admin-metrics"), {"weeks": 8})
+        compute.assert_not_called()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], str(metrics_snapshot.RETRY_AFTER_SECONDS))
+
+    def test_refresh_releases_only_a_lock_it_owns(self):
+        cache.add(metrics_snapshot._lock_key(8), "other-request")
+        with mock.patch.object(
+            metrics_snapshot.metrics_service, "get_admin_metrics", return_value={"value": 1}
+        ):
+            # The beat task holds no lock.
+            metrics_snapshot.refresh(8)
+            self.assertEqual(cache.get(metrics_snapshot._lock_key(8)), "other-request")
+            metrics_snapshot.refresh(8, lock_token="other-request")
+        self.assertIsNone(cache.get(metrics_snapshot._lock_key(8)))
+
+    def test_view_reports_snapshot_age(self):
+        response = self.client.get(reverse("admin-metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("age_seconds", response.json()["snapshot"])
+
+
+class AutomationWatchlistTests(TestCase):
+    def _create(self, title, minutes_ago):
+        incident = create_incident(
+            data={
+                "title": title,
+                "summary": "Synthetic",
+                "severity": Incident.Severity.SEV2,
+                "status": Incident.Status.INVESTIGATING,
+                "created_by_name": "Alice",
+            }
+        )
+        Incident.objects.filter(pk=incident.pk).update(
+            last_activity_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+        incident.refresh_from_db()
+        return incident
+
+    def test_stale_incidents_follow_last_activity(self):
+        quiet = self._create("Quiet", 180)
+        self._create("Quieter", 300)
+        self._create("Fresh", 10)
+        touched = self._create("Touched", 240)
+        post_update(incident=touched, data={"message": "Still looking", "created_by_name": "Alice"})
+
+        stale = metrics_service._automation_watchlist()["stale_incidents"]
+        self.assertEqual([entry["title"] for entry in stale], ["Quieter", "Quiet"])
+        self.assertEqual(stale[1]["id"], str(quiet.id))
+        self.assertGreaterEqual(stale[1]["minutes_since_update"], 180)
+
+    def test_lists_are_limited_and_ordered(self):
+        today = timezone.localdate()
+        resolved = self._create("Resolved", 0)
+        Incident.objects.filter(pk=resolved.pk).update(status=Incident.Status.RESOLVED)
+        postmortem = Postmortem.objects.create(incident=self._create("With postmortem", 0))
+        for days in range(5):
+            ActionItem.objects.create(
+                postmortem=postmortem,
+                title=f"Overdue {days}",
+                owner_name="Bob",
+                due_date=today - timedelta(days=days + 1),
+            )
+        ActionItem.objects.create(
+            postmortem=postmortem,
+            title="Done",
+            owner_name="Bob",
+            due_date=today - timedelta(days=30),
+            status=ActionItem.Status.DONE,
+        )
+
+        with self.assertNumQueries(3):
+            watchlist = metrics_service._automation_watchlist(limit=3)
+        self.assertEqual(
+            [item["title"] for item in watchlist["overdue_action_items"]],
+            ["Overdue 4", "Overdue 3", "Overdue 2"],
+        )
+        self.assertEqual([entry["id"] for entry in watchlist["missing_postmortems"]], [str(resolved.id)])
+
+
+class RangeMetricsTests(TestCase):
+    def setUp(self):
+        self.url = reverse("admin-metrics")
+        now = timezone.now()
+        for severity, is_public, opened_days_ago, hours in [
+            (Incident.Severity.SEV1, True, 200, 4),
+            (Incident.Severity.SEV2, False, 40, 10),
+            (Incident.Severity.SEV2, True, 3, None),
+        ]:
+            created_at = now - timedelta(days=opened_days_ago)
+            resolved_at = created_at + timedelta(hours=hours) if hours else None
+            incident = Incident.objects.create(
+                title="Synthetic",
+                summary="Synthetic",
+                severity=severity,
+                status=Incident.Status.RESOLVED if resolved_at else Incident.Status.INVESTIGATING,
+                is_public=is_public,
+                created_by_name="Alice",
+                resolved_at=resolved_at,
+            )
+            Incident.objects.filter(pk=incident.pk).update(created_at=created_at)
+        rollups.rebuild_all()
+
+    def test_year_of_daily_buckets(self):
+        end = timezone.now()
+        start = end - timedelta(days=365)
+        with self.assertNumQueries(14):
+            payload = metrics_service.get_range_metrics(start, end, rollups.DAY)
+
+        self.assertEqual(payload["range"]["buckets"], 366)
+        self.assertEqual(len(payload["incident_pulse"]["timeline"]), 366)
+        self.assertEqual(payload["incident_pulse"]["timeline"][0]["count"], 0)
+        self.assertEqual(payload["incident_pulse"]["timeline"][-1]["count"], 1)
+        self.assertEqual(payload["incident_pulse"]["severity_breakdown"]["SEV2"], 2)
+        self.assertEqual(payload["resolution_health"]["visibility_breakdown"], {"public": 2, "internal": 1})
+        mttr = [point["mttr_hours"] for point in payload["resolution_health"]["mttr"]["all"]]
+        self.assertEqual(sorted(value for value in mttr if value is not None), [4.0, 10.0])
+
+    def test_range_parameters_are_validated(self):
+        response = self.client.get(
+            self.url, {"from": "2026-01-01", "to": "2026-04-01", "bucket": "week"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["range"]["buckets"], 14)
+
+        self.assertEqual(self.client.get(self.url, {"bucket": "day"}).status_code, 200)
+        for params in [
+            {"from": "2025-01-01", "to": "2026-01-01", "bucket": "hour"},
+            {"from": "2026-02-01", "to": "2026-01-01"},
+            {"from": "yesterday"},
+            {"bucket": "month"},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
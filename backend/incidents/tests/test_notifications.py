@@ -1,14 +1,34 @@
+import threading
+from datetime import timedelta
 from unittest import mock
 
-from django.test import TestCase
+from django.core import mail
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 
-from incidents.models import EmailDelivery, Incident
-from incidents.services import notifications
-from incidents.tasks import send_email_delivery
+from incidents.models import (
+    DigestEntry,
+    EmailDelivery,
+    Incident,
+    IncidentUpdate,
+    NotificationMessage,
+    Subscriber,
+)
+from incidents.services import executor, notifications
+from incidents.tasks import (
+    fan_out_notification,
+    flush_notification_digests,
+    notification_queue,
+    send_email_delivery,
+    send_email_delivery_batch,
+)
 
 
 class NotificationTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.incident = Incident.objects.create(
             title="DB outage",
             summary="Investigating database connectivity",
@@ -17,27 +37,29 @@ class NotificationTests(TestCase):
             is_public=True,
             created_by_name="Alice",
         )
+        self.message = NotificationMessage.objects.create(
+            incident=self.incident, subject="subject", body="body"
+        )
 
-    @mock.patch("incidents.tasks.send_mail", return_value=1)
-    def test_enqueue_email_delivery_creates_and_sends(self, mock_send_mail):
-        deliveries = notifications.enqueue_email_deliveries(
+    def test_enqueue_email_delivery_creates_and_sends(self):
+        created = notifications.enqueue_email_deliveries(
             self.incident,
             subject="Test subject",
             body="Test body",
             recipients=["user@example.com"],
         )
-        self.assertEqual(len(deliveries), 1)
+        self.assertEqual(created, 1)
         delivery = EmailDelivery.objects.get(subscriber_email="user@example.com")
         self.assertEqual(delivery.status, EmailDelivery.Status.SENT)
         self.assertEqual(delivery.attempts, 1)
-        mock_send_mail.assert_called_once()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
 
     def test_send_email_delivery_marks_failed_after_max_attempts(self):
         delivery = EmailDelivery.objects.create(
             incident=self.incident,
+            message=self.message,
             subscriber_email="fail@example.com",
-            subject="subject",
-            body="body",
             attempts=send_email_delivery.max_retries,
         )
         with mock.patch("incidents.tasks.send_mail", side_effect=Exception("boom")):
@@ -45,3 +67,249 @@ class NotificationTests(TestCase):
         delivery.refresh_from_db()
         self.assertEqual(delivery.status, EmailDelivery.Status.FAILED)
         self.assertIn("boom", delivery.last_error)
+
+    @mock.patch("incidents.services.notifications.send_email_delivery_batch.apply_async")
+    def test_enqueue_bulk_creates_and_dispatches_per_chunk(self, mock_apply):
+        recipients = [f"user{index}@example.com" for index in range(5)]
+        created = notifications.enqueue_email_deliveries(
+            self.incident,
+            subject="Subject",
+            body="Body",
+            recipients=iter(recipients),
+            batch_size=2,
+        )
+        self.assertEqual(created, 5)
+        self.assertEqual(EmailDelivery.objects.count(), 5)
+        message = NotificationMessage.objects.get(subject="Subject")
+        self.assertEqual(message.deliveries.count(), 5)
+        self.assertEqual(
+            [len(call.args[0][0]) for call in mock_apply.call_args_list], [2, 2, 1]
+        )
+        # SEV1 incident: every batch goes to the critical queue.
+        self.assertEqual(
+            {call.kwargs["queue"] for call in mock_apply.call_args_list},
+            {"notifications.critical"},
+        )
+
+    @mock.patch("incidents.tasks.send_email_delivery.apply_async")
+    def test_batch_failure_schedules_individual_retry(self, mock_retry):
+        delivery = EmailDelivery.objects.create(
+            incident=self.incident,
+            message=self.message,
+            subscriber_email="retry@example.com",
+        )
+        connection = mock.Mock()
+        connection.send_messages.side_effect = Exception("timeout")
+        with mock.patch("incidents.tasks.get_connection", return_value=connection):
+            send_email_delivery_batch.run([str(delivery.id)])
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, EmailDelivery.Status.PENDING)
+        self.assertEqual(delivery.attempts, 1)
+        mock_retry.assert_called_once_with(
+            (str(delivery.id),), countdown=60, queue="notifications.normal"
+        )
+
+    @mock.patch("incidents.services.notifications.executor.submit")
+    def test_notify_dispatches_event_reference_only(self, mock_submit):
+        update = IncidentUpdate.objects.create(
+            incident=self.incident,
+            message="Still investigating",
+            status_at_time=Incident.Status.INVESTIGATING,
+            created_by_name="Bob",
+        )
+        notifications.notify_update_posted(self.incident, update)
+        mock_submit.assert_called_once_with(
+            fan_out_notification,
+            notifications.INCIDENT_UPDATE_POSTED,
+            str(self.incident.id),
+            str(update.id),
+            queue="notifications.critical",
+        )
+        self.assertEqual(EmailDelivery.objects.count(), 0)
+
+    def test_fan_out_resolves_recipients_in_worker(self):
+        other = Incident.objects.create(
+            title="Other",
+            summary="Other",
+            severity=Incident.Severity.SEV4,
+            created_by_name="Alice",
+        )
+        Subscriber.objects.create(email="global@example.com")
+        Subscriber.objects.create(
+            email="incident@example.com", scope=Subscriber.Scope.INCIDENT, incident=self.incident
+        )
+        Subscriber.objects.create(
+            email="other@example.com", scope=Subscriber.Scope.INCIDENT, incident=other
+        )
+
+        created = fan_out_notification.run(notifications.INCIDENT_CREATED, str(self.incident.id))
+
+        self.assertEqual(created, 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [
+            "global@example.com",
+            "incident@example.com",
+        ])
+
+
+class NotificationPriorityTests(SimpleTestCase):
+    def test_priority_follows_severity_and_event(self):
+        Priority = NotificationMessage.Priority
+        sev1 = Incident(severity=Incident.Severity.SEV1)
+        sev2 = Incident(severity=Incident.Severity.SEV2)
+        sev4 = Incident(severity=Incident.Severity.SEV4)
+        cases = [
+            (notifications.INCIDENT_CREATED, sev1, Priority.CRITICAL),
+            (notifications.DIGEST, sev1, Priority.NORMAL),
+            (notifications.POSTMORTEM_PUBLISHED, sev1, Priority.BULK),
+            (notifications.INCIDENT_UPDATE_POSTED, sev2, Priority.NORMAL),
+            (notifications.INCIDENT_STATUS_CHANGED, sev4, Priority.BULK),
+        ]
+        for event, incident, expected in cases:
+            with self.subTest(event=event, severity=incident.severity):
+                self.assertEqual(notifications.priority_for(event, incident), expected)
+
+    def test_every_priority_has_a_declared_queue(self):
+        from config.celery import app
+
+        declared = {queue.name for queue in app.conf.task_queues}
+        for priority in NotificationMessage.Priority.values:
+            self.assertIn(notification_queue(priority), declared)
+
+
+class TaskExecutorTests(SimpleTestCase):
+    @override_settings(TASK_EXECUTOR="thread")
+    def test_thread_executor_runs_task_off_the_calling_thread(self):
+        task = mock.Mock()
+        threads = []
+
+        def apply(**kwargs):
+            threads.append(threading.current_thread().name)
+            return mock.Mock(**{"failed.return_value": False})
+
+        task.apply.side_effect = apply
+
+        future = executor.submit(task, "event", "incident-id")
+
+        future.result(timeout=5)
+        self.assertTrue(threads[0].startswith("incident-tasks"))
+        task.apply.assert_called_once_with(args=("event", "incident-id"), kwargs={})
+
+    @override_settings(TASK_EXECUTOR="thread")
+    def test_thread_executor_logs_failed_tasks(self):
+        task = mock.Mock()
+        task.name = "incidents.tasks.fan_out_notification"
+        task.apply.return_value = mock.Mock(
+            **{"failed.return_value": True}, result=RuntimeError("boom"), traceback="Traceback ..."
+        )
+
+        with mock.patch.object(executor.logger, "error") as log:
+            executor.submit(task, "event").result(timeout=5)
+
+        log.assert_called_once_with(
+            "task_failed",
+            task="incidents.tasks.fan_out_notification",
+            error="RuntimeError('boom')",
+            traceback="Traceback ...",
+        )
+
+    @override_settings(TASK_EXECUTOR="celery")
+    def test_celery_executor_uses_apply_async(self):
+        task = mock.Mock()
+        executor.submit(task, "event")
+        task.apply_async.assert_called_once_with(args=("event",), kwargs={})
+
+
+class RecipientResolutionTests(TestCase):
+    def setUp(self):
+        self.incident = Incident.objects.create(
+            title="DB outage",
+            summary="Investigating",
+            severity=Incident.Severity.SEV1,
+            created_by_name="Alice",
+        )
+
+    def test_streams_distinct_active_recipients_in_one_query(self):
+        Subscriber.objects.create(email="both@example.com")
+        Subscriber.objects.create(
+            email="both@example.com", scope=Subscriber.Scope.INCIDENT, incident=self.incident
+        )
+        Subscriber.objects.create(email="inactive@example.com", is_active=False)
+        Subscriber.objects.create(
+            email="scoped@example.com", scope=Subscriber.Scope.INCIDENT, incident=self.incident
+        )
+
+        with self.assertNumQueries(1):
+            recipients = list(notifications.iter_recipients_for_incident(self.incident))
+        self.assertEqual(recipients, ["both@example.com", "scoped@example.com"])
+
+    def test_duplicate_global_subscription_is_rejected(self):
+        Subscriber.objects.create(email="dup@example.com")
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Subscriber.objects.create(email="dup@example.com")
+
+
+@override_settings(NOTIFICATION_DIGEST_ENABLED=True, NOTIFICATION_DIGEST_WINDOW_SECONDS=900)
+class DigestModeTests(TestCase):
+    def setUp(self):
+        self.incident = Incident.objects.create(
+            title="Slow API",
+            summary="Elevated latency",
+            severity=Incident.Severity.SEV3,
+            status=Incident.Status.INVESTIGATING,
+            is_public=True,
+            created_by_name="Alice",
+        )
+        Subscriber.objects.create(email="global@example.com")
+
+    def _post(self, message, status=Incident.Status.INVESTIGATING):
+        return IncidentUpdate.objects.create(
+            incident=self.incident,
+            message=message,
+            status_at_time=status,
+            created_by_name="Bob",
+        )
+
+    def test_updates_are_collapsed_into_one_digest(self):
+        for message in ("Looking into it", "Found the culprit", "Deploying fix"):
+            update = self._post(message)
+            fan_out_notification.run(
+                notifications.INCIDENT_UPDATE_POSTED, str(self.incident.id), str(update.id)
+            )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(DigestEntry.objects.filter(flushed_at__isnull=True).count(), 3)
+
+        self.assertEqual(flush_notification_digests.run(), 0)
+
+        DigestEntry.objects.update(created_at=timezone.now() - timedelta(minutes=20))
+        self.assertEqual(flush_notification_digests.run(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "[Incident] 3 updates on Slow API")
+        body = mail.outbox[0].body
+        self.assertLess(body.index("Looking into it"), body.index("Deploying fix"))
+        self.assertFalse(DigestEntry.objects.filter(flushed_at__isnull=True).exists())
+
+    def test_resolution_flushes_pending_digest_then_sends_immediately(self):
+        update = self._post("Still digging")
+        fan_out_notification.run(
+            notifications.INCIDENT_UPDATE_POSTED, str(self.incident.id), str(update.id)
+        )
+        resolved = self._post("All clear", status=Incident.Status.RESOLVED)
+        fan_out_notification.run(
+            notifications.INCIDENT_STATUS_CHANGED, str(self.incident.id), str(resolved.id)
+        )
+
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            [
+                "[Incident] 1 update on Slow API",
+                "[Incident] Slow API status changed to RESOLVED",
+            ],
+        )
+
+    def test_sev1_creation_bypasses_digest(self):
+        self.incident.severity = Incident.Severity.SEV1
+        self.incident.save(update_fields=["severity"])
+        fan_out_notification.run(notifications.INCIDENT_CREATED, str(self.incident.id))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(DigestEntry.objects.exists())
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from incidents.models import StatusPageViews
+from incidents.services import metrics as metrics_service
+from incidents.services import page_views, rollups
+
+
+@override_settings(STATUS_PAGE_VIEWS_FLUSH_THRESHOLD=5, STATUS_PAGE_VIEWS_FLUSH_SECONDS=3600)
+class StatusPageViewCounterTests(TestCase):
+    def setUp(self):
+        self.counter = page_views.ViewCounter()
+        page_views.counter.discard()
+        self.addCleanup(page_views.counter.discard)
+
+    def test_views_are_counted_without_touching_the_database(self):
+        url = reverse("public-status")
+        for _ in range(5):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertFalse(StatusPageViews.objects.exists())
+        self.assertEqual(page_views.counter.pending(), 5)
+
+        self.assertEqual(page_views.counter.flush(), 5)
+        self.assertEqual(StatusPageViews.objects.get(date=timezone.localdate()).views, 5)
+        self.assertEqual(page_views.counter.pending(), 0)
+
+    def test_threshold_wakes_the_flusher_instead_of_writing_inline(self):
+        with self.assertNumQueries(0):
+            for _ in range(4):
+                self.counter.record()
+            self.assertFalse(self.counter._wake.is_set())
+            self.counter.record()
+        self.assertTrue(self.counter._wake.is_set())
+
+    def test_stop_writes_what_the_worker_still_holds(self):
+        self.counter.start()
+        self.counter.record()
+        self.counter.record()
+        self.assertEqual(self.counter.stop(), 2)
+        self.assertIsNone(self.counter._thread)
+        self.assertEqual(StatusPageViews.objects.get().views, 2)
+
+
+class StatusPageViewMetricsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        for offset, views in [(0, 40), (2, 15), (9, 100)]:
+            StatusPageViews.objects.create(date=self.today - timedelta(days=offset), views=views)
+
+    def test_admin_metrics_report_last_week(self):
+        views = metrics_service.get_admin_metrics()["engagement"]["status_page_views"]
+        self.assertEqual(len(views), 7)
+        self.assertEqual(views[-1], {"date": self.today.isoformat(), "views": 40})
+        self.assertEqual(sum(entry["views"] for entry in views), 55)
+
+    def test_range_metrics_fold_days_into_buckets(self):
+        end = timezone.now()
+        start = end - timedelta(days=14)
+        daily = metrics_service.get_range_metrics(start, end, rollups.DAY)["engagement"]
+        self.assertEqual(sum(entry["views"] for entry in daily["status_page_views"]), 155)
+        weekly = metrics_service.get_range_metrics(start, end, rollups.WEEK)["engagement"]
+        self.assertEqual(sum(entry["views"] for entry in weekly["status_page_views"]), 155)
+        hourly = metrics_service.get_range_metrics(end - timedelta(hours=3), end, rollups.HOUR)
+        self.assertIsNone(hourly["engagement"]["status_page_views"][0]["views"])
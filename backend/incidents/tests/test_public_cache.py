@@ -0,0 +1,72 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from incidents.models import Incident, Postmortem
+from incidents.services import cache as two_tier_cache
+from incidents.services import incidents as incident_services
+
+
+class PublicIncidentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        two_tier_cache.local_cache.clear()
+        self.incident = Incident.objects.create(
+            title="API outage",
+            summary="Investigating",
+            severity=Incident.Severity.SEV2,
+            status=Incident.Status.INVESTIGATING,
+            is_public=True,
+            created_by_name="Alice",
+        )
+        self.detail_url = reverse("public-incident-detail", args=[self.incident.id])
+
+    def test_detail_is_served_from_cache_with_headers(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("public", first["Cache-Control"])
+        self.assertIn("s-maxage", first["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.detail_url)
+        self.assertEqual(second.json(), first.json())
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_update_invalidates_detail(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            incident_services.post_update(
+                incident=self.incident,
+                data={"message": "Mitigation rolling out", "created_by_name": "Bob"},
+            )
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["latest_update"]["message"], "Mitigation rolling out")
+
+    def test_private_incident_is_not_found(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            incident_services.update_incident_partial(
+                incident=self.incident, data={"is_public": False}, actor_name="Alice"
+            )
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_postmortem_available_after_publish(self):
+        Postmortem.objects.create(incident=self.incident, summary="Root cause")
+        url = reverse("public-postmortem", args=[self.incident.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.post(
+            reverse("postmortem-publish", args=[self.incident.id]),
+            data=json.dumps({"actor_name": "Alice"}),
+            content_type="application/json",
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["published"])
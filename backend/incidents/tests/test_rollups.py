@@ -0,0 +1,137 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from incidents import tasks
+from incidents.models import EmailDelivery, Incident, MetricRollup
+from incidents.services import (
+    analytics,
+    incident_state,
+    notifications,
+    rollups,
+    subscriber_import,
+)
+from incidents.services.incidents import create_incident, update_incident_partial
+
+Metric = MetricRollup.Metric
+
+
+def _cells():
+    return {
+        (row.grain, row.metric, row.bucket_start, row.severity, row.visibility, row.status): row.value
+        for row in MetricRollup.objects.exclude(value=0)
+    }
+
+
+class RollupWriteTests(TestCase):
+    def _create(self, severity=Incident.Severity.SEV2, is_public=True):
+        return create_incident(
+            data={
+                "title": "Checkout errors",
+                "summary": "Payments failing",
+                "severity": severity,
+                "status": Incident.Status.INVESTIGATING,
+                "is_public": is_public,
+                "created_by_name": "Alice",
+            }
+        )
+
+    def test_incident_lifecycle_moves_counts(self):
+        incident = self._create()
+        self._create(severity=Incident.Severity.SEV1, is_public=False)
+        self.assertEqual(analytics.active_incident_count(), 2)
+        self.assertEqual(rollups.breakdown(Metric.INCIDENTS, "visibility"), {"public": 1, "internal": 1})
+
+        incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+        self.assertEqual(analytics.active_incident_count(), 1)
+        self.assertEqual(rollups.total(Metric.RESOLUTIONS), 1)
+        self.assertEqual(
+            rollups.breakdown(Metric.INCIDENTS, "status"),
+            {Incident.Status.RESOLVED: 1, Incident.Status.INVESTIGATING: 1},
+        )
+
+        incident_state.transition_incident(incident, Incident.Status.INVESTIGATING, "Alice")
+        self.assertEqual(analytics.active_incident_count(), 2)
+        self.assertEqual(rollups.total(Metric.RESOLUTIONS), 0)
+
+    def test_stale_copies_count_against_the_committed_row(self):
+        incident = self._create()
+        # Other requests still holding the INVESTIGATING copy.
+        stale_transition = Incident.objects.get(pk=incident.pk)
+        stale_patch = Incident.objects.get(pk=incident.pk)
+        incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+
+        with self.assertRaisesMessage(ValueError, "already in the requested status"):
+            incident_state.transition_incident(stale_transition, Incident.Status.RESOLVED, "Bob")
+        update_incident_partial(
+            incident=stale_patch, data={"status": Incident.Status.RESOLVED}, actor_name="Bob"
+        )
+
+        self.assertEqual(rollups.total(Metric.RESOLUTIONS), 1)
+        self.assertEqual(rollups.breakdown(Metric.INCIDENTS, "status"), {Incident.Status.RESOLVED: 1})
+        incremental = _cells()
+        rollups.rebuild_all()
+        self.assertEqual(incremental, _cells())
+
+    def test_incremental_writes_match_rebuild(self):
+        for index in range(4):
+            incident = self._create(is_public=index % 2 == 0)
+            if index:
+                incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+        notifications.enqueue_email_deliveries(
+            None, subject="Subject", body="Body", recipients=["a@example.com", "b@example.com"]
+        )
+        response = self.client.post(reverse("subscriber-create"), {"email": "reader@example.com"})
+        self.assertEqual(response.status_code, 201)
+        subscriber_import.import_subscribers(
+            enumerate([{"email": "one@example.com"}, {"email": "reader@example.com"}], start=2)
+        )
+
+        self.assertEqual(rollups.breakdown(Metric.DELIVERIES, "status"), {EmailDelivery.Status.SENT: 2})
+        self.assertEqual(rollups.total(Metric.SUBSCRIBERS), 2)
+        incremental = _cells()
+        rollups.rebuild_all()
+        self.assertEqual(incremental, _cells())
+
+    def test_delivery_counts_move_only_for_rows_still_held(self):
+        notifications.enqueue_email_deliveries(
+            None, subject="Subject", body="Body", recipients=["a@example.com", "b@example.com"]
+        )
+        EmailDelivery.objects.update(status=EmailDelivery.Status.PENDING)
+        rollups.rebuild_all()
+        claimed = tasks._claim(list(EmailDelivery.objects.values_list("id", flat=True)))
+        # The first row's claim expired and another task took it over.
+        EmailDelivery.objects.filter(pk=claimed[0].pk).update(claim_token=uuid.uuid4())
+        for delivery in claimed:
+            delivery.status = EmailDelivery.Status.SENT
+
+        self.assertEqual(tasks._release(claimed, ["status"]), claimed[1:])
+        self.assertEqual(
+            rollups.breakdown(Metric.DELIVERIES, "status"),
+            {EmailDelivery.Status.SENT: 1, EmailDelivery.Status.PENDING: 1},
+        )
+
+
+class RollupWindowTests(TestCase):
+    def test_windows_combine_daily_and_hourly_cells(self):
+        now = timezone.now()
+        rng = random.Random(3)
+        events = [now - timedelta(minutes=rng.randint(0, 10 * 24 * 60)) for _ in range(300)]
+        rollups.record_subscribers(events)
+
+        for since_hours, until_hours in [(1, None), (30, None), (24 * 7, 5), (50, 26), (3, 2), (None, 40)]:
+            since = now - timedelta(hours=since_hours) if since_hours else None
+            until = now - timedelta(hours=until_hours) if until_hours else None
+            with self.subTest(since=since_hours, until=until_hours):
+                lower = rollups.hour_start(since) if since else None
+                upper = rollups.hour_start(until) if until else None
+                expected = sum(
+                    1
+                    for event in events
+                    if (lower is None or event >= lower) and (upper is None or event < upper)
+                )
+                self.assertEqual(rollups.total(Metric.SUBSCRIBERS, since=since, until=until), expected)
@@ -0,0 +1,129 @@
+import random
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from incidents.models import Incident, ResolutionSketch
+from incidents.services import incident_state, sketches
+from incidents.services.incidents import create_incident, update_incident_partial
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class DDSketchTests(TestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(1, 1.5) for _ in range(5000)]
+        sketch = sketches.DDSketch()
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.9, 0.95, 0.99):
+            expected = _exact_quantile(values, q)
+            self.assertAlmostEqual(sketch.quantile(q), expected, delta=expected * 0.02)
+
+    def test_merge_and_removal(self):
+        left, right, combined = sketches.DDSketch(), sketches.DDSketch(), sketches.DDSketch()
+        for value in range(1, 101):
+            (left if value % 2 else right).add(value)
+            combined.add(value)
+        left.merge(right)
+        self.assertEqual(left.to_dict(), combined.to_dict())
+
+        combined.add(100, -1)
+        self.assertEqual(combined.count, 99)
+        restored = sketches.DDSketch.from_dict(combined.to_dict())
+        self.assertEqual(restored.count, 99)
+        self.assertAlmostEqual(restored.quantile(1.0), 99, delta=99 * 0.01)
+
+    def test_empty_sketch_has_no_quantiles(self):
+        self.assertIsNone(sketches.DDSketch().quantile(0.5))
+
+
+class ResolutionSketchTests(TestCase):
+    def _create(self, severity=Incident.Severity.SEV2, is_public=True):
+        return create_incident(
+            data={
+                "title": "Database latency",
+                "summary": "Queries are slow",
+                "severity": severity,
+                "status": Incident.Status.INVESTIGATING,
+                "is_public": is_public,
+                "created_by_name": "Alice",
+            }
+        )
+
+    def test_resolve_and_reopen_update_the_sketch(self):
+        incident = self._create()
+        self.assertFalse(ResolutionSketch.objects.exists())
+
+        incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+        cell = ResolutionSketch.objects.get(severity=Incident.Severity.SEV2, is_public=True)
+        self.assertEqual(cell.count, 1)
+        self.assertEqual(cell.week, sketches.week_start(incident.resolved_at))
+
+        incident_state.transition_incident(incident, Incident.Status.INVESTIGATING, "Alice")
+        cell.refresh_from_db()
+        self.assertEqual(cell.count, 0)
+        self.assertIsNone(sketches.resolution_percentiles()["p50"])
+
+    def test_stale_copy_does_not_add_the_resolution_twice(self):
+        incident = self._create()
+        stale = Incident.objects.get(pk=incident.pk)
+        incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+
+        # A PATCH from a request that loaded the incident before it was resolved.
+        update_incident_partial(incident=stale, data={"status": Incident.Status.RESOLVED}, actor_name="Bob")
+
+        cell = ResolutionSketch.objects.get(severity=Incident.Severity.SEV2, is_public=True)
+        self.assertEqual(cell.count, 1)
+
+    def test_percentiles_filter_by_severity_and_visibility(self):
+        now = timezone.now()
+        hours = {Incident.Severity.SEV1: [1, 2, 3], Incident.Severity.SEV3: [10, 20, 30]}
+        for severity, durations in hours.items():
+            for duration in durations:
+                incident = Incident.objects.create(
+                    title="Synthetic",
+                    summary="Synthetic",
+                    severity=severity,
+                    status=Incident.Status.RESOLVED,
+                    is_public=severity == Incident.Severity.SEV1,
+                    created_by_name="Alice",
+                    resolved_at=now,
+                )
+                Incident.objects.filter(pk=incident.pk).update(
+                    created_at=now - timedelta(hours=duration)
+                )
+        sketches.rebuild_all()
+
+        sev1 = sketches.resolution_percentiles(severities=[Incident.Severity.SEV1])
+        self.assertAlmostEqual(sev1["p50"], 2, delta=0.02)
+        internal = sketches.resolution_percentiles(is_public=False)
+        self.assertAlmostEqual(internal["p50"], 20, delta=0.2)
+        overall = sketches.resolution_percentiles(since=now.date())
+        self.assertEqual(set(overall), {"p50", "p90", "p95", "p99"})
+        self.assertAlmostEqual(overall["p50"], 3, delta=0.03)
+
+    def test_incremental_updates_match_rebuild(self):
+        for index in range(6):
+            incident = self._create(
+                severity=Incident.Severity.SEV1 if index % 2 else Incident.Severity.SEV3,
+                is_public=index % 3 == 0,
+            )
+            incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+        incremental = {
+            (row.week, row.severity, row.is_public): row.sketch
+            for row in ResolutionSketch.objects.filter(count__gt=0)
+        }
+
+        sketches.rebuild_all()
+        rebuilt = {
+            (row.week, row.severity, row.is_public): row.sketch
+            for row in ResolutionSketch.objects.all()
+        }
+        self.assertEqual(incremental, rebuilt)
@@ -0,0 +1,93 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from incidents.models import Incident
+from incidents.services import incidents as incident_services
+from incidents.services import static_status
+from incidents.services import status as status_service
+
+
+class StaticStatusSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.snapshot_dir = Path(self.tmpdir.name)
+
+    def test_publish_disabled_without_directory(self):
+        with override_settings(STATUS_SNAPSHOT_DIR=""):
+            self.assertIsNone(static_status.publish_status_snapshot())
+
+    def test_commit_path_publishes_snapshot(self):
+        with override_settings(STATUS_SNAPSHOT_DIR=str(self.snapshot_dir)):
+            with self.captureOnCommitCallbacks(execute=True):
+                incident_services.create_incident(
+                    data={
+                        "title": "API <outage>",
+                        "summary": "Investigating",
+                        "severity": Incident.Severity.SEV1,
+                        "is_public": True,
+                        "created_by_name": "Alice",
+                    }
+                )
+
+        data = json.loads((self.snapshot_dir / "status.json").read_text())
+        self.assertEqual(data["overall_status"], "Major Outage")
+        self.assertEqual(len(data["active_incidents"]), 1)
+        html = (self.snapshot_dir / "status.html").read_text()
+        self.assertIn("API &lt;outage&gt;", html)
+        leftovers = [path.name for path in self.snapshot_dir.iterdir() if path.name.startswith(".")]
+        self.assertEqual(leftovers, [])
+
+    def test_management_command_rebuilds_snapshot(self):
+        call_command("publish_status_snapshot", output_dir=str(self.snapshot_dir), stdout=io.StringIO())
+        data = json.loads((self.snapshot_dir / "status.json").read_text())
+        self.assertEqual(data["overall_status"], "All Systems Operational")
+
+    def test_publisher_catches_up_with_changes_made_while_it_renders(self):
+        build = status_service.build_public_status_payload
+        calls = []
+
+        def build_and_change():
+            calls.append(None)
+            if len(calls) == 1:
+                # Another commit lands mid-publish; its task finds the lock held.
+                Incident.objects.create(
+                    title="Second outage",
+                    summary="Investigating",
+                    severity=Incident.Severity.SEV2,
+                    is_public=True,
+                    created_by_name="Alice",
+                )
+                static_status.request_publish()
+            return build()
+
+        with override_settings(STATUS_SNAPSHOT_DIR=str(self.snapshot_dir)):
+            with mock.patch.object(
+                status_service, "build_public_status_payload", side_effect=build_and_change
+            ):
+                static_status.request_publish()
+
+        self.assertEqual(len(calls), 2)
+        data = json.loads((self.snapshot_dir / "status.json").read_text())
+        self.assertEqual([item["title"] for item in data["active_incidents"]], ["Second outage"])
+        self.assertIsNone(cache.get(static_status.PUBLISH_LOCK_KEY))
+
+    def test_publisher_leaves_a_lock_taken_over_after_expiry(self):
+        def lock_expires_mid_publish(*args, **kwargs):
+            cache.set(static_status.PUBLISH_LOCK_KEY, "other-publisher")
+
+        with override_settings(STATUS_SNAPSHOT_DIR=str(self.snapshot_dir)):
+            with mock.patch.object(
+                static_status, "publish_status_snapshot", side_effect=lock_expires_mid_publish
+            ):
+                static_status.publish_pending()
+
+        self.assertEqual(cache.get(static_status.PUBLISH_LOCK_KEY), "other-publisher")
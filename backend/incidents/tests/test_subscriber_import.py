@@ -0,0 +1,111 @@
+import io
+import json
+import tempfile
+import uuid
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from incidents.models import Incident, Subscriber
+
+
+class SubscriberBulkImportTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(
+            username="admin", password="pw", is_staff=True
+        )
+        self.incident = Incident.objects.create(
+            title="DB outage",
+            summary="Investigating",
+            severity=Incident.Severity.SEV2,
+            created_by_name="Alice",
+        )
+        Subscriber.objects.create(email="existing@example.com")
+        self.import_url = reverse("subscriber-import")
+        self.export_url = reverse("subscriber-export")
+
+    def test_requires_admin(self):
+        response = self.client.post(self.import_url, "email\na@example.com\n", content_type="text/csv")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(self.export_url).status_code, 403)
+
+    def test_csv_body_import_skips_duplicates_and_reports_invalid_rows(self):
+        self.client.force_login(self.admin)
+        body = "\n".join(
+            [
+                "email,scope,incident,is_active",
+                "new@example.com,GLOBAL,,true",
+                "new@example.com,GLOBAL,,true",
+                "existing@example.com,,,",
+                f"scoped@example.com,INCIDENT,{self.incident.id},yes",
+                "not-an-email,GLOBAL,,",
+                f"ghost@example.com,INCIDENT,{uuid.uuid4()},",
+                "paused@example.com,GLOBAL,,false",
+            ]
+        )
+        response = self.client.post(self.import_url, body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(
+            {key: payload[key] for key in ("received", "created", "duplicates", "invalid")},
+            {"received": 7, "created": 3, "duplicates": 2, "invalid": 2},
+        )
+        self.assertEqual([error["line"] for error in payload["errors"]], [6, 7])
+        self.assertTrue(
+            Subscriber.objects.filter(
+                email="scoped@example.com", scope=Subscriber.Scope.INCIDENT, incident=self.incident
+            ).exists()
+        )
+        self.assertFalse(Subscriber.objects.get(email="paused@example.com").is_active)
+
+    def test_empty_body_is_rejected(self):
+        self.client.force_login(self.admin)
+        for content_type in ("text/csv", "application/x-ndjson"):
+            with self.subTest(content_type=content_type):
+                response = self.client.post(self.import_url, "", content_type=content_type)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"detail": "Request body is empty."})
+
+    def test_ndjson_file_upload(self):
+        self.client.force_login(self.admin)
+        lines = [json.dumps({"email": f"user{index}@example.com"}) for index in range(25)]
+        lines.append("{not json")
+        upload = SimpleUploadedFile("subscribers.ndjson", "\n".join(lines).encode())
+
+        response = self.client.post(self.import_url, {"file": upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 25)
+        self.assertEqual(response.json()["invalid"], 1)
+        self.assertEqual(Subscriber.objects.count(), 26)
+
+    def test_export_streams_csv_that_round_trips(self):
+        self.client.force_login(self.admin)
+        Subscriber.objects.create(
+            email="scoped@example.com", scope=Subscriber.Scope.INCIDENT, incident=self.incident
+        )
+
+        response = self.client.get(self.export_url)
+
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines()[0], "email,scope,incident,is_active,created_at")
+        self.assertIn(f"scoped@example.com,INCIDENT,{self.incident.id},true", content)
+
+        reimport = self.client.post(self.import_url, content, content_type="text/csv").json()
+        self.assertEqual((reimport["created"], reimport["duplicates"]), (0, 2))
+
+    def test_management_command_imports_in_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "subscribers.csv"
+            path.write_text("email\n" + "\n".join(f"cli{index}@example.com" for index in range(10)))
+            out = io.StringIO()
+            call_command("import_subscribers", str(path), "--chunk-size", "3", stdout=out)
+
+        self.assertIn("Imported 10 subscribers from 10 rows", out.getvalue())
+        self.assertEqual(Subscriber.objects.filter(email__startswith="cli").count(), 10)
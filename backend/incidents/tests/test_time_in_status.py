@@ -0,0 +1,139 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from incidents.models import Incident, IncidentUpdate, MetricRollup
+from incidents.services import incident_state, rollups, time_in_status
+from incidents.services.incidents import create_incident, post_update, update_incident_partial
+
+
+class TimeInStatusTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        # (minutes after opening, status reported) per incident.
+        self.timelines = [
+            [(10, "INVESTIGATING"), (40, "IDENTIFIED"), (100, "MONITORING"), (160, "RESOLVED")],
+            [(30, "IDENTIFIED"), (50, "IDENTIFIED"), (90, "RESOLVED")],
+            [(5, "INVESTIGATING")],
+        ]
+        for index, timeline in enumerate(self.timelines):
+            opened = self.now - timedelta(days=2, hours=index)
+            incident = Incident.objects.create(
+                title=f"Incident {index}",
+                summary="Synthetic",
+                severity=Incident.Severity.SEV2,
+                status=timeline[-1][1],
+                created_by_name="Alice",
+            )
+            Incident.objects.filter(pk=incident.pk).update(created_at=opened)
+            for minutes, status in timeline:
+                update = IncidentUpdate.objects.create(
+                    incident=incident, message=status, status_at_time=status, created_by_name="Alice"
+                )
+                IncidentUpdate.objects.filter(pk=update.pk).update(
+                    created_at=opened + timedelta(minutes=minutes)
+                )
+
+    def test_durations_match_timelines(self):
+        with self.assertNumQueries(1):
+            time_in_status.add_status_durations(Counter())
+        time_in_status.refresh()
+
+        # Acknowledged after 10, 30 and 5 minutes.
+        self.assertEqual(time_in_status.mtta_hours(), round(45 / 3 / 60, 2))
+        durations = time_in_status.status_durations()
+        # INVESTIGATING: 40 and 30 minutes; the third incident is still in it.
+        self.assertEqual(durations["INVESTIGATING"], {"mean_hours": round(35 / 60, 2), "stays": 2})
+        self.assertEqual(durations["IDENTIFIED"], {"mean_hours": 1.0, "stays": 2})
+        self.assertEqual(durations["MONITORING"], {"mean_hours": 1.0, "stays": 1})
+        self.assertNotIn("RESOLVED", durations)
+
+    def test_refresh_only_replaces_its_own_cells(self):
+        rollups.rebuild_all()
+        before = rollups.breakdown(MetricRollup.Metric.INCIDENTS, "status")
+        stays = time_in_status.status_durations()
+
+        IncidentUpdate.objects.all().delete()
+        time_in_status.refresh()
+        self.assertEqual(rollups.breakdown(MetricRollup.Metric.INCIDENTS, "status"), before)
+        self.assertEqual(time_in_status.mtta_hours(), None)
+        self.assertEqual(stays["MONITORING"]["stays"], 1)
+        self.assertEqual(time_in_status.status_durations()["MONITORING"]["stays"], 0)
+
+    def test_exposed_on_analytics_endpoint(self):
+        time_in_status.refresh()
+        response = self.client.get(reverse("incident-analytics"))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["time_in_status"]["MONITORING"]["stays"], 1)
+        self.assertIsNotNone(body["mtta_hours"])
+
+
+
+class IncrementalTimeInStatusTests(TestCase):
+    def _cells(self):
+        rows = MetricRollup.objects.filter(metric__in=time_in_status.METRICS).exclude(value=0)
+        return {
+            (row.grain, row.metric, row.bucket_start, row.severity, row.visibility, row.status): row.value
+            for row in rows
+        }
+
+    def test_updates_write_cells_from_the_initial_status(self):
+        incident = create_incident(
+            data={
+                "title": "Checkout errors",
+                "summary": "Cause already known",
+                "severity": Incident.Severity.SEV2,
+                "status": Incident.Status.IDENTIFIED,
+                "created_by_name": "Alice",
+            }
+        )
+        post_update(incident=incident, data={"message": "Fix rolling out", "created_by_name": "Alice"})
+        self.assertEqual(time_in_status.status_durations()["IDENTIFIED"]["stays"], 0)
+        self.assertIsNotNone(time_in_status.mtta_hours())
+
+        incident_state.transition_incident(incident, Incident.Status.MONITORING, "Alice")
+        update_incident_partial(incident=incident, data={"severity": Incident.Severity.SEV1}, actor_name="Alice")
+        incident_state.transition_incident(incident, Incident.Status.RESOLVED, "Alice")
+
+        durations = time_in_status.status_durations()
+        # Opened as IDENTIFIED, so there was never an INVESTIGATING stay.
+        self.assertEqual(durations["INVESTIGATING"]["stays"], 0)
+        self.assertEqual(durations["IDENTIFIED"]["stays"], 1)
+        self.assertEqual(durations["MONITORING"]["stays"], 1)
+        self.assertEqual(time_in_status.status_durations(severity=Incident.Severity.SEV2)["IDENTIFIED"]["stays"], 0)
+
+        incremental = self._cells()
+        time_in_status.refresh()
+        self.assertEqual(incremental, self._cells())
+
+    def test_returning_to_a_status_starts_a_new_stay(self):
+        incident = create_incident(
+            data={
+                "title": "Checkout errors",
+                "summary": "Payments failing",
+                "severity": Incident.Severity.SEV2,
+                "is_public": True,
+                "created_by_name": "Alice",
+            }
+        )
+        for status in ["INVESTIGATING", "INVESTIGATING", "IDENTIFIED", "IDENTIFIED", "INVESTIGATING", "MONITORING"]:
+            post_update(
+                incident=incident,
+                data={"message": status, "status_at_time": status, "created_by_name": "Alice"},
+            )
+        update_incident_partial(incident=incident, data={"is_public": False}, actor_name="Alice")
+        post_update(incident=incident, data={"message": "Done", "status_at_time": "RESOLVED", "created_by_name": "Alice"})
+
+        durations = time_in_status.status_durations()
+        self.assertEqual(durations["INVESTIGATING"]["stays"], 2)
+        self.assertEqual(durations["IDENTIFIED"]["stays"], 1)
+        self.assertEqual(durations["MONITORING"]["stays"], 1)
+        self.assertEqual(time_in_status.status_durations(visibility="public")["INVESTIGATING"]["stays"], 0)
+
+        incremental = self._cells()
+        time_in_status.refresh()
+        self.assertEqual(incremental, self._cells())
@@ -0,0 +1,107 @@
+import io
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from incidents.models import DailyUptime, Incident
+from incidents.services import cache as two_tier_cache
+from incidents.services import incidents as incident_services
+from incidents.services import uptime as uptime_service
+
+
+class UptimeRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        two_tier_cache.local_cache.clear()
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        day_start, _ = uptime_service._day_bounds(self.yesterday)
+        self._create(Incident.Severity.SEV2, day_start + timedelta(hours=1), day_start + timedelta(hours=3))
+        # Overlaps the first incident by one hour; must not be double counted.
+        self._create(Incident.Severity.SEV1, day_start + timedelta(hours=2), day_start + timedelta(hours=4))
+        self._create(
+            Incident.Severity.SEV1,
+            day_start + timedelta(hours=5),
+            day_start + timedelta(hours=6),
+            is_public=False,
+        )
+
+    def _create(self, severity, created_at, resolved_at, is_public=True):
+        incident = Incident.objects.create(
+            title="Outage",
+            summary="Outage",
+            severity=severity,
+            status=Incident.Status.RESOLVED,
+            is_public=is_public,
+            created_by_name="Alice",
+            resolved_at=resolved_at,
+        )
+        Incident.objects.filter(pk=incident.pk).update(created_at=created_at)
+        incident.refresh_from_db()
+        return incident
+
+    def test_backfill_merges_overlapping_public_incidents(self):
+        call_command("backfill_uptime", days=7, stdout=io.StringIO())
+        row = DailyUptime.objects.get(date=self.yesterday)
+        self.assertEqual(row.outage_minutes, 180)
+        self.assertEqual(row.worst_severity, Incident.Severity.SEV1)
+        self.assertEqual(row.incident_count, 2)
+
+    def test_refresh_upserts_existing_rows(self):
+        uptime_service.refresh_days(self.yesterday, self.yesterday)
+        row = DailyUptime.objects.get(date=self.yesterday)
+        Incident.objects.filter(severity=Incident.Severity.SEV1).update(is_public=False)
+
+        # A refresh racing a row that already exists updates it in place.
+        self.assertEqual(uptime_service.refresh_days(self.yesterday, self.yesterday), 1)
+        updated = DailyUptime.objects.get(date=self.yesterday)
+        self.assertEqual((updated.pk, updated.worst_severity), (row.pk, Incident.Severity.SEV2))
+
+        Incident.objects.update(is_public=False)
+        self.assertEqual(uptime_service.refresh_days(self.yesterday, self.yesterday), 0)
+        self.assertFalse(DailyUptime.objects.exists())
+
+    def test_endpoint_serves_series_from_rollups(self):
+        call_command("backfill_uptime", days=7, stdout=io.StringIO())
+        response = self.client.get(reverse("public-uptime"), {"days": 7})
+        self.assertEqual(response.status_code, 200)
+        days = response.json()["days"]
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[-2]["date"], self.yesterday.isoformat())
+        self.assertEqual(days[-2]["outage_minutes"], 180)
+        self.assertIsNone(days[0]["worst_severity"])
+        self.assertIn("ETag", response)
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse("public-uptime"), {"days": 7})
+
+    def test_transition_refreshes_rollup_incrementally(self):
+        incident = Incident.objects.create(
+            title="Live",
+            summary="Live",
+            severity=Incident.Severity.SEV3,
+            status=Incident.Status.MONITORING,
+            is_public=True,
+            created_by_name="Bob",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            incident_services.transition_incident(
+                incident=incident,
+                new_status=Incident.Status.RESOLVED,
+                actor_name="Bob",
+                message=None,
+            )
+
+        self.assertEqual(
+            DailyUptime.objects.get(date=timezone.localdate()).worst_severity,
+            Incident.Severity.SEV3,
+        )
+        # Days the incident never touched are left alone.
+        self.assertFalse(DailyUptime.objects.filter(date=self.yesterday).exists())
+
+    def test_rejects_out_of_range_days(self):
+        response = self.client.get(reverse("public-uptime"), {"days": 0})
+        self.assertEqual(response.status_code, 400)
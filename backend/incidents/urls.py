@@ -52,6 +52,16 @@ urlpatterns = [
         name="postmortem-action-item-detail",
     ),
     path("api/subscribers", views.SubscriberCreateView.as_view(), name="subscriber-create"),
+    path(
+        "api/subscribers/import",
+        views.SubscriberImportView.as_view(),
+        name="subscriber-import",
+    ),
+    path(
+        "api/subscribers/export",
+        views.SubscriberExportView.as_view(),
+        name="subscriber-export",
+    ),
     path("api/audit", views.AuditEventListView.as_view(), name="audit-events"),
     path("api/public/status", views.PublicStatusView.as_view(), name="public-status"),
     path(
@@ -64,6 +74,8 @@ urlpatterns = [
         views.PublicPostmortemView.as_view(),
         name="public-postmortem",
     ),
+    path("api/public/history", views.PublicHistoryView.as_view(), name="public-history"),
+    path("api/public/uptime", views.PublicUptimeView.as_view(), name="public-uptime"),
     path("api/stream/admin", views.AdminStreamView.as_view(), name="stream-admin"),
     path("api/stream/public", views.PublicStreamView.as_view(), name="stream-public"),
     path("healthz", views.HealthCheckView.as_view(), name="healthz"),
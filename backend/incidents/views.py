@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import codecs
+from datetime import timedelta
+
+from django.db import transaction
 from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from django.urls import reverse
 from django.views import View
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
 from rest_framework import status as http_status
+from rest_framework.parsers import BaseParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -23,11 +31,18 @@ from incidents.serializers import (
 from incidents.services import (
     analytics as analytics_service,
     health as health_service,
+    history as history_service,
     incidents as incident_services,
     metrics as metrics_service,
+    metrics_snapshot,
     notifications,
+    page_views,
+    public as public_service,
+    rollups,
     sse,
     status as status_service,
+    subscriber_import,
+    uptime as uptime_service,
 )
 from incidents.services.idempotency import idempotent_endpoint
 
@@ -54,6 +69,41 @@ def api_root(request):
     )
 
 
+def cached_public_response(
+    request,
+    cached: dict | None,
+    not_found_message: str,
+    *,
+    max_age: int = public_service.PUBLIC_HTTP_MAX_AGE,
+    s_maxage: int = public_service.PUBLIC_HTTP_SHARED_MAX_AGE,
+    immutable: bool = False,
+) -> Response:
+    """
+    Serve a pre-rendered `{"data", "etag"}` payload with cache headers so browsers
+    and CDNs can revalidate cheaply instead of re-downloading the body.
+    """
+    if cached is None:
+        raise Http404(not_found_message)
+
+    etag = quote_etag(cached["etag"])
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        if "*" in etags or etag in etags:
+            response = Response(status=http_status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(cached["data"])
+    else:
+        response = Response(cached["data"])
+
+    response["ETag"] = etag
+    cache_control = {"public": True, "max_age": max_age, "s_maxage": s_maxage}
+    if immutable:
+        cache_control["immutable"] = True
+    patch_cache_control(response, **cache_control)
+    return response
+
+
 @method_decorator(ratelimit(key="ip", rate="10/m", block=True), name="post")
 class IncidentListCreateView(APIView):
     def get(self, request):
@@ -149,10 +199,69 @@ class SubscriberCreateView(APIView):
     def post(self, request):
         serializer = SubscriberSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        subscriber = serializer.save()
+        with transaction.atomic():
+            subscriber = serializer.save()
+            rollups.record_subscribers([subscriber.created_at])
         return Response(SubscriberSerializer(subscriber).data, status=http_status.HTTP_201_CREATED)
 
 
+class _PassthroughParser(BaseParser):
+    """Hand the raw request stream to the view so large uploads are parsed lazily."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
+
+
+class CSVStreamParser(_PassthroughParser):
+    media_type = "text/csv"
+
+
+class NDJSONStreamParser(_PassthroughParser):
+    media_type = "application/x-ndjson"
+
+
+class SubscriberImportView(APIView):
+    """
+    Bulk-load subscribers from CSV (`email,scope,incident,is_active`) or NDJSON, sent
+    either as the raw request body or as a multipart `file` upload.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [CSVStreamParser, NDJSONStreamParser, MultiPartParser]
+
+    def post(self, request):
+        if request.content_type.startswith("multipart/"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response(
+                    {"detail": "Upload a CSV or NDJSON file as 'file'."},
+                    status=http_status.HTTP_400_BAD_REQUEST,
+                )
+            stream = upload
+            fmt = subscriber_import.detect_format(filename=upload.name)
+        else:
+            stream = request.data
+            fmt = subscriber_import.detect_format(content_type=request.content_type)
+        # DRF hands back an empty dict rather than a stream when there is no body.
+        if not hasattr(stream, "read"):
+            return Response({"detail": "Request body is empty."}, status=http_status.HTTP_400_BAD_REQUEST)
+
+        text = codecs.getreader("utf-8")(stream, errors="replace")
+        result = subscriber_import.import_subscribers(subscriber_import.iter_rows(text, fmt))
+        return Response(result.to_dict())
+
+
+class SubscriberExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        response = StreamingHttpResponse(
+            subscriber_import.iter_export_csv(), content_type="text/csv"
+        )
+        response["Content-Disposition"] = 'attachment; filename="subscribers.csv"'
+        return response
+
+
 class AuditEventListView(APIView):
     def get(self, request):
         events = AuditEvent.objects.select_related("incident").order_by("-created_at")[:100]
@@ -167,9 +276,61 @@ class IncidentAnalyticsView(APIView):
 
 class AdminMetricsView(APIView):
     def get(self, request):
-        payload = metrics_service.get_admin_metrics()
+        if {"from", "to", "bucket"} & set(request.query_params):
+            return self.get_range(request)
+        try:
+            weeks = int(request.query_params.get("weeks", metrics_service.DEFAULT_MTTR_WEEKS))
+        except ValueError:
+            weeks = 0
+        if not 1 <= weeks <= metrics_service.MAX_MTTR_WEEKS:
+            return Response(
+                {"detail": f"weeks must be between 1 and {metrics_service.MAX_MTTR_WEEKS}"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        payload = metrics_snapshot.get_snapshot(weeks)
+        if payload is None:
+            return Response(
+                {"detail": "Metrics are being computed; retry shortly."},
+                status=http_status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(metrics_snapshot.RETRY_AFTER_SECONDS)},
+            )
         return Response(payload)
 
+    def get_range(self, request):
+        params = request.query_params
+        bucket = params.get("bucket", rollups.DAY)
+        try:
+            end = metrics_service.parse_moment(params["to"]) if params.get("to") else timezone.now()
+            start = (
+                metrics_service.parse_moment(params["from"])
+                if params.get("from")
+                else end - timedelta(days=metrics_service.DEFAULT_RANGE_DAYS)
+            )
+        except ValueError:
+            return Response(
+                {"detail": "from and to must be ISO dates or datetimes"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        if bucket not in rollups.BUCKETS:
+            return Response(
+                {"detail": f"bucket must be one of {', '.join(rollups.BUCKETS)}"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        if start >= end:
+            return Response(
+                {"detail": "from must be before to"}, status=http_status.HTTP_400_BAD_REQUEST
+            )
+        buckets = rollups.bucket_count(start, end, bucket)
+        if buckets > metrics_service.MAX_RANGE_BUCKETS:
+            return Response(
+                {
+                    "detail": f"Range needs {buckets} {bucket} buckets; at most "
+                    f"{metrics_service.MAX_RANGE_BUCKETS} are allowed, use a larger bucket"
+                },
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(metrics_service.get_range_metrics(start, end, bucket))
+
 
 class PostmortemView(APIView):
     def get_incident(self, incident_id: str) -> Incident:
@@ -193,6 +354,7 @@ class PostmortemView(APIView):
         serializer = PostmortemSerializer(data=data)
         serializer.is_valid(raise_exception=True)
         postmortem = serializer.save()
+        public_service.invalidate_public_incident(incident.id)
         return Response(PostmortemSerializer(postmortem).data, status=http_status.HTTP_201_CREATED)
 
     def patch(self, request, incident_id: str):
@@ -204,6 +366,7 @@ class PostmortemView(APIView):
         )
         serializer.is_valid(raise_exception=True)
         postmortem = serializer.save()
+        public_service.invalidate_public_incident(incident.id)
         return Response(PostmortemSerializer(postmortem).data)
 
 
@@ -226,6 +389,7 @@ class PostmortemPublishView(APIView):
                 metadata={},
             )
 
+            public_service.invalidate_public_incident(incident.id)
             notifications.notify_postmortem_published(incident, postmortem)
             sse.broadcast_postmortem_published(incident, postmortem)
 
@@ -278,6 +442,7 @@ class PostmortemActionItemsView(APIView):
         serializer = ActionItemSerializer(data=data)
         serializer.is_valid(raise_exception=True)
         action_item = serializer.save()
+        public_service.invalidate_public_incident(postmortem.incident_id)
         return Response(ActionItemSerializer(action_item).data, status=http_status.HTTP_201_CREATED)
 
 
@@ -291,31 +456,80 @@ class PostmortemActionItemDetailView(APIView):
         serializer = ActionItemSerializer(action_item, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         action_item = serializer.save()
+        public_service.invalidate_public_incident(action_item.postmortem.incident_id)
         return Response(ActionItemSerializer(action_item).data)
 
 
 class PublicStatusView(APIView):
     def get(self, request):
-        payload = status_service.get_public_status_payload()
-        data = {
-            "overall_status": payload["overall_status"],
-            "active_incidents": IncidentSerializer(payload["active_incidents"], many=True).data,
-        }
-        return Response(data)
+        page_views.record_view()
+        return Response(status_service.get_public_status_payload())
 
 
 class PublicIncidentDetailView(APIView):
     def get(self, request, incident_id: str):
-        incident = get_object_or_404(Incident, pk=incident_id, is_public=True)
-        return Response(IncidentSerializer(incident).data)
+        cached = public_service.get_public_incident_payload(incident_id)
+        return cached_public_response(request, cached, "Incident not found")
 
 
 class PublicPostmortemView(APIView):
     def get(self, request, incident_id: str):
-        incident = get_object_or_404(Incident, pk=incident_id, is_public=True)
-        if not hasattr(incident, "postmortem") or not incident.postmortem.published:
-            raise Http404("Postmortem not available")
-        return Response(PostmortemSerializer(incident.postmortem).data)
+        cached = public_service.get_public_postmortem_payload(incident_id)
+        return cached_public_response(request, cached, "Postmortem not available")
+
+
+class PublicHistoryView(APIView):
+    def get(self, request):
+        raw_month = request.query_params.get("month")
+        try:
+            month = (
+                history_service.parse_month(raw_month)
+                if raw_month
+                else history_service.current_month()
+            )
+            page = int(request.query_params.get("page", 1))
+        except ValueError:
+            return Response(
+                {"detail": "month must be YYYY-MM and page a positive integer"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        if page < 1:
+            return Response(
+                {"detail": "month must be YYYY-MM and page a positive integer"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        if month > history_service.current_month():
+            return Response(
+                {"detail": "month cannot be in the future"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+
+        cached = history_service.get_month_archive(month, page)
+        if history_service.is_closed_month(month):
+            return cached_public_response(
+                request,
+                cached,
+                "History not found",
+                max_age=history_service.CLOSED_MONTH_HTTP_MAX_AGE,
+                s_maxage=history_service.CLOSED_MONTH_HTTP_MAX_AGE,
+                immutable=True,
+            )
+        return cached_public_response(request, cached, "History not found")
+
+
+class PublicUptimeView(APIView):
+    def get(self, request):
+        try:
+            days = int(request.query_params.get("days", uptime_service.DEFAULT_UPTIME_DAYS))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= uptime_service.MAX_UPTIME_DAYS:
+            return Response(
+                {"detail": f"days must be between 1 and {uptime_service.MAX_UPTIME_DAYS}"},
+                status=http_status.HTTP_400_BAD_REQUEST,
+            )
+        cached = uptime_service.get_uptime_payload(days)
+        return cached_public_response(request, cached, "Uptime not found")
 
 
 class AdminStreamView(View):
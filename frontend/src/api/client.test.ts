@@ -106,6 +106,36 @@ describe('request', () => {
     }
   })
 
+  it('waits for Retry-After before retrying', async () => {
+    vi.useFakeTimers()
+    try {
+      const mockedFetch = fetch as unknown as ReturnType<typeof vi.fn>
+      mockedFetch.mockResolvedValueOnce({
+        ok: false,
+        status: 503,
+        text: () => Promise.resolve('computing'),
+        headers: new Headers({ 'Retry-After': '2' }),
+      })
+      mockedFetch.mockResolvedValue({
+        ok: true,
+        status: 200,
+        headers: new Headers({ 'content-type': 'application/json' }),
+        json: () => Promise.resolve({ ready: true }),
+      })
+
+      const pending = request<{ ready: boolean }>('/metrics')
+      await vi.advanceTimersByTimeAsync(1999)
+      expect(mockedFetch).toHaveBeenCalledTimes(1)
+      await vi.advanceTimersByTimeAsync(1)
+      const response = await pending
+
+      expect(response.ready).toBe(true)
+      expect(mockedFetch).toHaveBeenCalledTimes(2)
+    } finally {
+      vi.useRealTimers()
+    }
+  })
+
   it('throws after exhausting retries', async () => {
     vi.useFakeTimers()
     try {
@@ -31,6 +31,21 @@ const delay = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms))
 
 const shouldRetryStatus = (status: number) => RETRYABLE_STATUS_CODES.has(status)
 
+// Servers answer 503 with Retry-After while they warm up (e.g. /metrics computing its
+// first snapshot); wait as long as they ask instead of the fixed backoff.
+const retryAfterMs = (response: Response): number | null => {
+  const header = response.headers?.get('Retry-After')
+  if (!header) {
+    return null
+  }
+  const seconds = Number(header)
+  if (Number.isFinite(seconds)) {
+    return Math.max(0, seconds * 1000)
+  }
+  const date = Date.parse(header)
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now())
+}
+
 const shouldRetryError = (error: unknown) => {
   if (typeof window === 'undefined') {
     return error instanceof Error
@@ -67,7 +82,7 @@ export async function request<T>(path: string, options: RequestOptions = {}): Pr
 
     if (!response.ok) {
       if (hasAnotherAttempt && shouldRetryStatus(response.status)) {
-        await delay(RETRY_DELAYS_MS[attempt])
+        await delay(retryAfterMs(response) ?? RETRY_DELAYS_MS[attempt])
         continue
       }
       const errorText = await response.text()
@@ -67,6 +67,8 @@ export interface IncidentAnalytics {
   active_incidents: number
   resolved_last_7_days: number
   incidents_per_severity: Record<IncidentSeverity, number>
+  mtta_hours: number | null
+  time_in_status: Record<string, { mean_hours: number | null; stays: number }>
 }
 
 export const getIncidentAnalytics = () =>
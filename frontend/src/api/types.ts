@@ -150,7 +150,7 @@ export interface MetricsResponse {
       public: MetricsWeeklyPoint[]
       internal: MetricsWeeklyPoint[]
     }
-    percentiles: { p50: number | null; p90: number | null }
+    percentiles: { p50: number | null; p90: number | null; p95: number | null; p99: number | null }
     resolved_by_severity: Array<{ severity: IncidentSeverity; count: number }>
     visibility_breakdown: { public: number; internal: number }
   }
@@ -164,4 +164,5 @@ export interface MetricsResponse {
     missing_postmortems: MetricsWatchlistPostmortem[]
     overdue_action_items: MetricsWatchlistActionItem[]
   }
+  snapshot: { generated_at: string; age_seconds: number }
 }
@@ -206,6 +206,10 @@ const AdminIncidentsPage = () => {
               <p>MTTR</p>
               <strong>{analytics.mttr_hours !== null ? `${analytics.mttr_hours} hrs` : '—'}</strong>
             </div>
+            <div className="analytics-card metric">
+              <p>MTTA</p>
+              <strong>{analytics.mtta_hours !== null ? `${analytics.mtta_hours} hrs` : '—'}</strong>
+            </div>
             <div className="analytics-card metric">
               <p>Resolved last 7 days</p>
               <strong>{analytics.resolved_last_7_days}</strong>
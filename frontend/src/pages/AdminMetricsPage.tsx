@@ -107,7 +107,7 @@ const AdminMetricsPage = () => {
   return (
     <AdminLayout
       title="Metrics dashboard"
-      subtitle="Digest trends for incidents, resolution health, engagement, and automation."
+      subtitle={`Digest trends for incidents, resolution health, engagement, and automation. Snapshot ${Math.round(metrics.snapshot.age_seconds)}s old.`}
     >
       <div className="card metrics-grid">
         <section className="metrics-section">